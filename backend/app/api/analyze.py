@@ -1,70 +1,122 @@
 from fastapi import APIRouter, File, UploadFile, HTTPException, Form
-from PIL import Image
-import io
+from fastapi.responses import StreamingResponse
+import asyncio
+import dataclasses
+import json
+import logging
 import random
+import time
+from app.core.config import settings
 from app.pipelines.urban_heat_pipeline import pipeline
-from app.domain.region import Region
+from app.domain.region import Region, BoundingBox
+from app.infra.image_io import ImageTooLargeError, decode_upload, upload_digest
+from app.pipelines.single_flight import analysis_key, single_flight
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+MAX_SWEEP_FACTORS = 101
+
+async def _load_inputs(file: UploadFile, lat: float, lng: float, use_satellite: bool):
+    """
+    Validates the request and returns (image, region). image is None when
+    the pipeline should fetch a Sentinel tile for the region instead.
+    """
+    image = None
+    if file:
+        if not file.content_type.startswith("image/"):
+            raise HTTPException(status_code=400, detail="File must be an image")
+        # Decode straight from the spooled upload (never fully read into
+        # memory); decoding is CPU-bound, so keep it off the event loop
+        try:
+            image = await asyncio.to_thread(decode_upload, file.file)
+        except ImageTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    elif not use_satellite:
+         raise HTTPException(status_code=400, detail="Must provide file or enable use_satellite")
+    
+    # Create Region context
+    # For MVP, population density is still mocked/random here if not passed, 
+    # but optimally it should come from a service. 
+    # let's pass it into the region (mocked for now)
+    region = Region(
+        lat=lat, 
+        lng=lng,
+        population_density=random.uniform(500, 5000) 
+    )
+    return image, region
+
+def _parse_factors(factors: str, steps: int) -> list:
+    if factors:
+        try:
+            values = [float(f) for f in factors.split(",") if f.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="factors must be a comma-separated list of numbers")
+    else:
+        if steps < 2:
+            raise HTTPException(status_code=400, detail="steps must be at least 2")
+        values = [i / (steps - 1) for i in range(steps)]
+
+    if not values or any(v < 0.0 or v > 1.0 for v in values):
+        raise HTTPException(status_code=400, detail="Simulation factors must be between 0.0 and 1.0")
+    if len(values) > MAX_SWEEP_FACTORS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SWEEP_FACTORS} factors per sweep")
+    return values
 
 @router.post("/")
-def analyze_image(
+async def analyze_image(
     file: UploadFile = File(None), 
     lat: float = Form(0.0), 
     lng: float = Form(0.0), 
     use_satellite: bool = Form(False),
     simulation_mode: str = Form(None),
-    simulation_factor: float = Form(1.0) # 0.0 to 1.0 (1.0 = no reduction, 0.0 = full removal)
+    simulation_factor: float = Form(1.0), # 0.0 to 1.0 (1.0 = no reduction, 0.0 = full removal)
+    simulation_seed: int = Form(None) # Seed for detection subsampling (defaults to settings.SIMULATION_SEED)
 ):
     """
     Analyze uploaded satellite/drone image using the UrbanHeatPipeline.
     If 'use_satellite' is True, it fetches a Sentinel tile for the lat/lng.
     If 'simulation_mode' is 'cleanup', it simulates a plastic-free scenario.
+
+    With coalescing, requests for the same rounded location share one
+    report: 'location' echoes this request, but the population density
+    (mocked per request) is the one the shared report was scored with.
     """
     try:
-        image = None
-        if file:
-            if not file.content_type.startswith("image/"):
-                raise HTTPException(status_code=400, detail="File must be an image")
-            contents = file.file.read()
-            image = Image.open(io.BytesIO(contents)).convert("RGB")
-        elif not use_satellite:
-             raise HTTPException(status_code=400, detail="Must provide file or enable use_satellite")
-        
-        # Create Region context
-        # For MVP, population density is still mocked/random here if not passed, 
-        # but optimally it should come from a service. 
-        # let's pass it into the region (mocked for now)
-        region = Region(
-            lat=lat, 
-            lng=lng,
-            population_density=random.uniform(500, 5000) 
-        )
+        image, region = await _load_inputs(file, lat, lng, use_satellite)
         
         # Run Pipeline
         # If image is None here, pipeline will fetch via SentinelService using Region
-        report = pipeline.run(image=image, region=region, simulation_mode=simulation_mode, simulation_factor=simulation_factor)
+        run = lambda: pipeline.arun(image=image, region=region, simulation_mode=simulation_mode,
+                                    simulation_factor=simulation_factor, simulation_seed=simulation_seed)
+        if settings.COALESCE_ENABLED:
+            # Identical concurrent (or very recent) requests share one analysis
+            digest = await asyncio.to_thread(upload_digest, file.file) if image is not None else None
+            key = analysis_key(lat, lng, simulation_mode, simulation_factor, simulation_seed, image_digest=digest)
+            report = await single_flight.run(key, run)
+        else:
+            report = await run()
         
         # --- Backward Compatibility Adapter ---
         # Transforming new Domain Report -> Old Frontend JSON format
         # This keeps the frontend working without changes for now.
         
-        # Calculate Confidence (Enhanced)
-        from app.engines.confidence_engine import ConfidenceEngine
-        confidence = ConfidenceEngine.evaluate(report.plastic)
-        
-        # Get Sentinel Metadata
-        from app.infra.sentinel_service import sentinel_service
-        sentinel_meta = sentinel_service.get_metadata(report.region)
+        # Confidence and Sentinel metadata are computed as pipeline stages
+        confidence = report.confidence
+        sentinel_meta = report.sentinel_metadata
 
         return {
-            "location": {"lat": report.region.lat, "lng": report.region.lng},
+            # The request's own point; a coalesced report may be another caller's
+            "location": {"lat": lat, "lng": lng},
             "plastic_analysis": {
                 "count": report.plastic.object_count,
                 "density_score": report.plastic.density_score,
             },
             "environmental_data": {
                 "surface_temp_c": 35.0, # Placeholder
+                # Kept from the (possibly shared) report so it matches the WDI below
                 "population_density": round(report.region.population_density, 0)
             },
             # Scientific Indices
@@ -75,6 +127,13 @@ def analyze_image(
             },
             "heat_score": report.heat_index.urban_risk_index,
             "intervention_suggestion": report.interventions[0].title if report.interventions else "No immediate action required",
+            # Where the plastic is concentrated, and the site-specific cleanups it calls for
+            "hotspots": [dataclasses.asdict(h) for h in report.hotspots],
+            "cleanup_sites": [
+                {"title": i.title, "description": i.description, "urgency": i.urgency.value,
+                 "impact": i.estimated_impact, "location": i.location}
+                for i in report.interventions if i.location is not None
+            ],
             
             # Trust & Credibility Fields
             # Trust & Credibility Fields
@@ -85,7 +144,162 @@ def analyze_image(
             "sensor_readings": report.sensor_readings.__dict__ if report.sensor_readings else None
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Analysis request failed")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/sweep")
+async def sweep_cleanup(
+    file: UploadFile = File(None),
+    lat: float = Form(0.0),
+    lng: float = Form(0.0),
+    use_satellite: bool = Form(False),
+    factors: str = Form(None), # Comma-separated fractions of plastic remaining, e.g. "1.0,0.75,0.5"
+    steps: int = Form(11), # Used when 'factors' is omitted: evenly spaced from 0.0 to 1.0
+    simulation_seed: int = Form(None)
+):
+    """
+    Risk-vs-cleanup curve for the cleanup slider. Vision runs once and every
+    factor is scored from the same detections, so one call replaces a
+    /analyze call per slider position.
+    """
+    try:
+        values = _parse_factors(factors, steps)
+        image, region = await _load_inputs(file, lat, lng, use_satellite)
+
+        result = await pipeline.arun_sweep(values, image=image, region=region, simulation_seed=simulation_seed)
+        plastic = result["plastic"]
+
+        return {
+            "location": {"lat": region.lat, "lng": region.lng},
+            "baseline": {
+                "count": plastic.object_count,
+                "density_score": plastic.density_score,
+            },
+            "curve": [
+                {
+                    "simulation_factor": s.simulation_factor,
+                    "removal_percent": round((1.0 - s.simulation_factor) * 100, 1),
+                    "plastic_analysis": {
+                        "count": s.object_count,
+                        "density_score": s.density_score,
+                    },
+                    "indices": {
+                        "pdi": s.heat_index.plastic_density_index,
+                        "sai": s.heat_index.surface_absorption_index,
+                        "wdi": s.heat_index.water_deficit_index
+                    },
+                    "heat_score": s.heat_index.urban_risk_index,
+                    "intervention_suggestion": s.interventions[0].title if s.interventions else "No immediate action required",
+                    "confidence": s.confidence
+                }
+                for s in result["scenarios"]
+            ],
+            "sentinel_metadata": result["sentinel_metadata"],
+            "sensor_readings": result["sensor_readings"].__dict__ if result["sensor_readings"] else None
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Analysis request failed")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/grid")
+async def analyze_grid(
+    min_lat: float = Form(...),
+    min_lng: float = Form(...),
+    max_lat: float = Form(...),
+    max_lng: float = Form(...),
+    cell_size_km: float = Form(1.0),
+    max_concurrency: int = Form(None) # Capped at settings.GRID_MAX_CONCURRENCY
+):
+    """
+    Analyze every cell of a bounding box from Sentinel tiles.
+
+    Results stream back as NDJSON, one line per cell in completion order,
+    followed by a summary line. Cells are generated lazily and at most
+    `max_concurrency` run at once, so server memory stays flat for any grid size.
+    """
+    try:
+        bbox = BoundingBox(min_lat=min_lat, min_lng=min_lng, max_lat=max_lat, max_lng=max_lng)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if cell_size_km <= 0:
+        raise HTTPException(status_code=400, detail="cell_size_km must be positive")
+
+    rows, cols = bbox.grid_shape(cell_size_km)
+    if rows * cols > settings.GRID_MAX_CELLS:
+        raise HTTPException(status_code=400, detail=f"Grid of ~{rows * cols} cells exceeds the limit of {settings.GRID_MAX_CELLS}")
+
+    concurrency = min(max_concurrency or settings.GRID_MAX_CONCURRENCY, settings.GRID_MAX_CONCURRENCY)
+    concurrency = max(1, concurrency)
+
+    return StreamingResponse(_stream_grid(bbox, cell_size_km, concurrency), media_type="application/x-ndjson")
+
+async def _analyze_cell(row: int, col: int, region: Region) -> dict:
+    # Same population mock as the single-point endpoint
+    region.population_density = random.uniform(500, 5000)
+    try:
+        if settings.COALESCE_ENABLED:
+            # Overlapping grids from concurrent users share cell analyses
+            report = await single_flight.run(analysis_key(region.lat, region.lng), lambda: pipeline.arun(region=region))
+        else:
+            report = await pipeline.arun(region=region)
+    except Exception as e:
+        return {"row": row, "col": col, "location": {"lat": region.lat, "lng": region.lng}, "error": str(e)}
+
+    return {
+        "row": row,
+        "col": col,
+        "location": {"lat": region.lat, "lng": region.lng},
+        "plastic_analysis": {
+            "count": report.plastic.object_count,
+            "density_score": report.plastic.density_score,
+        },
+        "indices": {
+            "pdi": report.heat_index.plastic_density_index,
+            "sai": report.heat_index.surface_absorption_index,
+            "wdi": report.heat_index.water_deficit_index
+        },
+        "heat_score": report.heat_index.urban_risk_index,
+        "intervention_suggestion": report.interventions[0].title if report.interventions else "No immediate action required",
+        "confidence": report.confidence["score"] if report.confidence else None
+    }
+
+async def _stream_grid(bbox: BoundingBox, cell_size_km: float, concurrency: int):
+    started = time.perf_counter()
+    cells = bbox.iter_cells(cell_size_km)
+    in_flight = set()
+    completed = errors = 0
+
+    try:
+        while True:
+            # Top up the window from the lazy cell generator
+            while len(in_flight) < concurrency:
+                cell = next(cells, None)
+                if cell is None:
+                    break
+                in_flight.add(asyncio.ensure_future(_analyze_cell(*cell)))
+            if not in_flight:
+                break
+
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                completed += 1
+                errors += "error" in result
+                yield json.dumps(result) + "\n"
+
+        yield json.dumps({
+            "done": True,
+            "cells": completed,
+            "errors": errors,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }) + "\n"
+    finally:
+        # Client went away mid-stream: don't leave orphaned analyses running
+        for task in in_flight:
+            task.cancel()
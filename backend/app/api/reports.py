@@ -0,0 +1,61 @@
+from fastapi import APIRouter, HTTPException, Query
+from app.core.config import settings
+from app.domain.region import BoundingBox
+from app.infra.report_store import ReportStore
+from app.pipelines.urban_heat_pipeline import pipeline
+
+router = APIRouter()
+
+def _store() -> ReportStore:
+    # Disabled (REPORT_STORE_ENABLED=0): don't open or create the database
+    if pipeline.report_store is None:
+        raise HTTPException(status_code=503, detail="Report history is disabled")
+    return pipeline.report_store
+
+def _bbox(min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> BoundingBox:
+    try:
+        return BoundingBox(min_lat=min_lat, min_lng=min_lng, max_lat=max_lat, max_lng=max_lng)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _limit(limit: int) -> int:
+    return max(1, min(limit, settings.REPORT_QUERY_MAX_ROWS))
+
+@router.get("/bbox")
+def reports_in_bbox(
+    min_lat: float, min_lng: float, max_lat: float, max_lng: float,
+    since: float = Query(None, description="Epoch seconds"),
+    until: float = Query(None, description="Epoch seconds"),
+    limit: int = 1000
+):
+    """
+    Every stored report inside the bounding box, newest first.
+    """
+    bbox = _bbox(min_lat, min_lng, max_lat, max_lng)
+    rows = _store().in_bbox(bbox, since=since, until=until, limit=_limit(limit))
+    return {"count": len(rows), "reports": rows}
+
+@router.get("/latest")
+def latest_reports(min_lat: float, min_lng: float, max_lat: float, max_lng: float, limit: int = 1000):
+    """
+    The most recent report of every cell inside the bounding box (map view).
+    """
+    bbox = _bbox(min_lat, min_lng, max_lat, max_lng)
+    rows = _store().latest_in_bbox(bbox, limit=_limit(limit))
+    return {"count": len(rows), "reports": rows}
+
+@router.get("/series")
+def report_series(
+    lat: float, lng: float,
+    radius_m: float = 50.0, # Snap to the nearest stored cell within this distance
+    since: float = Query(None, description="Epoch seconds"),
+    until: float = Query(None, description="Epoch seconds"),
+    limit: int = 1000
+):
+    """
+    Time series of reports for the cell nearest the point, oldest first.
+    """
+    series = _store().series(lat, lng, radius_m=radius_m, since=since, until=until, limit=_limit(limit))
+    if series is None:
+        raise HTTPException(status_code=404, detail="No stored reports near this location")
+    return {"count": len(series["reports"]), **series}
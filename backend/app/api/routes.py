@@ -1,6 +1,10 @@
 from fastapi import APIRouter
-from app.api import analyze
+from app.api import analyze, reports, sensors, system, tiles
 
 router = APIRouter()
 
 router.include_router(analyze.router, prefix="/analyze", tags=["analyze"])
+router.include_router(reports.router, prefix="/reports", tags=["reports"])
+router.include_router(sensors.router, prefix="/sensors", tags=["sensors"])
+router.include_router(tiles.router, prefix="/tiles", tags=["tiles"])
+router.include_router(system.router, prefix="/system", tags=["system"])
@@ -0,0 +1,42 @@
+import time
+from typing import List
+from fastapi import APIRouter, HTTPException, Query
+from app.core.config import settings
+from app.infra.sensor_store import sensor_store
+from app.schemas.sensor import DeviceRegistration, ReadingBatch
+
+router = APIRouter()
+
+@router.post("/devices")
+def register_devices(devices: List[DeviceRegistration]):
+    for device in devices:
+        sensor_store.register_device(device.device_id, device.lat, device.lng, calibrated=device.calibrated)
+    return {"registered": len(devices), "devices": sensor_store.device_count}
+
+@router.post("/readings")
+def ingest_readings(batch: ReadingBatch):
+    """
+    Batch ingestion of device readings. Readings from unregistered devices
+    are dropped and reported in the response.
+    """
+    now = time.time()
+    readings = batch.readings
+    stored = sensor_store.ingest(
+        [r.device_id for r in readings],
+        [r.timestamp if r.timestamp is not None else now for r in readings],
+        [r.temp_c for r in readings],
+        [r.humidity_percent for r in readings],
+        [r.pm25 for r in readings]
+    )
+    return {"received": len(readings), "stored": stored, "dropped": len(readings) - stored}
+
+@router.get("/nearby")
+def nearby_readings(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(None, gt=0, le=settings.SENSOR_MAX_RADIUS_KM)
+):
+    reading = sensor_store.aggregate(lat, lng, radius_km or settings.SENSOR_RADIUS_KM)
+    if reading is None:
+        raise HTTPException(status_code=404, detail="No calibrated devices reporting near this location")
+    return reading.__dict__
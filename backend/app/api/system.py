@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+from app.pipelines.urban_heat_pipeline import pipeline
+from app.infra.sensor_store import sensor_store
+from app.infra.risk_tiles import risk_tile_store
+from app.pipelines.single_flight import single_flight
+from app.core.startup import startup_state
+
+router = APIRouter()
+
+@router.get("/stats")
+def get_stats():
+    """
+    Runtime statistics used to tune inference settings.
+    """
+    return {
+        "vision_batching": {
+            "max_batch_size": pipeline.vision_engine.max_batch_size,
+            "max_wait_ms": pipeline.vision_engine.max_wait_s * 1000,
+            **pipeline.vision_engine.stats.snapshot()
+        } if pipeline.engines_loaded else None,
+        "incremental_analysis": pipeline.incremental_vision_engine.stats() if pipeline.engines_loaded else None,
+        "startup": startup_state.snapshot(),
+        "prescreen": pipeline.prescreen_engine.stats() if pipeline.prescreen_engine else None,
+        "detection_cache": pipeline.detection_cache.stats() if pipeline.detection_cache else None,
+        "sensor_store": sensor_store.stats(),
+        "single_flight": single_flight.stats(),
+        "risk_tiles": risk_tile_store.stats(),
+        "report_store": pipeline.report_store.stats() if pipeline.report_store else None
+    }
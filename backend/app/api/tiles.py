@@ -0,0 +1,28 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from app.core.config import settings
+from app.infra.risk_tiles import LAYERS, risk_tile_store
+
+router = APIRouter()
+
+@router.get("/{z}/{x}/{y}")
+def get_tile(z: int, x: int, y: str, request: Request, layer: str = "risk"):
+    """
+    XYZ PNG tile of the precomputed risk pyramid (`layer`: risk, pdi, sai
+    or wdi). Supports conditional requests via ETag / If-None-Match.
+    """
+    if layer not in LAYERS:
+        raise HTTPException(status_code=400, detail=f"layer must be one of {', '.join(LAYERS)}")
+    y = y[:-4] if y.endswith(".png") else y
+    if not y.isdigit():
+        raise HTTPException(status_code=404, detail="Tile not found")
+
+    tile = risk_tile_store.get(layer, z, x, int(y))
+    if tile is None:
+        raise HTTPException(status_code=404, detail="No risk data for this tile")
+    data, etag = tile
+
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={settings.RISK_TILES_MAX_AGE_S}"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (t.strip() for t in if_none_match.split(",")) or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    return Response(content=data, media_type="image/png", headers=headers)
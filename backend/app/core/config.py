@@ -4,6 +4,163 @@ class Settings:
     PROJECT_NAME: str = "AquaThermX"
     API_V1_STR: str = "/api"
     # In a real app, load these from environment variables
-    MODEL_PATH: str = "yolov8n.pt"  # Default to nano model for MVP
+    MODEL_PATH: str = os.getenv("MODEL_PATH", "yolov8n.pt")  # Default to nano model for MVP
+
+    # Inference backend: "torch" (ultralytics YOLO), "onnx" or "onnx-int8" (ONNX Runtime),
+    # or "remote" (the shared inference service).
+    # Export/quantize with scripts/export_onnx.py; compare with scripts/compare_backends.py
+    INFERENCE_BACKEND: str = os.getenv("INFERENCE_BACKEND", "torch")
+    ONNX_MODEL_PATH: str = os.getenv("ONNX_MODEL_PATH", os.path.splitext(MODEL_PATH)[0] + ".onnx")
+    ONNX_INT8_MODEL_PATH: str = os.getenv("ONNX_INT8_MODEL_PATH", os.path.splitext(MODEL_PATH)[0] + ".int8.onnx")
+    # 0 = library default
+    INFERENCE_INTRA_OP_THREADS: int = int(os.getenv("INFERENCE_INTRA_OP_THREADS", "0"))
+    INFERENCE_INTER_OP_THREADS: int = int(os.getenv("INFERENCE_INTER_OP_THREADS", "0"))
+    # Shared inference service (python -m app.infra.inference_service); API
+    # workers use it with INFERENCE_BACKEND=remote
+    INFERENCE_SERVICE_SOCKET: str = os.getenv("INFERENCE_SERVICE_SOCKET", "/tmp/aquathermx-inference.sock")
+    INFERENCE_SERVICE_BACKEND: str = os.getenv("INFERENCE_SERVICE_BACKEND", "torch")
+    INFERENCE_SERVICE_WORKERS: int = int(os.getenv("INFERENCE_SERVICE_WORKERS", "2"))
+    INFERENCE_SERVICE_CONNECT_TIMEOUT_S: float = float(os.getenv("INFERENCE_SERVICE_CONNECT_TIMEOUT_S", "30"))
+    INFERENCE_SERVICE_TIMEOUT_S: float = float(os.getenv("INFERENCE_SERVICE_TIMEOUT_S", "120"))
+    VISION_IMGSZ: int = int(os.getenv("VISION_IMGSZ", "640"))  # Model input size
+    # Local state (caches, stores); relative to the working directory like the Sentinel cache
+    DATA_DIR: str = os.getenv("DATA_DIR", "backend/data")
+
+    # Per-request stage timings in a Server-Timing response header: always when
+    # enabled, otherwise only for requests sending "X-Server-Timing: 1"
+    SERVER_TIMING_ENABLED: bool = os.getenv("SERVER_TIMING_ENABLED", "0") == "1"
+
+    # Upload limits (see app/infra/image_io.py); enforced before decoding
+    UPLOAD_MAX_BYTES: int = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+    UPLOAD_MAX_PIXELS: int = int(os.getenv("UPLOAD_MAX_PIXELS", "80000000"))
+
+    # Inference micro-batching (see app/engines/batching.py)
+    VISION_MAX_BATCH_SIZE: int = int(os.getenv("VISION_MAX_BATCH_SIZE", "8"))
+    VISION_MAX_BATCH_WAIT_MS: float = float(os.getenv("VISION_MAX_BATCH_WAIT_MS", "10"))
+
+    # Tiled sliding-window inference for large scenes (see app/engines/tiling.py)
+    VISION_TILE_SIZE: int = int(os.getenv("VISION_TILE_SIZE", "640"))
+    VISION_TILE_OVERLAP: int = int(os.getenv("VISION_TILE_OVERLAP", "64"))
+    # Images whose longest side exceeds this are analyzed tile by tile
+    VISION_TILE_THRESHOLD: int = int(os.getenv("VISION_TILE_THRESHOLD", "1280"))
+    VISION_TILE_WORKERS: int = int(os.getenv("VISION_TILE_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+    # Executor for CPU-bound pipeline stages (see app/pipelines/stages.py)
+    PIPELINE_CPU_WORKERS: int = int(os.getenv("PIPELINE_CPU_WORKERS", str(os.cpu_count() or 2)))
+
+    # Default seed for cleanup simulation detection subsampling
+    SIMULATION_SEED: int = int(os.getenv("SIMULATION_SEED", "0"))
+
+    # Single-flight coalescing of identical analysis requests (see app/pipelines/single_flight.py);
+    # finished results are reused for COALESCE_TTL_S seconds (0 = only share in-flight work)
+    COALESCE_ENABLED: bool = os.getenv("COALESCE_ENABLED", "1") == "1"
+    COALESCE_TTL_S: float = float(os.getenv("COALESCE_TTL_S", "10"))
+    COALESCE_MAX_ENTRIES: int = int(os.getenv("COALESCE_MAX_ENTRIES", "1024"))
+    # Requests within the same rounded lat/lng (4 decimals ~ 11 m) are identical
+    COALESCE_COORD_DECIMALS: int = int(os.getenv("COALESCE_COORD_DECIMALS", "4"))
+
+    # Pre-screen before inference (see app/engines/prescreen.py): uniform, cloud-covered
+    # and water-free images skip the model; large scenes only infer around water/banks
+    PRESCREEN_ENABLED: bool = os.getenv("PRESCREEN_ENABLED", "1") == "1"
+    PRESCREEN_THUMB_PX: int = int(os.getenv("PRESCREEN_THUMB_PX", "256"))
+    PRESCREEN_MIN_STD: float = float(os.getenv("PRESCREEN_MIN_STD", "2.0"))
+    # Fraction of bright, unsaturated pixels above which a tile counts as clouded over
+    PRESCREEN_CLOUD_FRACTION: float = float(os.getenv("PRESCREEN_CLOUD_FRACTION", "0.6"))
+    # Skip satellite tiles with no visible water (never applied to uploads)
+    PRESCREEN_REQUIRE_WATER: bool = os.getenv("PRESCREEN_REQUIRE_WATER", "1") == "1"
+    PRESCREEN_MIN_WATER_FRACTION: float = float(os.getenv("PRESCREEN_MIN_WATER_FRACTION", "0.002"))
+    PRESCREEN_BANK_MARGIN_PX: int = int(os.getenv("PRESCREEN_BANK_MARGIN_PX", "96"))
+    # Crop only when the region of interest is at most this fraction of the scene
+    PRESCREEN_CROP_MAX_FRACTION: float = float(os.getenv("PRESCREEN_CROP_MAX_FRACTION", "0.8"))
+
+    # Detection hotspots (see app/engines/hotspot_engine.py): grid cell size, Gaussian
+    # smoothing and the fraction of the peak density a cell needs to join a hotspot
+    HOTSPOT_CELL_PX: int = int(os.getenv("HOTSPOT_CELL_PX", "32"))
+    HOTSPOT_SIGMA_CELLS: float = float(os.getenv("HOTSPOT_SIGMA_CELLS", "1.0"))
+    HOTSPOT_THRESHOLD: float = float(os.getenv("HOTSPOT_THRESHOLD", "0.1"))
+    HOTSPOT_MIN_OBJECTS: int = int(os.getenv("HOTSPOT_MIN_OBJECTS", "3"))
+    HOTSPOT_MAX: int = int(os.getenv("HOTSPOT_MAX", "10"))
+    # Hotspots that get their own cleanup intervention
+    HOTSPOT_MAX_INTERVENTIONS: int = int(os.getenv("HOTSPOT_MAX_INTERVENTIONS", "3"))
+
+    # Content-addressed detection cache (see app/infra/detection_cache.py)
+    DETECTION_CACHE_ENABLED: bool = os.getenv("DETECTION_CACHE_ENABLED", "1") == "1"
+    DETECTION_CACHE_PATH: str = os.getenv("DETECTION_CACHE_PATH", os.path.join(DATA_DIR, "detection_cache.sqlite"))
+    DETECTION_CACHE_MEMORY_ENTRIES: int = int(os.getenv("DETECTION_CACHE_MEMORY_ENTRIES", "512"))
+    DETECTION_CACHE_DISK_ENTRIES: int = int(os.getenv("DETECTION_CACHE_DISK_ENTRIES", "50000"))
+
+    # Incremental re-analysis of revisited regions (see app/engines/incremental.py).
+    # Applies to satellite tiles fetched for a region, not to uploads.
+    INCREMENTAL_ANALYSIS_ENABLED: bool = os.getenv("INCREMENTAL_ANALYSIS_ENABLED", "0") == "1"
+    REGION_HISTORY_DIR: str = os.getenv("REGION_HISTORY_DIR", os.path.join(DATA_DIR, "regions"))
+    REGION_HISTORY_MEMORY_ENTRIES: int = int(os.getenv("REGION_HISTORY_MEMORY_ENTRIES", "256"))
+    CHANGE_BLOCK_PX: int = int(os.getenv("CHANGE_BLOCK_PX", "64"))
+    # Mean absolute gray-level difference (0-255) above which a block counts as changed
+    CHANGE_THRESHOLD: float = float(os.getenv("CHANGE_THRESHOLD", "6"))
+
+    # Persistent report history (see app/infra/report_store.py); queried via /api/reports
+    REPORT_STORE_ENABLED: bool = os.getenv("REPORT_STORE_ENABLED", "1") == "1"
+    REPORT_STORE_PATH: str = os.getenv("REPORT_STORE_PATH", os.path.join(DATA_DIR, "reports.sqlite"))
+    REPORT_STORE_BATCH_SIZE: int = int(os.getenv("REPORT_STORE_BATCH_SIZE", "256"))
+    REPORT_STORE_FLUSH_MS: float = float(os.getenv("REPORT_STORE_FLUSH_MS", "500"))
+    REPORT_STORE_QUEUE_SIZE: int = int(os.getenv("REPORT_STORE_QUEUE_SIZE", "10000"))
+    # Reports are grouped into cells by rounding lat/lng (4 decimals ~ 11 m)
+    REPORT_CELL_DECIMALS: int = int(os.getenv("REPORT_CELL_DECIMALS", "4"))
+    REPORT_QUERY_MAX_ROWS: int = int(os.getenv("REPORT_QUERY_MAX_ROWS", "10000"))
+
+    # Local Sentinel tile store (see app/infra/tile_store.py)
+    TILE_STORE_DIR: str = os.getenv("TILE_STORE_DIR", os.path.join(DATA_DIR, "tiles"))
+    TILE_INDEX_ZOOM: int = int(os.getenv("TILE_INDEX_ZOOM", "12"))
+    TILE_CACHE_MB: int = int(os.getenv("TILE_CACHE_MB", "256"))
+    # Window (pixels) cut around the requested point
+    SENTINEL_WINDOW_PX: int = int(os.getenv("SENTINEL_WINDOW_PX", "640"))
+    # Directory of scenes + sidecars that stands in for the Copernicus download
+    SENTINEL_SOURCE_DIR: str = os.getenv("SENTINEL_SOURCE_DIR", "")
+
+    # Multispectral surface stage (see app/engines/surface_engine.py): reads the
+    # tile store's "bands" layer block by block
+    SURFACE_BLOCK_PX: int = int(os.getenv("SURFACE_BLOCK_PX", "1024"))
+    SURFACE_WORKERS: int = int(os.getenv("SURFACE_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+    SURFACE_PIXEL_SIZE_M: float = float(os.getenv("SURFACE_PIXEL_SIZE_M", "10"))
+    # Fall back to simulated surface data where no band layer covers the region (demo mode)
+    SURFACE_SIMULATE_FALLBACK: bool = os.getenv("SURFACE_SIMULATE_FALLBACK", "1") == "1"
+
+    # Risk map tile pyramid (built by scripts/build_risk_tiles.py, served at /api/tiles)
+    RISK_TILES_DIR: str = os.getenv("RISK_TILES_DIR", os.path.join(DATA_DIR, "risk_tiles"))
+    # One cell per map pixel at the top zoom (~38 m at zoom 12 on the equator)
+    RISK_TILES_MAX_ZOOM: int = int(os.getenv("RISK_TILES_MAX_ZOOM", "12"))
+    RISK_TILES_MIN_ZOOM: int = int(os.getenv("RISK_TILES_MIN_ZOOM", "8"))
+    RISK_TILES_MAX_CELLS: int = int(os.getenv("RISK_TILES_MAX_CELLS", "4000000"))
+    # Population density assumed for map cells (per-request values are still mocked)
+    RISK_TILES_POPULATION_DENSITY: float = float(os.getenv("RISK_TILES_POPULATION_DENSITY", "2750"))
+    RISK_TILES_CACHE_MB: int = int(os.getenv("RISK_TILES_CACHE_MB", "64"))
+    RISK_TILES_MAX_AGE_S: int = int(os.getenv("RISK_TILES_MAX_AGE_S", "300"))
+
+    # Bounding-box grid analysis (POST /api/analyze/grid)
+    GRID_MAX_CONCURRENCY: int = int(os.getenv("GRID_MAX_CONCURRENCY", "8"))
+    GRID_MAX_CELLS: int = int(os.getenv("GRID_MAX_CELLS", "250000"))
+
+    # Ground sensor store (see app/infra/sensor_store.py)
+    SENSOR_RING_CAPACITY: int = int(os.getenv("SENSOR_RING_CAPACITY", "256"))
+    SENSOR_BUCKET_SECONDS: int = int(os.getenv("SENSOR_BUCKET_SECONDS", "60"))
+    SENSOR_WINDOW_BUCKETS: int = int(os.getenv("SENSOR_WINDOW_BUCKETS", "15"))
+    SENSOR_RADIUS_KM: float = float(os.getenv("SENSOR_RADIUS_KM", "2.0"))
+    # Largest radius accepted by GET /api/sensors/nearby
+    SENSOR_MAX_RADIUS_KM: float = float(os.getenv("SENSOR_MAX_RADIUS_KM", "50"))
+    # Readings may be stamped at most this far ahead of the server clock
+    SENSOR_MAX_CLOCK_SKEW_S: float = float(os.getenv("SENSOR_MAX_CLOCK_SKEW_S", "300"))
+    # Fall back to simulated readings where no devices report (demo mode)
+    SENSOR_SIMULATE_FALLBACK: bool = os.getenv("SENSOR_SIMULATE_FALLBACK", "1") == "1"
+
+    # Data-driven intervention rules (see app/engines/rule_engine.py); reloaded on change
+    INTERVENTION_RULES_PATH: str = os.getenv(
+        "INTERVENTION_RULES_PATH",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "engines", "intervention_rules.json")
+    )
+    INTERVENTION_RULES_RELOAD_S: float = float(os.getenv("INTERVENTION_RULES_RELOAD_S", "5"))
+
+    # Startup warm-up: dummy inference before /readyz reports ready (see app/core/startup.py)
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "1") == "1"
+    WARMUP_IMAGE_SIZE: int = int(os.getenv("WARMUP_IMAGE_SIZE", "640"))  # demo_tile size
 
 settings = Settings()
@@ -0,0 +1,184 @@
+import bisect
+import math
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Latency buckets in seconds: 1 ms .. 60 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> Tuple:
+        if len(labels) != len(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(labels[name] for name in self.labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, value: float, **labels):
+        """
+        Mirrors a total that is counted elsewhere (e.g. cache counters).
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(v)}" for key, v in items]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, (list(s[0]), s[1], s[2])) for key, s in self._series.items()]
+
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+class MetricsRegistry:
+    """
+    Minimal Prometheus registry (text exposition format 0.0.4).
+
+    Hot paths only take a short lock to bump a counter or bucket.
+    Collectors registered with `on_collect` run at scrape time to mirror
+    state kept elsewhere (cache counters, store sizes) into metrics.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def on_collect(self, fn: Callable[[], None]):
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        for collect in self._collectors:
+            collect()
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# Singleton
+registry = MetricsRegistry()
+
+# --- Application metrics ---------------------------------------------------------
+
+HTTP_REQUESTS = registry.counter("aquathermx_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+HTTP_LATENCY = registry.histogram("aquathermx_http_request_duration_seconds", "HTTP request latency.", ("method", "route"))
+
+PIPELINE_RUN_LATENCY = registry.histogram("aquathermx_pipeline_run_duration_seconds", "End-to-end stage graph latency.", ("graph",))
+STAGE_LATENCY = registry.histogram("aquathermx_pipeline_stage_duration_seconds", "Pipeline stage latency.", ("graph", "stage"))
+STAGE_ERRORS = registry.counter("aquathermx_pipeline_stage_errors_total", "Pipeline stages that raised.", ("graph", "stage"))
+
+VISION_BATCH_SIZE = registry.histogram("aquathermx_vision_batch_size", "Images per inference batch.",
+                                       buckets=(1, 2, 4, 8, 16, 32, 64))
+VISION_INFERENCE_LATENCY = registry.histogram("aquathermx_vision_inference_duration_seconds", "Inference time per batch.")
+VISION_QUEUE_WAIT = registry.histogram("aquathermx_vision_queue_wait_seconds", "Time an image waited for its batch.")
+VISION_BATCH_ERRORS = registry.counter("aquathermx_vision_batch_errors_total", "Inference batches that raised.")
+
+DETECTION_CACHE_LOOKUPS = registry.counter("aquathermx_detection_cache_lookups_total", "Detection cache lookups by result.", ("result",))
+DETECTION_CACHE_ENTRIES = registry.gauge("aquathermx_detection_cache_memory_entries", "Entries in the in-memory detection cache tier.")
+
+REPORT_STORE_WRITES = registry.counter("aquathermx_report_store_writes_total", "Reports persisted to the report store.")
+REPORT_STORE_DROPPED = registry.counter("aquathermx_report_store_dropped_total", "Reports dropped because the writer queue was full.")
+
+COALESCE_REQUESTS = registry.counter("aquathermx_coalesce_requests_total",
+                                     "Analysis requests by single-flight outcome (leader, coalesced, ttl_hit).", ("result",))
+
+PRESCREEN_OUTCOMES = registry.counter("aquathermx_prescreen_outcomes_total",
+                                      "Pre-screened images by outcome (passed, cropped, skipped_<reason>).", ("outcome",))
+PRESCREEN_SAVED_SECONDS = registry.counter("aquathermx_prescreen_saved_seconds_total",
+                                           "Estimated inference time avoided by pre-screen skips and crops.")
@@ -0,0 +1,68 @@
+import logging
+import threading
+import time
+
+# Captured when this module is first imported (main.py imports it first)
+PROCESS_IMPORT_STARTED = time.perf_counter()
+
+class StartupState:
+    """
+    Tracks cold-start progress: phase timings (ms since import started) and
+    whether the app is ready to serve traffic.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.error = None
+        self.timings_ms = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def mark(self, phase: str, started: float):
+        with self._lock:
+            self.timings_ms[phase] = round((time.perf_counter() - started) * 1000, 1)
+
+    def set_ready(self):
+        with self._lock:
+            self.timings_ms["time_to_ready"] = round((time.perf_counter() - PROCESS_IMPORT_STARTED) * 1000, 1)
+            self.ready = True
+        self.logger.info(f"Ready to serve; startup timings (ms): {self.timings_ms}")
+
+    def set_failed(self, error: Exception):
+        with self._lock:
+            self.error = f"{type(error).__name__}: {error}"
+        self.logger.exception("Warm-up failed")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"ready": self.ready, "error": self.error, "timings_ms": dict(self.timings_ms)}
+
+startup_state = StartupState()
+
+def warm_up(pipeline, settings):
+    """
+    Loads the model and runs one dummy inference at demo-tile size so the
+    first real request doesn't pay weight loading, lazy init and first-call
+    allocation costs. Runs on a background thread; readiness flips when done.
+    """
+    try:
+        started = time.perf_counter()
+        pipeline.load_engines()
+        startup_state.mark("engine_load", started)
+
+        if settings.WARMUP_ENABLED:
+            from PIL import Image
+            started = time.perf_counter()
+            size = settings.WARMUP_IMAGE_SIZE
+            # Goes through the batcher so its worker thread is started too
+            pipeline.vision_engine.analyze(Image.new("RGB", (size, size), color=(73, 109, 137)))
+            startup_state.mark("warmup_inference", started)
+
+        startup_state.set_ready()
+    except Exception as e:
+        startup_state.set_failed(e)
+
+def start_warm_up(pipeline, settings) -> threading.Thread:
+    thread = threading.Thread(target=warm_up, args=(pipeline, settings), name="warm-up", daemon=True)
+    thread.start()
+    return thread
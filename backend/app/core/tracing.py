@@ -0,0 +1,65 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+class RequestTrace:
+    """
+    Span timings collected while serving one request, rendered as a
+    Server-Timing header. Spans with the same name (e.g. the vision stage of
+    every grid cell) are summed.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._spans: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, ms: float):
+        with self._lock:
+            span = self._spans.setdefault(name, [0.0, 0])
+            span[0] += ms
+            span[1] += 1
+
+    def spans(self) -> Dict[str, dict]:
+        with self._lock:
+            return {name: {"ms": round(ms, 2), "count": n} for name, (ms, n) in self._spans.items()}
+
+    def server_timing(self) -> str:
+        entries = [f"{name};dur={s['ms']}" + (f';desc="x{s["count"]}"' if s["count"] > 1 else "")
+                   for name, s in self.spans().items()]
+        entries.append(f"total;dur={round((time.perf_counter() - self.started) * 1000, 2)}")
+        return ", ".join(entries)
+
+# The trace of the request being served, if timing is enabled for it. asyncio
+# tasks copy the context when created, so pipeline stages see it too.
+_current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar("request_trace", default=None)
+
+def begin_trace() -> contextvars.Token:
+    return _current_trace.set(RequestTrace())
+
+def end_trace(token: contextvars.Token) -> Optional[RequestTrace]:
+    trace = _current_trace.get()
+    _current_trace.reset(token)
+    return trace
+
+def record_span(name: str, ms: float):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, ms)
+
+@contextmanager
+def span(name: str, histogram=None, **labels):
+    """
+    Times a block into the current request trace and, optionally, into a
+    latency histogram.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        record_span(name, elapsed * 1000)
+        if histogram is not None:
+            histogram.observe(elapsed, **labels)
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+import numpy as np
 
 @dataclass
 class HeatIndex:
@@ -8,3 +9,25 @@ class HeatIndex:
     
     # Aggregated Score
     urban_risk_index: float # 0-10
+
+@dataclass
+class HeatIndexBatch:
+    """
+    Column-oriented HeatIndex for many cells/scenarios at once.
+    Every field is a float array of the same length.
+    """
+    plastic_density_index: np.ndarray
+    surface_absorption_index: np.ndarray
+    water_deficit_index: np.ndarray
+    urban_risk_index: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.urban_risk_index)
+
+    def row(self, i: int) -> HeatIndex:
+        return HeatIndex(
+            plastic_density_index=float(self.plastic_density_index[i]),
+            surface_absorption_index=float(self.surface_absorption_index[i]),
+            water_deficit_index=float(self.water_deficit_index[i]),
+            urban_risk_index=float(self.urban_risk_index[i])
+        )
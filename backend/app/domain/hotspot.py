@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+@dataclass
+class Hotspot:
+    """
+    A cluster of detections. Pixel coordinates are in the analyzed image's
+    (full-resolution) frame; lat/lng are set when the image is tied to a region.
+    """
+    rank: int
+    object_count: int
+    share: float  # Fraction of all detections in the image
+    centroid: Tuple[float, float]  # (x, y) mean of detection centers
+    extent: List[float]  # [x1, y1, x2, y2] of the member boxes
+    density_score: float  # Objects per 10k px² of extent, 0-10 (same scale as PlasticAnalysis)
+    mean_confidence: float
+    lat: Optional[float] = None
+    lng: Optional[float] = None
+    extent_m2: Optional[float] = None
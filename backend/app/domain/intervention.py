@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from enum import Enum
+from typing import Optional, Tuple
 
 class UrgencyLevel(Enum):
     LOW = "low"
@@ -13,10 +14,11 @@ class ActionType(Enum):
     DRAINAGE = "drainage"
     POLICY = "policy"
 
-@dataclass
+@dataclass(frozen=True)  # Shared between reports (interned by the rule engine)
 class Intervention:
     title: str
     description: str
     urgency: UrgencyLevel
     action_type: ActionType
     estimated_impact: str  # e.g., "Reduces local temp by 2C"
+    location: Optional[Tuple[float, float]] = None  # (lat, lng) of a site-specific action
@@ -1,5 +1,6 @@
-from dataclasses import dataclass, field
-from typing import List, Dict, Any
+from dataclasses import dataclass, field, replace
+from typing import List, Dict, Any, Optional
+import numpy as np
 
 @dataclass
 class DetectedObject:
@@ -7,8 +8,64 @@ class DetectedObject:
     confidence: float
     box: List[float]  # [x1, y1, x2, y2]
 
-@dataclass
+def _empty_boxes() -> np.ndarray:
+    return np.zeros((0, 4), dtype=np.float32)
+
+def _empty_confidences() -> np.ndarray:
+    return np.zeros(0, dtype=np.float32)
+
+def _empty_class_ids() -> np.ndarray:
+    return np.zeros(0, dtype=np.int64)
+
+@dataclass(eq=False)
 class PlasticAnalysis:
+    """
+    Detections are held column-wise, straight from the model output:
+    boxes (N, 4) xyxy, confidences (N,), class_ids (N,). Per-box objects
+    are only built on demand (`detections`, `to_dict`).
+    """
     object_count: int
     density_score: float  # Normalized 0-10 based on coverage
-    detections: List[DetectedObject] = field(default_factory=list)
+    boxes: np.ndarray = field(default_factory=_empty_boxes, repr=False)
+    confidences: np.ndarray = field(default_factory=_empty_confidences, repr=False)
+    class_ids: np.ndarray = field(default_factory=_empty_class_ids, repr=False)
+    class_names: Dict[int, str] = field(default_factory=dict, repr=False)
+    # Set when the pre-screen ruled the image out and inference was skipped
+    skip_reason: Optional[str] = None
+
+    @property
+    def detection_count(self) -> int:
+        return len(self.confidences)
+
+    @property
+    def detections(self) -> List[DetectedObject]:
+        return [
+            DetectedObject(label=self.label(cls), confidence=conf, box=box)
+            for box, conf, cls in zip(self.boxes.tolist(), self.confidences.tolist(), self.class_ids.tolist())
+        ]
+
+    def label(self, class_id: int) -> str:
+        return self.class_names.get(class_id, str(class_id))
+
+    def select(self, mask: np.ndarray, **changes) -> "PlasticAnalysis":
+        """
+        New analysis keeping the detections selected by `mask` (boolean or
+        index array); other fields can be overridden via `changes`.
+        """
+        return replace(
+            self,
+            boxes=self.boxes[mask],
+            confidences=self.confidences[mask],
+            class_ids=self.class_ids[mask],
+            **changes
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "object_count": self.object_count,
+            "density_score": self.density_score,
+            "skip_reason": self.skip_reason,
+            "detections": [
+                {"label": d.label, "confidence": d.confidence, "box": d.box} for d in self.detections
+            ],
+        }
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
-from typing import Optional
+import math
+from typing import Iterator, Optional
 
 @dataclass
 class Region:
@@ -8,3 +9,47 @@ class Region:
     name: Optional[str] = None
     area_km2: float = 1.0  # Default to 1 sq km for tile analysis
     population_density: float = 0.0
+
+KM_PER_DEG_LAT = 111.32
+
+@dataclass
+class BoundingBox:
+    min_lat: float
+    min_lng: float
+    max_lat: float
+    max_lng: float
+
+    def __post_init__(self):
+        if not (-90 <= self.min_lat < self.max_lat <= 90) or not (-180 <= self.min_lng < self.max_lng <= 180):
+            raise ValueError("Invalid bounding box")
+
+    def grid_shape(self, cell_size_km: float):
+        """
+        (rows, cols) of the grid `iter_cells` produces. Column count uses the
+        widest (most equatorward) latitude of the box.
+        """
+        dlat = cell_size_km / KM_PER_DEG_LAT
+        rows = math.ceil((self.max_lat - self.min_lat) / dlat)
+        widest_lat = 0.0 if self.min_lat <= 0 <= self.max_lat else min(abs(self.min_lat), abs(self.max_lat))
+        cols = math.ceil((self.max_lng - self.min_lng) / self._dlng(widest_lat, cell_size_km))
+        return rows, cols
+
+    def iter_cells(self, cell_size_km: float) -> Iterator[tuple]:
+        """
+        Lazily yields (row, col, Region) for square cells of `cell_size_km`,
+        centered on each cell. Longitude spacing widens with latitude so cells
+        stay roughly square on the ground.
+        """
+        dlat = cell_size_km / KM_PER_DEG_LAT
+        rows = math.ceil((self.max_lat - self.min_lat) / dlat)
+        for row in range(rows):
+            lat = min(self.min_lat + (row + 0.5) * dlat, self.max_lat)
+            dlng = self._dlng(lat, cell_size_km)
+            cols = math.ceil((self.max_lng - self.min_lng) / dlng)
+            for col in range(cols):
+                lng = min(self.min_lng + (col + 0.5) * dlng, self.max_lng)
+                yield row, col, Region(lat=lat, lng=lng, area_km2=cell_size_km * cell_size_km)
+
+    @staticmethod
+    def _dlng(lat: float, cell_size_km: float) -> float:
+        return cell_size_km / (KM_PER_DEG_LAT * max(math.cos(math.radians(lat)), 1e-6))
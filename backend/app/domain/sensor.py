@@ -12,3 +12,9 @@ class SensorReading:
     pm25_level: float
     is_calibrated: bool
     timestamp: str
+
+    # Rolling-window extremes (only set for readings from the sensor store)
+    max_temp_c: Optional[float] = None
+    max_humidity_percent: Optional[float] = None
+    max_pm25_level: Optional[float] = None
+    window_minutes: Optional[float] = None
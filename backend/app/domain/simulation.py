@@ -0,0 +1,17 @@
+from dataclasses import dataclass, field
+from typing import List
+from app.domain.heat import HeatIndex
+from app.domain.intervention import Intervention
+
+@dataclass
+class CleanupScenario:
+    """
+    Outcome of one cleanup "what-if": `simulation_factor` is the fraction
+    of plastic remaining (1.0 = no cleanup, 0.0 = full removal).
+    """
+    simulation_factor: float
+    object_count: int
+    density_score: float
+    heat_index: HeatIndex
+    interventions: List[Intervention] = field(default_factory=list)
+    confidence: dict = field(default_factory=dict)
@@ -0,0 +1,135 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import List
+from PIL import Image
+from app.core.metrics import VISION_BATCH_ERRORS, VISION_BATCH_SIZE, VISION_INFERENCE_LATENCY, VISION_QUEUE_WAIT
+from app.domain.plastic import PlasticAnalysis
+
+@dataclass
+class _PendingImage:
+    image: Image.Image
+    future: Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+class BatchStats:
+    """
+    Rolling statistics for the micro-batcher, used to tune the
+    batch size / latency trade-off.
+    """
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.images = 0
+        self.errors = 0
+        self.size_histogram = {}
+        self._waits_ms = deque(maxlen=window)
+        self._inference_ms = deque(maxlen=window)
+
+    def record(self, batch_size: int, waits_ms: List[float], inference_ms: float, failed: bool = False):
+        with self._lock:
+            self.batches += 1
+            self.images += batch_size
+            self.errors += int(failed)
+            self.size_histogram[batch_size] = self.size_histogram.get(batch_size, 0) + 1
+            self._waits_ms.extend(waits_ms)
+            self._inference_ms.append(inference_ms)
+
+        VISION_BATCH_SIZE.observe(batch_size)
+        VISION_INFERENCE_LATENCY.observe(inference_ms / 1000)
+        for wait_ms in waits_ms:
+            VISION_QUEUE_WAIT.observe(wait_ms / 1000)
+        if failed:
+            VISION_BATCH_ERRORS.inc()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits_ms)
+            inference = list(self._inference_ms)
+            return {
+                "batches": self.batches,
+                "images": self.images,
+                "errors": self.errors,
+                "mean_batch_size": round(self.images / self.batches, 2) if self.batches else 0.0,
+                "batch_size_histogram": dict(sorted(self.size_histogram.items())),
+                "queue_wait_ms": {
+                    "mean": round(sum(waits) / len(waits), 2) if waits else 0.0,
+                    "p95": round(waits[int(0.95 * (len(waits) - 1))], 2) if waits else 0.0,
+                    "max": round(waits[-1], 2) if waits else 0.0,
+                },
+                "inference_ms_mean": round(sum(inference) / len(inference), 2) if inference else 0.0,
+            }
+
+class BatchingVisionEngine:
+    """
+    Micro-batching front-end for VisionEngine.
+
+    Concurrent callers enqueue images; a single worker thread drains the queue
+    into YOLO batches of up to `max_batch_size` images, waiting at most
+    `max_wait_ms` (measured from the oldest queued image) for a batch to fill.
+    Each caller gets back its own PlasticAnalysis.
+    """
+
+    def __init__(self, engine, max_batch_size: int = 8, max_wait_ms: float = 10.0):
+        self.engine = engine
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max(0.0, max_wait_ms) / 1000.0
+        self.stats = BatchStats()
+        self.logger = logging.getLogger(__name__)
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def analyze(self, image: Image.Image) -> PlasticAnalysis:
+        return self.submit(image).result()
+
+    def submit(self, image: Image.Image) -> Future:
+        self._ensure_worker()
+        future = Future()
+        self._queue.put(_PendingImage(image=image, future=future))
+        return future
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="vision-batcher", daemon=True)
+                self._worker.start()
+
+    def _collect_batch(self) -> List[_PendingImage]:
+        first = self._queue.get()
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait_s
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                # Always drain whatever is already queued, even past the deadline
+                batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            started = time.perf_counter()
+            waits_ms = [(started - item.enqueued_at) * 1000 for item in batch]
+
+            try:
+                analyses = self.engine.analyze_batch([item.image for item in batch])
+            except Exception as e:
+                self.logger.exception("Batched inference failed for %d image(s)", len(batch))
+                for item in batch:
+                    item.future.set_exception(e)
+                self.stats.record(len(batch), waits_ms, (time.perf_counter() - started) * 1000, failed=True)
+                continue
+
+            for item, analysis in zip(batch, analyses):
+                item.future.set_result(analysis)
+            self.stats.record(len(batch), waits_ms, (time.perf_counter() - started) * 1000)
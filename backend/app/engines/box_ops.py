@@ -0,0 +1,85 @@
+import numpy as np
+
+def pairwise_overlap(box: np.ndarray, boxes: np.ndarray, metric: str = "iou") -> np.ndarray:
+    """
+    Overlap between one [x1, y1, x2, y2] box and an (N, 4) array of boxes.
+    metric="iou" is intersection-over-union; metric="ios" is
+    intersection-over-smaller, which also catches an object cut in two
+    at a tile seam (the partial box sits inside the full one).
+    """
+    ix1 = np.maximum(box[0], boxes[:, 0])
+    iy1 = np.maximum(box[1], boxes[:, 1])
+    ix2 = np.minimum(box[2], boxes[:, 2])
+    iy2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    if metric == "ios":
+        denom = np.minimum(area, areas)
+    else:
+        denom = area + areas - inter
+    return inter / np.maximum(denom, 1e-9)
+
+def nms(boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray = None,
+        threshold: float = 0.5, metric: str = "iou") -> np.ndarray:
+    """
+    Greedy non-maximum suppression. Returns indices of the kept boxes,
+    highest score first. If `class_ids` is given, boxes only suppress
+    boxes of the same class.
+    """
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    boxes = np.asarray(boxes, dtype=np.float64)
+    if class_ids is not None:
+        # Shift each class into its own coordinate range so classes never overlap
+        offset = boxes.max() + 1.0
+        boxes = boxes + (np.asarray(class_ids, dtype=np.float64) * offset)[:, None]
+
+    order = np.argsort(-np.asarray(scores), kind="stable")
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        if order.size == 1:
+            break
+        overlap = pairwise_overlap(boxes[i], boxes[order[1:]], metric)
+        order = order[1:][overlap <= threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+def tile_windows(width: int, height: int, tile_size: int, overlap: int):
+    """
+    Yields overlapping (x1, y1, x2, y2) windows covering the full image.
+    The last row/column is shifted inwards so every tile is full size
+    (unless the image itself is smaller than a tile).
+    """
+    step = max(1, tile_size - overlap)
+    for y in _axis_starts(height, tile_size, step):
+        for x in _axis_starts(width, tile_size, step):
+            yield (x, y, min(x + tile_size, width), min(y + tile_size, height))
+
+def tile_cores(width: int, height: int, tile_size: int, overlap: int):
+    """
+    The part of the image each tile_windows() window owns: windows split
+    their overlaps down the middle, so cores partition the image. Same
+    order as tile_windows().
+    """
+    step = max(1, tile_size - overlap)
+    rows = _axis_cores(_axis_starts(height, tile_size, step), tile_size, height)
+    cols = _axis_cores(_axis_starts(width, tile_size, step), tile_size, width)
+    for y1, y2 in rows:
+        for x1, x2 in cols:
+            yield (x1, y1, x2, y2)
+
+def _axis_cores(starts, tile_size: int, length: int):
+    bounds = [0] + [(start + prev + tile_size) // 2 for prev, start in zip(starts, starts[1:])] + [length]
+    return list(zip(bounds, bounds[1:]))
+
+def _axis_starts(length: int, tile_size: int, step: int):
+    if length <= tile_size:
+        return [0]
+    starts = list(range(0, length - tile_size + 1, step))
+    if starts[-1] + tile_size < length:
+        starts.append(length - tile_size)
+    return starts
@@ -1,35 +1,77 @@
+from typing import List
+import numpy as np
 from app.domain.plastic import PlasticAnalysis
 
+# Pre-screen skip reasons (see app/engines/prescreen.py): score and explanation
+SKIPPED = {
+    "uniform": (0.3, "Pre-screen: Uniform tile, no usable imagery (inference skipped)"),
+    "cloud": (0.4, "Pre-screen: Cloud-covered tile (inference skipped)"),
+    "no_water": (0.8, "Pre-screen: No water or river banks in view (inference skipped)"),
+}
+
+# Image source: reason shown first in every confidence breakdown
+SOURCES = {
+    "sentinel": "Source: Sentinel-2 L2A (Verified)",
+    "upload": "Source: User upload (Unverified)",
+}
+
 class ConfidenceEngine:
     @staticmethod
-    def evaluate(plastic: PlasticAnalysis, environmental_data: dict = None) -> dict:
+    def evaluate(plastic: PlasticAnalysis, environmental_data: dict = None, source: str = "sentinel") -> dict:
         """
         Evaluate confidence logic. Returns score and list of reasons.
         """
-        reasons = []
+        count = plastic.detection_count
+        conf_sum = plastic.confidences.sum(dtype=np.float64)
+        return ConfidenceEngine.evaluate_batch(np.asarray([count]), np.asarray([conf_sum]), skip_reason=plastic.skip_reason, source=source)[0]
+
+    @staticmethod
+    def evaluate_batch(detection_counts: np.ndarray, confidence_sums: np.ndarray, skip_reason: str = None,
+                       source: str = "sentinel") -> List[dict]:
+        """
+        Vectorized `evaluate` over many detection sets, each summarized by its
+        detection count and the sum of its detection confidences.
+        `skip_reason` marks sets from an image the pre-screen ruled out;
+        `source` is where the image came from (a key of SOURCES).
+        """
+        source_reason = SOURCES[source]
+        if skip_reason is not None:
+            score, reason = SKIPPED.get(skip_reason, (0.5, f"Pre-screen: {skip_reason} (inference skipped)"))
+            return [{
+                "score": score,
+                "reasons": [source_reason, reason],
+                "level": "High" if score > 0.8 else "Medium" if score > 0.5 else "Low"
+            } for _ in range(len(detection_counts))]
+
+        counts = np.asarray(detection_counts)
+        sums = np.asarray(confidence_sums, dtype=np.float64)
         base_score = 0.85 # Baseline confidence for Sentinel-2
-        
-        # 1. Image Quality / Source Confidence
-        reasons.append("Source: Sentinel-2 L2A (Verified)")
-        
+
         # 2. Detection Consistency
-        if not plastic.detections:
-            score = base_score + 0.05
-            reasons.append("Clean region: High certainty of no pollution")
-        else:
-            avg_conf = sum(d.confidence for d in plastic.detections) / len(plastic.detections)
-            score = (base_score + avg_conf) / 2
-            reasons.append(f"Object Detection Confidence: {int(avg_conf*100)}%")
-            
-            if len(plastic.detections) < 3:
-                 reasons.append("Sparse detections: Potential false positives")
-                 score -= 0.1
-        
-        # 3. Environmental Factors (Mocked logic for now)
-        reasons.append("Weather: Clear (< 10% Cloud Cover)")
-
-        return {
-            "score": round(min(max(score, 0.0), 1.0), 2),
-            "reasons": reasons,
-            "level": "High" if score > 0.8 else "Medium" if score > 0.5 else "Low"
-        }
+        empty = counts == 0
+        avg_conf = np.divide(sums, counts, out=np.zeros(len(counts)), where=~empty)
+        scores = np.where(empty, base_score + 0.05, (base_score + avg_conf) / 2)
+        sparse = ~empty & (counts < 3)
+        scores = np.where(sparse, scores - 0.1, scores)
+
+        results = []
+        for i in range(len(counts)):
+            # 1. Image Quality / Source Confidence
+            reasons = [source_reason]
+            if empty[i]:
+                reasons.append("Clean region: High certainty of no pollution")
+            else:
+                reasons.append(f"Object Detection Confidence: {int(avg_conf[i]*100)}%")
+                if sparse[i]:
+                    reasons.append("Sparse detections: Potential false positives")
+
+            # 3. Environmental Factors (Mocked logic for now)
+            reasons.append("Weather: Clear (< 10% Cloud Cover)")
+
+            score = float(scores[i])
+            results.append({
+                "score": round(min(max(score, 0.0), 1.0), 2),
+                "reasons": reasons,
+                "level": "High" if score > 0.8 else "Medium" if score > 0.5 else "Low"
+            })
+        return results
@@ -1,15 +1,41 @@
+import numpy as np
 from app.domain.plastic import PlasticAnalysis
 from app.domain.surface import SurfaceData
-from app.domain.heat import HeatIndex
-from app.scoring.indices import PlasticIndexScorer, SurfaceIndexScorer, WaterDeficitScorer
+from app.domain.heat import HeatIndex, HeatIndexBatch
+from app.scoring.indices import PlasticIndexScorer, SurfaceIndexScorer, WaterDeficitScorer, round_like_python
 from app.domain.sensor import SensorReading
 
 class HeatEngine:
     @staticmethod
     def assess_risk(plastic: PlasticAnalysis, surface: SurfaceData, pop_density: float, sensor_data: SensorReading = None) -> HeatIndex:
-        pdi = PlasticIndexScorer.calculate(plastic)
-        sai = SurfaceIndexScorer.calculate(surface)
-        wdi = WaterDeficitScorer.calculate(surface, pop_density)
+        batch = HeatEngine.assess_risk_batch(
+            density_scores=[plastic.density_score],
+            surface_temp_c=[surface.surface_temp_c],
+            green_cover_index=[surface.green_cover_index],
+            impervious_surface_index=[surface.impervious_surface_index],
+            population_density=[pop_density],
+            ambient_temp_c=[sensor_data.ambient_temp_c] if sensor_data else None
+        )
+        return batch.row(0)
+
+    @staticmethod
+    def assess_risk_batch(density_scores, surface_temp_c, green_cover_index, impervious_surface_index,
+                          population_density, ambient_temp_c=None) -> HeatIndexBatch:
+        """
+        Scores many cells at once from columnar inputs. Arguments are
+        broadcast against each other, so shared context (e.g. one surface for
+        a whole cleanup sweep) can be passed as a scalar. NaN in
+        `ambient_temp_c` means no sensor data for that cell.
+        """
+        density_scores, surface_temp_c, green_cover_index, impervious_surface_index, population_density = np.broadcast_arrays(
+            *(np.asarray(v, dtype=np.float64) for v in (
+                density_scores, surface_temp_c, green_cover_index, impervious_surface_index, population_density
+            ))
+        )
+
+        pdi = PlasticIndexScorer.calculate_batch(density_scores)
+        sai = SurfaceIndexScorer.calculate_batch(impervious_surface_index, green_cover_index)
+        wdi = WaterDeficitScorer.calculate_batch(surface_temp_c, population_density)
         
         # Base Satellite Risk Score (0-10)
         satellite_risk = (pdi * 0.4) + (sai * 0.3) + (wdi * 0.3)
@@ -17,17 +43,19 @@ class HeatEngine:
         final_risk = satellite_risk
         
         # If sensor data is available, fuse it (Ground Truth Calibration)
-        if sensor_data:
+        if ambient_temp_c is not None:
+            ambient = np.broadcast_to(np.asarray(ambient_temp_c, dtype=np.float64), pdi.shape)
             # Simple Heat Index-like component (0-10 scale approximation)
             # High temp (>35C) & High humidity (>70%) = High Risk
-            temp_score = min(10, max(0, (sensor_data.ambient_temp_c - 25) * 0.8))
+            temp_score = np.clip((ambient - 25) * 0.8, 0, 10)
             
             # Fuse: 70% Satellite (Macro), 30% Sensor (Micro)
-            final_risk = (satellite_risk * 0.7) + (temp_score * 0.3)
+            fused = (satellite_risk * 0.7) + (temp_score * 0.3)
+            final_risk = np.where(np.isnan(ambient), satellite_risk, fused)
 
-        return HeatIndex(
+        return HeatIndexBatch(
             plastic_density_index=pdi,
             surface_absorption_index=sai,
             water_deficit_index=wdi,
-            urban_risk_index=round(final_risk, 2)
+            urban_risk_index=round_like_python(final_risk, 2)
         )
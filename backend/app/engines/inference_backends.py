@@ -0,0 +1,314 @@
+import ast
+import itertools
+import logging
+import socket
+import threading
+import time
+import weakref
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+import numpy as np
+from PIL import Image
+from app.core.config import settings
+from app.engines.box_ops import nms
+
+# Raw model output for one image: boxes (N, 4) xyxy, confidences (N,), class ids (N,)
+RawDetections = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+BACKENDS = ("torch", "onnx", "onnx-int8", "remote")
+
+class InferenceBackend:
+    """
+    Runs the detector on a list of PIL images and returns raw detections in
+    original image coordinates. `names` maps class id -> label.
+    """
+    name: str = "base"
+    names: Dict[int, str] = {}
+
+    def predict(self, images: List[Image.Image]) -> List[RawDetections]:
+        raise NotImplementedError
+
+class TorchBackend(InferenceBackend):
+    """
+    The PyTorch ultralytics.YOLO model (reference backend).
+    """
+    name = "torch"
+
+    def __init__(self, model_path: str, intra_op_threads: int = 0):
+        # Imported here: pulling in ultralytics/torch dominates import time
+        from ultralytics import YOLO
+        if intra_op_threads > 0:
+            import torch
+            torch.set_num_threads(intra_op_threads)
+        self.model = YOLO(model_path)
+        self.names = self.model.names
+
+    def predict(self, images: List[Image.Image]) -> List[RawDetections]:
+        results = self.model(list(images))
+        return [self._extract(r) for r in results]
+
+    @staticmethod
+    def _extract(result) -> RawDetections:
+        boxes = result.boxes
+        return (
+            boxes.xyxy.cpu().numpy().reshape(-1, 4),
+            boxes.conf.cpu().numpy().reshape(-1),
+            boxes.cls.cpu().numpy().reshape(-1).astype(np.int64)
+        )
+
+class OnnxBackend(InferenceBackend):
+    """
+    A YOLOv8 model exported to ONNX (fp32 or int8-quantized, see
+    scripts/export_onnx.py) running under ONNX Runtime on CPU.
+
+    Pre/post-processing mirrors ultralytics: letterbox to `imgsz`, then
+    confidence filtering and class-aware NMS on the raw (4 + classes, N)
+    output, mapped back to original image coordinates.
+    """
+    name = "onnx"
+
+    def __init__(self, model_path: str, intra_op_threads: int = 0, inter_op_threads: int = 0,
+                 imgsz: int = 640, conf: float = 0.25, iou: float = 0.7):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError("INFERENCE_BACKEND=onnx requires the 'onnxruntime' package") from e
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+        if inter_op_threads > 0:
+            options.inter_op_num_threads = inter_op_threads
+
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input = self.session.get_inputs()[0]
+        # Exports without dynamic=True have a fixed batch of 1
+        self.fixed_batch = isinstance(self.input.shape[0], int)
+        self.imgsz = imgsz
+        self.conf = conf
+        self.iou = iou
+        self.names = self._read_names()
+
+    def _read_names(self) -> Dict[int, str]:
+        # ultralytics stores names as a dict literal in the model metadata
+        raw = self.session.get_modelmeta().custom_metadata_map.get("names")
+        if raw:
+            return {int(k): v for k, v in ast.literal_eval(raw).items()}
+        logging.getLogger(__name__).warning("ONNX model has no class names metadata; using class ids")
+        return _IdNames()
+
+    def predict(self, images: List[Image.Image]) -> List[RawDetections]:
+        letterboxed = [self._letterbox(image) for image in images]
+        batch = np.stack([tensor for tensor, _, _ in letterboxed])
+
+        if self.fixed_batch:
+            outputs = np.concatenate([self.session.run(None, {self.input.name: batch[i:i + 1]})[0] for i in range(len(batch))])
+        else:
+            outputs = self.session.run(None, {self.input.name: batch})[0]
+
+        return [
+            self._postprocess(output, scale, pad, image.size)
+            for output, (_, scale, pad), image in zip(outputs, letterboxed, images)
+        ]
+
+    def _letterbox(self, image: Image.Image):
+        w, h = image.size
+        scale = min(self.imgsz / w, self.imgsz / h)
+        nw, nh = max(1, round(w * scale)), max(1, round(h * scale))
+        pad = ((self.imgsz - nw) // 2, (self.imgsz - nh) // 2)
+
+        canvas = np.full((self.imgsz, self.imgsz, 3), 114, dtype=np.uint8)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        resized = image.resize((nw, nh), Image.BILINEAR)
+        canvas[pad[1]:pad[1] + nh, pad[0]:pad[0] + nw] = np.asarray(resized)
+        tensor = canvas.transpose(2, 0, 1).astype(np.float32) / 255.0
+        return tensor, scale, pad
+
+    def _postprocess(self, output: np.ndarray, scale: float, pad, size) -> RawDetections:
+        preds = output.T  # (N, 4 + classes)
+        scores = preds[:, 4:]
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(scores)), class_ids]
+        keep = confidences > self.conf
+        preds, class_ids, confidences = preds[keep], class_ids[keep], confidences[keep]
+
+        cx, cy, bw, bh = preds[:, 0], preds[:, 1], preds[:, 2], preds[:, 3]
+        boxes = np.stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], axis=1)
+        boxes -= np.asarray([pad[0], pad[1], pad[0], pad[1]], dtype=boxes.dtype)
+        boxes /= scale
+        w, h = size
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, w)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, h)
+
+        kept = nms(boxes, confidences, class_ids, threshold=self.iou)[:300]
+        return (
+            boxes[kept].astype(np.float32, copy=False),
+            confidences[kept].astype(np.float32, copy=False),
+            class_ids[kept].astype(np.int64, copy=False)
+        )
+
+class RemoteBackend(InferenceBackend):
+    """
+    Client of the shared inference service (app/infra/inference_service.py).
+
+    Pixels are written into a shared memory segment owned by this client,
+    which grows as needed and is reused across calls; only the segment name
+    and image geometry go over the Unix socket.
+
+    Each request carries an id that the reply must echo. After any failure
+    (timeout, service restart, mismatched reply) the socket is dropped and
+    the next call reconnects, so a late reply can never be read as the
+    answer to a newer request. A failed predict also retires its segment: a
+    worker may still be reading it, so it is never written to again.
+    """
+    name = "remote"
+    # Reconnect budget after a failure; the initial connect uses connect_timeout_s
+    RECONNECT_TIMEOUT_S = 5.0
+    # The service answers a timed-out job itself; wait a little longer for that reply
+    TIMEOUT_MARGIN_S = 5.0
+
+    def __init__(self, socket_path: str, connect_timeout_s: float = 30.0, request_timeout_s: float = 120.0):
+        self.socket_path = socket_path
+        self.request_timeout_s = request_timeout_s
+        self._lock = threading.Lock()
+        self._segment = None
+        self._finalizer = None
+        self._request_ids = itertools.count()
+        self._sock = self._connect(connect_timeout_s)
+
+        hello, _ = self._request({"op": "hello"})
+        self.names = _IdNames({int(k): v for k, v in hello["names"].items()})
+        self.service_backend = hello["backend"]
+
+    def _connect(self, timeout_s: float) -> socket.socket:
+        # The service may still be loading its models when the API starts
+        deadline = time.monotonic() + timeout_s
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.socket_path)
+                sock.settimeout(self.request_timeout_s + self.TIMEOUT_MARGIN_S)
+                return sock
+            except OSError as e:
+                sock.close()
+                if time.monotonic() >= deadline:
+                    raise RuntimeError(f"Inference service not reachable at {self.socket_path}: {e}") from e
+                time.sleep(0.5)
+
+    def _request(self, header: dict):
+        from app.infra.inference_protocol import recv_message, send_message
+        if self._sock is None:
+            self._sock = self._connect(self.RECONNECT_TIMEOUT_S)
+        request_id = next(self._request_ids)
+        try:
+            try:
+                send_message(self._sock, {**header, "id": request_id})
+            except ConnectionError:
+                # Peer gone before the request went out (service restarted):
+                # nothing was submitted, so resend once on a new connection
+                self._sock.close()
+                self._sock = self._connect(self.RECONNECT_TIMEOUT_S)
+                send_message(self._sock, {**header, "id": request_id})
+            response, payload = recv_message(self._sock)
+            if response.get("id") != request_id:
+                raise RuntimeError(f"Inference service replied to request {response.get('id')}, expected {request_id}")
+        except Exception:
+            # The stream may hold a partial or late reply; never read from it again
+            self._sock.close()
+            self._sock = None
+            raise
+        if "error" in response:
+            raise RuntimeError(f"Inference service error: {response['error']}")
+        return response, payload
+
+    def _retire_segment(self):
+        # Unlinking only removes the name; workers that attached keep their mapping
+        if self._finalizer is not None:
+            self._finalizer()
+        self._segment = None
+        self._finalizer = None
+
+    def _ensure_segment(self, size: int) -> shared_memory.SharedMemory:
+        if self._segment is not None and self._segment.size >= size:
+            return self._segment
+        if self._finalizer is not None:
+            self._finalizer()
+        # 1 MiB steps, so slightly larger images don't reallocate
+        self._segment = shared_memory.SharedMemory(create=True, size=-(-size // 2**20) * 2**20)
+        # Unlinked on replacement, garbage collection or interpreter exit
+        self._finalizer = weakref.finalize(self, _release_segment, self._segment)
+        return self._segment
+
+    def predict(self, images: List[Image.Image]) -> List[RawDetections]:
+        from app.infra.inference_protocol import unpack_detections
+        images = [image if image.mode == "RGB" else image.convert("RGB") for image in images]
+        sizes = [image.width * image.height * 3 for image in images]
+
+        with self._lock:
+            segment = self._ensure_segment(sum(sizes))
+            items, offset = [], 0
+            for image, size in zip(images, sizes):
+                w, h = image.size
+                np.ndarray((h, w, 3), dtype=np.uint8, buffer=segment.buf, offset=offset)[...] = np.asarray(image)
+                items.append([offset, w, h])
+                offset += size
+            try:
+                response, payload = self._request({"op": "predict", "shm": segment.name, "images": items})
+            except Exception:
+                # A worker may still be reading the segment (e.g. after a
+                # timeout); the next call gets a fresh one
+                self._retire_segment()
+                raise
+        return unpack_detections(response["counts"], payload)
+
+def _release_segment(segment: shared_memory.SharedMemory):
+    segment.close()
+    try:
+        segment.unlink()
+    except FileNotFoundError:
+        pass
+
+class _IdNames(dict):
+    def __missing__(self, key):
+        return str(key)
+
+def backend_model_path(kind: str) -> str:
+    if kind == "remote":
+        return backend_model_path(settings.INFERENCE_SERVICE_BACKEND)
+    if kind == "onnx":
+        return settings.ONNX_MODEL_PATH
+    if kind == "onnx-int8":
+        return settings.ONNX_INT8_MODEL_PATH
+    return settings.MODEL_PATH
+
+def create_backend(kind: str = None, intra_op_threads: int = None) -> InferenceBackend:
+    """
+    Builds the backend selected by INFERENCE_BACKEND (or `kind`).
+    `intra_op_threads` overrides INFERENCE_INTRA_OP_THREADS.
+    """
+    kind = kind or settings.INFERENCE_BACKEND
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{kind}'; expected one of {BACKENDS}")
+    if intra_op_threads is None:
+        intra_op_threads = settings.INFERENCE_INTRA_OP_THREADS
+
+    if kind == "remote":
+        return RemoteBackend(
+            settings.INFERENCE_SERVICE_SOCKET,
+            connect_timeout_s=settings.INFERENCE_SERVICE_CONNECT_TIMEOUT_S,
+            request_timeout_s=settings.INFERENCE_SERVICE_TIMEOUT_S
+        )
+
+    if kind == "torch":
+        return TorchBackend(settings.MODEL_PATH, intra_op_threads=intra_op_threads)
+
+    backend = OnnxBackend(
+        backend_model_path(kind),
+        intra_op_threads=intra_op_threads,
+        inter_op_threads=settings.INFERENCE_INTER_OP_THREADS,
+        imgsz=settings.VISION_IMGSZ
+    )
+    backend.name = kind
+    return backend
@@ -0,0 +1,194 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+import numpy as np
+from PIL import Image
+from app.core.metrics import PRESCREEN_OUTCOMES, PRESCREEN_SAVED_SECONDS
+
+# Skip reasons, in the order they are checked
+SKIP_UNIFORM = "uniform"
+SKIP_CLOUD = "cloud"
+SKIP_NO_WATER = "no_water"
+SKIP_REASONS = (SKIP_UNIFORM, SKIP_CLOUD, SKIP_NO_WATER)
+
+@dataclass
+class ScreenResult:
+    skip_reason: Optional[str] = None
+    # Region of interest (x1, y1, x2, y2) in image pixels; None = whole image
+    roi: Optional[Tuple[int, int, int, int]] = None
+    water_fraction: float = 0.0
+    cloud_fraction: float = 0.0
+    std: float = 0.0
+
+class PreScreenEngine:
+    """
+    Cheap pre-screen that runs before inference on a downsampled copy of
+    the image (box-filtered to at most `thumb_px` on the long side, in C).
+
+    A tile is ruled out when:
+      - it is uniform: the largest per-channel standard deviation is below
+        `min_std`. This catches flat placeholders and no-data fills.
+      - it is cloud-covered: more than `cloud_fraction` of pixels are
+        bright (min channel above CLOUD_MIN_LEVEL) and unsaturated
+        (channel spread below CLOUD_MAX_CHROMA).
+      - it has no water: fewer than `min_water_fraction` of pixels are
+        blue-dominant ((B - R) / (B + R) above WATER_INDEX) and not bright.
+        Only checked when `require_water` is set (per call or, by default,
+        on the engine).
+
+    Otherwise the water mask is dilated by `bank_margin_px` (in full-image
+    pixels) to take in the river banks. The bounding box of that mask is
+    the region of interest. Large scenes only run the inference windows
+    that touch it.
+
+    Saved latency is estimated from running averages of the inference
+    time actually measured: per image for single-pass inference and per
+    megapixel for tiled scenes.
+    """
+
+    CLOUD_MIN_LEVEL = 180
+    CLOUD_MAX_CHROMA = 30
+    WATER_INDEX = 0.15
+    WATER_MAX_LEVEL = 200
+    EMA_ALPHA = 0.1
+
+    def __init__(self, thumb_px: int = 256, min_std: float = 2.0, cloud_fraction: float = 0.6,
+                 min_water_fraction: float = 0.002, bank_margin_px: int = 96, crop_max_fraction: float = 0.8,
+                 require_water: bool = True):
+        self.thumb_px = thumb_px
+        self.min_std = min_std
+        self.cloud_fraction = cloud_fraction
+        self.min_water_fraction = min_water_fraction
+        self.bank_margin_px = bank_margin_px
+        self.crop_max_fraction = crop_max_fraction
+        self.require_water = require_water
+        self._lock = threading.Lock()
+        # Running averages of measured inference cost; None until observed
+        self._single_s = None
+        self._tiled_s_per_mp = None
+        self.counters = {
+            "screened": 0,
+            "passed": 0,
+            "cropped": 0,
+            **{f"skipped_{reason}": 0 for reason in SKIP_REASONS},
+        }
+        self.screen_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    def screen(self, image: Image.Image, tiled: bool = False, require_water: bool = None) -> ScreenResult:
+        """
+        Screens the image. `tiled` says whether it would be inferred window
+        by window; only then is a region of interest returned.
+        `require_water` overrides the engine default for this image.
+        """
+        start = time.perf_counter()
+        factor = max(1, -(-max(image.size) // self.thumb_px))
+        thumb = image.reduce(factor) if factor > 1 else image
+        rgb = np.asarray(thumb.convert("RGB"), dtype=np.float32)
+        result = self.evaluate(rgb, factor, image.size, tiled, require_water)
+        self._account(result, image.size, tiled, time.perf_counter() - start)
+        return result
+
+    def evaluate(self, rgb: np.ndarray, factor: int, size: Tuple[int, int], tiled: bool,
+                 require_water: bool = None) -> ScreenResult:
+        """
+        Decision for an (h, w, 3) thumbnail taken at 1/`factor` of the
+        full image `size` (w, h).
+        """
+        std = float(rgb.reshape(-1, 3).std(axis=0).max())
+        if std < self.min_std:
+            return ScreenResult(skip_reason=SKIP_UNIFORM, std=std)
+
+        red, blue = rgb[..., 0], rgb[..., 2]
+        low = rgb.min(axis=-1)
+        chroma = rgb.max(axis=-1) - low
+        cloud = (low > self.CLOUD_MIN_LEVEL) & (chroma < self.CLOUD_MAX_CHROMA)
+        cloud_fraction = float(cloud.mean())
+        if cloud_fraction > self.cloud_fraction:
+            return ScreenResult(skip_reason=SKIP_CLOUD, cloud_fraction=cloud_fraction, std=std)
+
+        water_index = (blue - red) / np.maximum(blue + red, 1.0)
+        water = (water_index > self.WATER_INDEX) & (rgb.mean(axis=-1) < self.WATER_MAX_LEVEL) & ~cloud
+        water_fraction = float(water.mean())
+        result = ScreenResult(water_fraction=water_fraction, cloud_fraction=cloud_fraction, std=std)
+        if water_fraction < self.min_water_fraction:
+            if self.require_water if require_water is None else require_water:
+                result.skip_reason = SKIP_NO_WATER
+            return result
+
+        if tiled:
+            roi = self.region_of_interest(water, factor, size)
+            x1, y1, x2, y2 = roi
+            if (x2 - x1) * (y2 - y1) <= self.crop_max_fraction * size[0] * size[1]:
+                result.roi = roi
+        return result
+
+    def region_of_interest(self, water: np.ndarray, factor: int, size: Tuple[int, int]) -> Tuple[int, int, int, int]:
+        """
+        Full-image bounding box of the water mask dilated by the bank margin.
+        """
+        # Dilating a mask by a square and taking its bounding box equals
+        # growing the mask's bounding box by the same margin
+        rows = np.flatnonzero(water.any(axis=1))
+        cols = np.flatnonzero(water.any(axis=0))
+        margin = self.bank_margin_px
+        w, h = size
+        return (
+            max(0, int(cols[0]) * factor - margin),
+            max(0, int(rows[0]) * factor - margin),
+            min(w, (int(cols[-1]) + 1) * factor + margin),
+            min(h, (int(rows[-1]) + 1) * factor + margin),
+        )
+
+    def observe(self, seconds: float, pixels: int, tiled: bool):
+        """
+        Records the duration of an inference run over `pixels` pixels.
+        """
+        with self._lock:
+            if tiled:
+                self._tiled_s_per_mp = self._ema(self._tiled_s_per_mp, seconds / max(pixels / 1e6, 1e-6))
+            else:
+                self._single_s = self._ema(self._single_s, seconds)
+
+    def _ema(self, current: Optional[float], value: float) -> float:
+        return value if current is None else current + self.EMA_ALPHA * (value - current)
+
+    def _account(self, result: ScreenResult, size: Tuple[int, int], tiled: bool, seconds: float):
+        megapixels = size[0] * size[1] / 1e6
+        with self._lock:
+            saved = 0.0
+            if result.skip_reason is not None:
+                outcome = f"skipped_{result.skip_reason}"
+                if tiled:
+                    saved = (self._tiled_s_per_mp or 0.0) * megapixels
+                else:
+                    saved = self._single_s or 0.0
+            elif result.roi is not None:
+                outcome = "cropped"
+                x1, y1, x2, y2 = result.roi
+                saved = (self._tiled_s_per_mp or 0.0) * (megapixels - (x2 - x1) * (y2 - y1) / 1e6)
+            else:
+                outcome = "passed"
+            self.counters["screened"] += 1
+            self.counters[outcome] += 1
+            self.screen_seconds += seconds
+            self.saved_seconds += saved
+
+        PRESCREEN_OUTCOMES.inc(outcome=outcome)
+        if saved > 0:
+            PRESCREEN_SAVED_SECONDS.inc(saved)
+
+    def stats(self) -> dict:
+        with self._lock:
+            screened = self.counters["screened"]
+            skipped = sum(self.counters[f"skipped_{reason}"] for reason in SKIP_REASONS)
+            return {
+                **self.counters,
+                "skip_rate": round(skipped / screened, 4) if screened else 0.0,
+                "crop_rate": round(self.counters["cropped"] / screened, 4) if screened else 0.0,
+                "screen_ms_mean": round(self.screen_seconds / screened * 1000, 3) if screened else 0.0,
+                "saved_seconds_estimate": round(self.saved_seconds, 3),
+                "inference_ms_single": round(self._single_s * 1000, 1) if self._single_s is not None else None,
+                "inference_ms_per_mp_tiled": round(self._tiled_s_per_mp * 1000, 1) if self._tiled_s_per_mp is not None else None,
+            }
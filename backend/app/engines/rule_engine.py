@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Tuple
+import numpy as np
+from app.core.config import settings
+from app.domain.heat import HeatIndexBatch
+from app.domain.intervention import Intervention, ActionType, UrgencyLevel
+
+# Rule fields -> HeatIndexBatch columns
+FIELDS = {
+    "pdi": "plastic_density_index",
+    "sai": "surface_absorption_index",
+    "wdi": "water_deficit_index",
+    "uri": "urban_risk_index",
+}
+OPS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+Condition = Tuple[str, np.ufunc, float]
+
+@dataclass
+class CompiledRule:
+    rule_id: str
+    when: List[Condition]
+    # (conditions, template index) checked in order; the last entry is the default
+    urgency: List[Tuple[List[Condition], int]]
+
+class InterventionRuleSet:
+    """
+    Intervention rules compiled from data into an array evaluator.
+
+    Each rule is a conjunction of threshold conditions on the heat indices,
+    an urgency (optionally escalated by further conditions) and an
+    intervention template. Evaluating a batch costs one comparison pass per
+    condition over the whole batch, and matching rows get shared, interned
+    Intervention instances instead of fresh allocations.
+    """
+
+    def __init__(self, rules: List[CompiledRule], templates: List[Intervention], version=None):
+        self.rules = rules
+        self.templates = templates
+        self.version = version
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "InterventionRuleSet":
+        rules, templates = [], []
+        for spec in data["rules"]:
+            rule_id = spec["id"]
+            levels = [(cls._conditions(e["when"], rule_id), e["urgency"]) for e in spec.get("escalate", [])]
+            levels.append(([], spec["urgency"]))
+
+            urgency = []
+            for conditions, level in levels:
+                templates.append(Intervention(
+                    title=spec["title"],
+                    description=spec["description"],
+                    urgency=UrgencyLevel(level),
+                    action_type=ActionType(spec["action_type"]),
+                    estimated_impact=spec["estimated_impact"]
+                ))
+                urgency.append((conditions, len(templates) - 1))
+
+            rules.append(CompiledRule(rule_id=rule_id, when=cls._conditions(spec["when"], rule_id), urgency=urgency))
+        return cls(rules, templates, version=data.get("version"))
+
+    @classmethod
+    def load(cls, path: str) -> "InterventionRuleSet":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    @staticmethod
+    def _conditions(specs: List[dict], rule_id: str) -> List[Condition]:
+        conditions = []
+        for spec in specs:
+            if spec["field"] not in FIELDS or spec["op"] not in OPS:
+                raise ValueError(f"Rule '{rule_id}': unsupported condition {spec}")
+            conditions.append((FIELDS[spec["field"]], OPS[spec["op"]], float(spec["value"])))
+        return conditions
+
+    def match(self, heat: HeatIndexBatch) -> np.ndarray:
+        """
+        (rows, rules) matrix of template indices, -1 where the rule doesn't fire.
+        """
+        n = len(heat)
+        matched = np.full((n, len(self.rules)), -1, dtype=np.int64)
+        for r, rule in enumerate(self.rules):
+            fires = self._mask(rule.when, heat, n)
+            if not fires.any():
+                continue
+            choices = [self._mask(conditions, heat, n) for conditions, _ in rule.urgency]
+            template = np.select(choices, [t for _, t in rule.urgency])
+            matched[:, r] = np.where(fires, template, -1)
+        return matched
+
+    def evaluate(self, heat: HeatIndexBatch) -> List[List[Intervention]]:
+        templates = self.templates
+        return [[templates[t] for t in row if t >= 0] for row in self.match(heat).tolist()]
+
+    @staticmethod
+    def _mask(conditions: List[Condition], heat: HeatIndexBatch, n: int) -> np.ndarray:
+        mask = np.ones(n, dtype=bool)
+        for column, op, value in conditions:
+            mask &= op(getattr(heat, column), value)
+        return mask
+
+class RuleEngine:
+    """
+    Holds the active rule set and reloads it when the rules file changes
+    (checked at most every `reload_interval_s`), so ops can tune thresholds
+    without a redeploy. An invalid file is logged and the previous rules stay active.
+    """
+
+    def __init__(self, path: str, reload_interval_s: float = 5.0):
+        self.path = path
+        self.reload_interval_s = reload_interval_s
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._rules = None
+        self._mtime = None
+        self._checked_at = 0.0
+
+    @property
+    def rules(self) -> InterventionRuleSet:
+        now = time.monotonic()
+        if self._rules is None or now - self._checked_at >= self.reload_interval_s:
+            with self._lock:
+                self._checked_at = now
+                self._maybe_reload()
+        return self._rules
+
+    def _maybe_reload(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            if self._rules is None:
+                raise
+            self.logger.error(f"Intervention rules file {self.path} is missing; keeping current rules")
+            return
+        if mtime == self._mtime:
+            return
+
+        try:
+            self._rules = InterventionRuleSet.load(self.path)
+            self._mtime = mtime
+            self.logger.info(f"Loaded {len(self._rules.rules)} intervention rules from {self.path}")
+        except (ValueError, KeyError, TypeError) as e:
+            if self._rules is None:
+                raise
+            self._mtime = mtime
+            self.logger.error(f"Invalid intervention rules in {self.path} ({e}); keeping current rules")
+
+    def evaluate(self, heat: HeatIndexBatch) -> List[List[Intervention]]:
+        return self.rules.evaluate(heat)
+
+# Singleton
+rule_engine = RuleEngine(settings.INTERVENTION_RULES_PATH, reload_interval_s=settings.INTERVENTION_RULES_RELOAD_S)
@@ -1,16 +1,27 @@
 import random
 from datetime import datetime
+from app.core.config import settings
 from app.domain.region import Region
 from app.domain.sensor import SensorReading
+from app.infra.sensor_store import sensor_store
 
 class SensorEngine:
     """
-    Simulates fetching data from a network of ground-based IoT sensors.
-    In a real system, this would query an IoT Hub/Database.
+    Serves aggregated readings from the ground-based IoT sensor network.
+    Readings come from the in-process sensor store (calibrated devices within
+    SENSOR_RADIUS_KM over the rolling window); regions without reporting
+    devices fall back to simulated values when SENSOR_SIMULATE_FALLBACK is on.
     """
     
     @staticmethod
     def get_readings(region: Region) -> SensorReading:
+        reading = sensor_store.aggregate(region.lat, region.lng, settings.SENSOR_RADIUS_KM)
+        if reading is None and settings.SENSOR_SIMULATE_FALLBACK:
+            reading = SensorEngine._simulate(region)
+        return reading
+
+    @staticmethod
+    def _simulate(region: Region) -> SensorReading:
         # Simulate realistic variations based on the region's base characteristics
         # For Mumbai (approx lat 19), it's generally hot and humid.
         
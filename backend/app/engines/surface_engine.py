@@ -0,0 +1,188 @@
+import math
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterator, Optional, Tuple
+import numpy as np
+from app.domain.region import Region
+from app.domain.surface import SurfaceData
+from app.infra.tile_store import Scene, TileStore
+
+# Tile store layer holding the Sentinel-2 10 m bands, (H, W, 4) uint16
+# surface reflectance scaled by REFLECTANCE_SCALE
+BAND_LAYER = "bands"
+BAND_ORDER = ("B2", "B3", "B4", "B8")  # blue, green, red, NIR
+REFLECTANCE_SCALE = 10000.0
+
+# Per-block partial sums; additive, so blocks reduce in any order
+_VALID, _VEGETATION, _IMPERVIOUS, _WATER, _TEMP = range(5)
+
+class SurfaceEngine:
+    """
+    Surface conditions of a region from its multispectral bands.
+
+    The region's window of the band layer is processed block by block
+    (`block_px` squares aligned to the store's chunk grid). Each block is
+    read from the memory-mapped layer, reduced to a few sums with vectorized
+    NumPy and dropped, so peak memory depends on the block size and worker
+    count, not on the window. That holds even for a full 10980 x 10980 scene.
+    Blocks run on a thread pool (NumPy releases the GIL) with at most
+    `workers * 2` in flight.
+
+    Per pixel:
+      - green cover: NDVI = (B8 - B4) / (B8 + B4) above VEGETATION_NDVI
+      - water: NDWI = (B3 - B8) / (B3 + B8) above WATER_NDWI
+      - impervious: not vegetated, not water, low NDVI and bright (built-up
+        surfaces and bare ground; the 10 m bands can't separate the two)
+      - surface temperature proxy: interpolated between vegetated and bare
+        surface temperatures by fractional vegetation cover
+        ((NDVI - NDVI_SOIL) / (NDVI_VEG - NDVI_SOIL))^2, minus a cooling term
+        for high albedo. Water is held at its own temperature.
+    Sentinel-2 has no thermal band, so this is a proxy, not a measured LST.
+    """
+
+    VEGETATION_NDVI = 0.3
+    IMPERVIOUS_NDVI = 0.2
+    IMPERVIOUS_MIN_ALBEDO = 0.08
+    WATER_NDWI = 0.2
+    NDVI_SOIL = 0.2
+    NDVI_VEG = 0.8
+    TEMP_VEGETATION_C = 26.0
+    TEMP_BARE_C = 44.0
+    TEMP_WATER_C = 24.0
+    ALBEDO_COOLING_C = 20.0  # per unit of albedo above 0.2
+
+    def __init__(self, tile_store: TileStore, block_px: int = 1024, workers: int = 2, pixel_size_m: float = 10.0):
+        # Whole chunks per block, so no chunk is read twice
+        chunk = tile_store.chunk
+        self.tile_store = tile_store
+        self.block_px = max(chunk, block_px // chunk * chunk)
+        self.workers = max(1, workers)
+        self.pixel_size_m = pixel_size_m
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def get_surface(self, region: Region) -> Optional[SurfaceData]:
+        """
+        SurfaceData over the region's footprint (area_km2 square centered on
+        it) from the newest scene with a band layer, or None if none covers it.
+        """
+        for scene in self.tile_store.find_scenes(region.lat, region.lng):
+            if not scene.has_layer(BAND_LAYER):
+                continue
+            side = max(1, round(math.sqrt(region.area_km2) * 1000 / self.pixel_size_m))
+            w, h = min(side, scene.width), min(side, scene.height)
+            col, row = scene.to_pixel(region.lat, region.lng)
+            x0 = int(min(max(round(col - w / 2), 0), scene.width - w))
+            y0 = int(min(max(round(row - h / 2), 0), scene.height - h))
+            return self.compute(scene, (x0, y0, w, h))
+        return None
+
+    def compute(self, scene: Scene, window: Tuple[int, int, int, int] = None) -> Optional[SurfaceData]:
+        """
+        Reduces the window (x0, y0, w, h; default the whole scene) of the
+        scene's band layer. Returns None if it holds no valid pixels.
+        """
+        window = window or (0, 0, scene.width, scene.height)
+        blocks = self.blocks(window)
+        totals = np.zeros(5)
+
+        if self.workers == 1:
+            for block in blocks:
+                totals += self._block_sums(scene, block)
+        else:
+            executor = self._get_executor()
+            in_flight = set()
+            while True:
+                while len(in_flight) < self.workers * 2:
+                    block = next(blocks, None)
+                    if block is None:
+                        break
+                    in_flight.add(executor.submit(self._block_sums, scene, block))
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    totals += future.result()
+
+        valid = totals[_VALID]
+        if valid == 0:
+            return None
+        return SurfaceData(
+            surface_temp_c=round(float(totals[_TEMP] / valid), 2),
+            green_cover_index=round(float(totals[_VEGETATION] / valid), 3),
+            impervious_surface_index=round(float(totals[_IMPERVIOUS] / valid), 3)
+        )
+
+    def blocks(self, window: Tuple[int, int, int, int]) -> Iterator[Tuple[int, int, int, int]]:
+        """
+        Lazily yields (x0, y0, w, h) blocks covering the window, cut on the
+        block grid so reads stay chunk-aligned.
+        """
+        x0, y0, w, h = window
+        b = self.block_px
+        for by in range(y0 // b * b, y0 + h, b):
+            top, bottom = max(by, y0), min(by + b, y0 + h)
+            for bx in range(x0 // b * b, x0 + w, b):
+                left, right = max(bx, x0), min(bx + b, x0 + w)
+                yield left, top, right - left, bottom - top
+
+    def _block_sums(self, scene: Scene, block: Tuple[int, int, int, int]) -> np.ndarray:
+        bands = scene.read_window(BAND_LAYER, *block)
+        # Mapped pages would otherwise accumulate over a full-scene pass
+        scene.release_window(BAND_LAYER, *block)
+        return self.block_sums(bands)
+
+    @classmethod
+    def block_sums(cls, bands: np.ndarray) -> np.ndarray:
+        """
+        Partial sums (valid, vegetation, impervious, water, temperature) of
+        one (h, w, 4) block of scaled reflectances.
+        """
+        valid, vegetation, impervious, water, temp = cls.classify(bands)
+        return np.array([
+            np.count_nonzero(valid),
+            np.count_nonzero(vegetation),
+            np.count_nonzero(impervious),
+            np.count_nonzero(water),
+            temp.sum(where=valid, dtype=np.float64),
+        ])
+
+    @classmethod
+    def classify(cls, bands: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        Per-pixel (valid, vegetation, impervious, water) masks and the
+        temperature proxy of an (h, w, 4) block of scaled reflectances.
+        """
+        valid = bands.any(axis=-1)
+        blue, green, red, nir = (bands[..., i].astype(np.float32) / REFLECTANCE_SCALE for i in range(4))
+
+        ndvi = (nir - red) / np.maximum(nir + red, 1e-6)
+        ndwi = (green - nir) / np.maximum(green + nir, 1e-6)
+        albedo = (blue + green + red + nir) * 0.25
+
+        water = valid & (ndwi > cls.WATER_NDWI)
+        vegetation = valid & ~water & (ndvi > cls.VEGETATION_NDVI)
+        impervious = valid & ~water & (ndvi < cls.IMPERVIOUS_NDVI) & (albedo > cls.IMPERVIOUS_MIN_ALBEDO)
+
+        cover = np.clip((ndvi - cls.NDVI_SOIL) / (cls.NDVI_VEG - cls.NDVI_SOIL), 0.0, 1.0) ** 2
+        temp = cls.TEMP_VEGETATION_C + (cls.TEMP_BARE_C - cls.TEMP_VEGETATION_C) * (1.0 - cover)
+        temp -= cls.ALBEDO_COOLING_C * np.clip(albedo - 0.2, 0.0, None)
+        temp = np.where(water, cls.TEMP_WATER_C, temp)
+        return valid, vegetation, impervious, water, temp
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="surface-block")
+        return self._executor
+
+    @staticmethod
+    def simulate(region: Region) -> SurfaceData:
+        # Demo fallback for regions without multispectral data
+        return SurfaceData(
+            surface_temp_c=random.uniform(25.0, 45.0),
+            green_cover_index=random.uniform(0.1, 0.6),
+            impervious_surface_index=random.uniform(0.4, 0.9)
+        )
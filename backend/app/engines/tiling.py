@@ -0,0 +1,106 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from typing import List, Tuple
+import numpy as np
+from PIL import Image
+from app.domain.plastic import PlasticAnalysis
+from app.engines.box_ops import nms, tile_windows
+
+class TiledVisionEngine:
+    """
+    Sliding-window inference for large scenes (full Sentinel-2 rasters,
+    drone mosaics). The image is cut into overlapping tiles at native
+    resolution so small targets survive, tiles run in parallel on a thread
+    pool (one YOLO instance per thread, since the predictor is not
+    thread-safe), and boxes are merged across tile seams with a global NMS.
+
+    Only `workers * 2` tile batches are in flight at any time, so memory
+    stays bounded regardless of scene size.
+    """
+
+    def __init__(self, engine, tile_size: int = 640, overlap: int = 64, workers: int = 2,
+                 tiles_per_call: int = 4, merge_threshold: float = 0.6):
+        self.engine = engine
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.workers = max(1, workers)
+        self.tiles_per_call = max(1, tiles_per_call)
+        self.merge_threshold = merge_threshold
+        self._local = threading.local()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def analyze(self, image: Image.Image, roi: Tuple[int, int, int, int] = None) -> PlasticAnalysis:
+        """
+        `roi` (x1, y1, x2, y2) restricts inference to the windows touching
+        it; density is still reported over the whole image.
+        """
+        w, h = image.size
+        windows = None
+        if roi is not None:
+            windows = [win for win in tile_windows(w, h, self.tile_size, self.overlap) if _overlaps(win, roi)]
+        boxes, confidences, class_ids = self.detect(image, windows=windows)
+        return self.engine.build_analysis(boxes, confidences, class_ids, size=(w, h))
+
+    def detect(self, image: Image.Image, windows: List[Tuple[int, int, int, int]] = None):
+        """
+        Merged raw detections for the whole image (or only the given
+        windows), in full-image coordinates.
+        """
+        w, h = image.size
+        windows = iter(windows) if windows is not None else tile_windows(w, h, self.tile_size, self.overlap)
+        executor = self._get_executor()
+
+        parts = []
+        in_flight = set()
+        max_in_flight = self.workers * 2
+
+        while True:
+            while len(in_flight) < max_in_flight:
+                chunk = list(islice(windows, self.tiles_per_call))
+                if not chunk:
+                    break
+                in_flight.add(executor.submit(self._run_chunk, image, chunk))
+            if not in_flight:
+                break
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                parts.extend(future.result())
+
+        if not parts:
+            return np.zeros((0, 4), dtype=np.float32), np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+
+        boxes = np.concatenate([p[0] for p in parts])
+        confidences = np.concatenate([p[1] for p in parts])
+        class_ids = np.concatenate([p[2] for p in parts])
+
+        keep = nms(boxes, confidences, class_ids, threshold=self.merge_threshold, metric="ios")
+        return boxes[keep], confidences[keep], class_ids[keep]
+
+    def _run_chunk(self, image: Image.Image, windows: List[Tuple[int, int, int, int]]):
+        tiles = [image.crop(win) for win in windows]
+        raw = self.engine.detect(tiles, model=self._thread_model())
+
+        shifted = []
+        for (x1, y1, _, _), (boxes, confidences, class_ids) in zip(windows, raw):
+            if len(boxes):
+                boxes = boxes + np.asarray([x1, y1, x1, y1], dtype=boxes.dtype)
+                shifted.append((boxes, confidences, class_ids))
+        return shifted
+
+    def _thread_model(self):
+        model = getattr(self._local, "model", None)
+        if model is None:
+            model = self._local.model = self.engine.load_model()
+        return model
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="vision-tile")
+        return self._executor
+
+def _overlaps(a: Tuple[int, int, int, int], b: Tuple[int, int, int, int]) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
@@ -1,33 +1,63 @@
+from typing import List, Tuple
+import numpy as np
 from PIL import Image
-from ultralytics import YOLO
-from app.core.config import settings
-from app.domain.plastic import PlasticAnalysis, DetectedObject
+from app.domain.plastic import PlasticAnalysis
+from app.engines.inference_backends import InferenceBackend, RawDetections, create_backend
+from app.infra.image_io import SOURCE_SIZE_KEY
 
 class VisionEngine:
     def __init__(self):
-        self.model = YOLO(settings.MODEL_PATH)
-    
+        # PyTorch YOLO or ONNX Runtime, per settings.INFERENCE_BACKEND
+        self.backend = self.load_model()
+
+    @staticmethod
+    def load_model() -> InferenceBackend:
+        return create_backend()
+
     def analyze(self, image: Image.Image) -> PlasticAnalysis:
-        results = self.model(image)
-        
-        detections = []
-        count = 0
-        
-        for r in results:
-            for box in r.boxes:
-                detections.append(DetectedObject(
-                    label=self.model.names[int(box.cls[0])],
-                    confidence=float(box.conf[0]),
-                    box=box.xyxy[0].tolist()
-                ))
-                count += 1
-        
-        # Heuristic density
-        w, h = image.size
+        return self.analyze_batch([image])[0]
+
+    def analyze_batch(self, images: List[Image.Image]) -> List[PlasticAnalysis]:
+        """
+        Runs a single YOLO call over several images and returns one
+        PlasticAnalysis per input, in the same order.
+        """
+        raw = self.detect(images)
+        return [
+            self.build_analysis(*dets, size=image.size, source_size=image.info.get(SOURCE_SIZE_KEY))
+            for dets, image in zip(raw, images)
+        ]
+
+    def detect(self, images: List[Image.Image], model: InferenceBackend = None) -> List[RawDetections]:
+        """
+        Raw detections per image. `model` lets callers running in other
+        threads use their own backend instance.
+        """
+        return (model or self.backend).predict(list(images))
+
+    def build_analysis(self, boxes: np.ndarray, confidences: np.ndarray, class_ids: np.ndarray,
+                       size: Tuple[int, int], source_size: Tuple[int, int] = None) -> PlasticAnalysis:
+        """
+        `source_size` is the original size of an image decoded at reduced
+        resolution (see app/infra/image_io.py); boxes and density are then
+        reported in original-image terms.
+        """
+        # Arrays are kept as returned by the backend (no per-box objects)
+        count = len(confidences)
+        if source_size and tuple(source_size) != tuple(size):
+            sx, sy = source_size[0] / size[0], source_size[1] / size[1]
+            boxes = boxes * np.asarray([sx, sy, sx, sy], dtype=boxes.dtype)
+            size = source_size
+
+        # Heuristic density (always over the full-resolution area)
+        w, h = size
         density = min((count * 10000) / (w * h), 10.0)
-        
+
         return PlasticAnalysis(
             object_count=count,
             density_score=round(density, 2),
-            detections=detections
+            boxes=boxes,
+            confidences=confidences,
+            class_ids=class_ids,
+            class_names=self.backend.names
         )
@@ -1,42 +1,49 @@
 from typing import List
-from app.domain.heat import HeatIndex
+import numpy as np
+from app.domain.heat import HeatIndex, HeatIndexBatch
+from app.domain.hotspot import Hotspot
 from app.domain.intervention import Intervention, ActionType, UrgencyLevel
+from app.engines.rule_engine import rule_engine
+
+# Share of an image's detections held by a hotspot -> cleanup urgency
+HOTSPOT_URGENCY = ((0.5, UrgencyLevel.CRITICAL), (0.25, UrgencyLevel.HIGH), (0.1, UrgencyLevel.MODERATE))
 
 class WaterEngine:
     @staticmethod
     def recommend_interventions(heat_index: HeatIndex) -> List[Intervention]:
+        batch = HeatIndexBatch(
+            plastic_density_index=np.asarray([heat_index.plastic_density_index], dtype=np.float64),
+            surface_absorption_index=np.asarray([heat_index.surface_absorption_index], dtype=np.float64),
+            water_deficit_index=np.asarray([heat_index.water_deficit_index], dtype=np.float64),
+            urban_risk_index=np.asarray([heat_index.urban_risk_index], dtype=np.float64)
+        )
+        return WaterEngine.recommend_interventions_batch(batch)[0]
+
+    @staticmethod
+    def recommend_interventions_batch(heat: HeatIndexBatch) -> List[List[Intervention]]:
+        """
+        Applies the intervention rule set (app/engines/intervention_rules.json)
+        to every row of a HeatIndexBatch in one array pass per condition.
+        """
+        return rule_engine.evaluate(heat)
+
+    @staticmethod
+    def recommend_hotspot_cleanups(hotspots: List[Hotspot], limit: int = 3) -> List[Intervention]:
+        """
+        One site-specific cleanup per ranked hotspot (up to `limit`), urgent
+        in proportion to the share of the detected plastic it holds.
+        """
         interventions = []
-        
-        # Rule-based Logic
-        
-        # 1. High Plastic -> Cleanup
-        if heat_index.plastic_density_index > 6.0:
+        for hotspot in hotspots[:limit]:
+            urgency = next((level for share, level in HOTSPOT_URGENCY if hotspot.share >= share), UrgencyLevel.LOW)
+            where = f" around {hotspot.lat:.5f}, {hotspot.lng:.5f}" if hotspot.lat is not None else ""
+            area = f" over ~{hotspot.extent_m2:,.0f} m²" if hotspot.extent_m2 is not None else ""
             interventions.append(Intervention(
-                title="Targeted Plastic Cleanup",
-                description="High accumulation of plastic detected causing heat retention.",
-                urgency=UrgencyLevel.CRITICAL if heat_index.plastic_density_index > 8 else UrgencyLevel.HIGH,
+                title=f"Hotspot Cleanup #{hotspot.rank}",
+                description=f"{hotspot.object_count} plastic objects clustered{area}{where}.",
+                urgency=urgency,
                 action_type=ActionType.CLEANUP,
-                estimated_impact="Reduces local surface temp by ~0.5-1.0°C"
-            ))
-            
-        # 2. High Surface Absorption + High Temp -> Mist Cooling
-        if heat_index.surface_absorption_index > 7.0 and heat_index.water_deficit_index > 5.0:
-            interventions.append(Intervention(
-                title="Mist Cooling Deployment",
-                description="Area has high surface absorption and heat stress.",
-                urgency=UrgencyLevel.HIGH,
-                action_type=ActionType.COOLING,
-                estimated_impact="Instant ambient temp drop of 3-5°C"
-            ))
-            
-        # 3. Moderate Risk -> Policy/Drainage
-        if heat_index.urban_risk_index > 4.0 and heat_index.plastic_density_index > 3.0:
-             interventions.append(Intervention(
-                title="Drainage Inspection",
-                description="Plastic waste may be clogging nearby drainage.",
-                urgency=UrgencyLevel.MODERATE,
-                action_type=ActionType.DRAINAGE,
-                estimated_impact="Prevents waterlogging and vector-borne diseases"
+                estimated_impact=f"Removes ~{hotspot.share:.0%} of the detected plastic in one targeted operation",
+                location=(hotspot.lat, hotspot.lng) if hotspot.lat is not None else None
             ))
-            
         return interventions
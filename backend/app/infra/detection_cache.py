@@ -0,0 +1,240 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+import numpy as np
+from PIL import Image
+from app.core.config import settings
+from app.domain.plastic import PlasticAnalysis
+from app.engines.inference_backends import backend_model_path
+
+# Bumped whenever the payload encoding changes; old entries are then purged
+PAYLOAD_FORMAT = 2
+
+class DetectionCache:
+    """
+    Content-addressed cache of PlasticAnalysis results.
+
+    Keys are a hash of the decoded pixels plus the model identity and the
+    inference parameters, so the same tile hits the cache regardless of
+    file name or encoding. A bounded in-memory LRU sits in front of a SQLite
+    store (WAL mode) that survives restarts and is shared by all uvicorn
+    workers on the host.
+
+    The model identity is the inference backend plus its weight file's path,
+    size and mtime, captured by the caller when the model is loaded and
+    handed over with set_model(). Reading it per lookup would tag results
+    of the loaded model with a replaced file's identity. When it changes,
+    the memory tier is cleared and disk entries from other models are
+    purged.
+    """
+
+    # Pixels hashed per key_for() strip
+    HASH_STRIP_BYTES = 8 * 1024 * 1024
+
+    def __init__(self, path: str, memory_entries: int = 512, disk_entries: int = 50000):
+        self.path = Path(path)
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.logger = logging.getLogger(__name__)
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._model_id = None
+        self._writes_since_prune = 0
+        self.counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "writes": 0,
+            "invalidations": 0,
+        }
+
+    # --- Keys ---------------------------------------------------------------
+
+    @staticmethod
+    def model_identity() -> str:
+        """
+        Identity of the weights INFERENCE_BACKEND would load right now.
+        """
+        backend = settings.INFERENCE_BACKEND
+        model_path = backend_model_path(backend)
+        try:
+            st = os.stat(model_path)
+            return f"v{PAYLOAD_FORMAT}:{backend}:{model_path}:{st.st_size}:{st.st_mtime_ns}"
+        except OSError:
+            # Weights resolved by ultralytics (e.g. auto-downloaded); name only
+            return f"v{PAYLOAD_FORMAT}:{backend}:{model_path}"
+
+    def key_for(self, image: Image.Image, params: dict) -> str:
+        digest = hashlib.sha256()
+        w, h = image.size
+        digest.update(f"{image.mode}:{w}x{h}".encode())
+        # Full-width row strips hash to the same digest as image.tobytes()
+        # without materializing a second full-size copy of a large scene
+        rows = max(1, self.HASH_STRIP_BYTES // max(1, w * len(image.getbands())))
+        for y in range(0, h, rows):
+            digest.update(image.crop((0, y, w, min(y + rows, h))).tobytes())
+        if self._model_id is None:
+            raise RuntimeError("DetectionCache.set_model() must be called before key_for()")
+        digest.update(self._model_id.encode())
+        digest.update(json.dumps(params, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    # --- Lookup -------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[PlasticAnalysis]:
+        """
+        Returns the cached analysis or None. Cached analyses are shared
+        between callers and must be treated as read-only.
+        """
+        with self._lock:
+            analysis = self._memory.get(key)
+            if analysis is not None:
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return analysis
+
+        row = self._conn().execute(
+            "SELECT payload FROM detections WHERE key = ? AND model_id = ?",
+            (key, self._model_id)
+        ).fetchone()
+
+        if row is None:
+            with self._lock:
+                self.counters["misses"] += 1
+            return None
+
+        analysis = self._decode(row[0])
+        with self._lock:
+            self.counters["disk_hits"] += 1
+            self._remember(key, analysis)
+        return analysis
+
+    def put(self, key: str, analysis: PlasticAnalysis):
+        with self._lock:
+            self._remember(key, analysis)
+            self.counters["writes"] += 1
+            self._writes_since_prune += 1
+            prune = self._writes_since_prune >= 1000
+            if prune:
+                self._writes_since_prune = 0
+
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO detections (key, model_id, payload, created) VALUES (?, ?, ?, ?)",
+                (key, self._model_id, self._encode(analysis), time.time())
+            )
+        if prune:
+            self._prune()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.counters["memory_hits"] + self.counters["disk_hits"] + self.counters["misses"]
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+            return {
+                **self.counters,
+                "memory_entries": len(self._memory),
+                "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+                "model_id": self._model_id,
+            }
+
+    def set_model(self, model_id: str):
+        """
+        Declares the identity of the model whose results are cached from now on.
+        """
+        with self._lock:
+            if model_id == self._model_id:
+                return
+            if self._model_id is not None:
+                self.logger.info("Model changed (%s -> %s); invalidating detection cache", self._model_id, model_id)
+                self.counters["invalidations"] += 1
+            self._memory.clear()
+            self._model_id = model_id
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM detections WHERE model_id != ?", (model_id,))
+
+    # --- Internals ----------------------------------------------------------
+
+    def _remember(self, key: str, analysis: PlasticAnalysis):
+        # Caller holds self._lock
+        self._memory[key] = analysis
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def _prune(self):
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "DELETE FROM detections WHERE key IN ("
+                " SELECT key FROM detections ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                (self.disk_entries,)
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared across threads; keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS detections ("
+                " key TEXT PRIMARY KEY, model_id TEXT NOT NULL, payload BLOB NOT NULL, created REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _encode(analysis: PlasticAnalysis) -> bytes:
+        # Detection columns as raw arrays; only the labels actually present
+        # go into the JSON header
+        present = np.unique(analysis.class_ids).tolist()
+        header = {
+            "object_count": analysis.object_count,
+            "density_score": analysis.density_score,
+            "class_names": {str(c): analysis.label(c) for c in present},
+        }
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            header=np.asarray(json.dumps(header)),
+            boxes=analysis.boxes,
+            confidences=analysis.confidences,
+            class_ids=analysis.class_ids
+        )
+        return buffer.getvalue()
+
+    @staticmethod
+    def _decode(payload: bytes) -> PlasticAnalysis:
+        with np.load(io.BytesIO(payload), allow_pickle=False) as data:
+            header = json.loads(str(data["header"]))
+            return PlasticAnalysis(
+                object_count=header["object_count"],
+                density_score=header["density_score"],
+                boxes=data["boxes"],
+                confidences=data["confidences"],
+                class_ids=data["class_ids"],
+                class_names={int(k): v for k, v in header["class_names"].items()}
+            )
+
+# Singleton
+detection_cache = DetectionCache(
+    settings.DETECTION_CACHE_PATH,
+    memory_entries=settings.DETECTION_CACHE_MEMORY_ENTRIES,
+    disk_entries=settings.DETECTION_CACHE_DISK_ENTRIES
+)
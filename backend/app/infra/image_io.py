@@ -0,0 +1,80 @@
+import hashlib
+import math
+import os
+from typing import BinaryIO
+from PIL import Image, UnidentifiedImageError
+from app.core.config import settings
+
+# image.info key holding the (w, h) of the upload when it was decoded at
+# reduced resolution; detections are mapped back to these coordinates
+SOURCE_SIZE_KEY = "source_size"
+
+class ImageTooLargeError(ValueError):
+    """
+    The upload exceeds UPLOAD_MAX_BYTES or UPLOAD_MAX_PIXELS.
+    """
+
+def stream_size(stream: BinaryIO) -> int:
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+    return size
+
+def upload_digest(stream: BinaryIO, chunk_size: int = 1024 * 1024) -> str:
+    """
+    SHA-256 of the raw upload bytes, read in chunks; the stream is rewound.
+    """
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+def decode_upload(stream: BinaryIO, max_bytes: int = None, max_pixels: int = None) -> Image.Image:
+    """
+    Decodes an uploaded image straight from its (spooled) file object.
+
+    Limits are enforced before any pixel data is decoded: the byte size
+    from the stream, the pixel count from the image header. Images small
+    enough to skip tiling are only ever seen by the model at VISION_IMGSZ,
+    so JPEGs are decoded in draft mode at the smallest DCT scale that still
+    covers it (1/2, 1/4 or 1/8 of the pixels to decode and hold); the
+    original size is kept in image.info[SOURCE_SIZE_KEY].
+    Other formats decode at full resolution.
+    """
+    max_bytes = settings.UPLOAD_MAX_BYTES if max_bytes is None else max_bytes
+    max_pixels = settings.UPLOAD_MAX_PIXELS if max_pixels is None else max_pixels
+
+    size = stream_size(stream)
+    if size > max_bytes:
+        raise ImageTooLargeError(f"Upload is {size} bytes; the limit is {max_bytes}")
+
+    try:
+        # Only the header is read here
+        image = Image.open(stream)
+    except Image.DecompressionBombError as e:
+        raise ImageTooLargeError(str(e)) from e
+    except UnidentifiedImageError as e:
+        raise ValueError("Unsupported or corrupt image") from e
+
+    source_size = w, h = image.size
+    if w * h > max_pixels:
+        raise ImageTooLargeError(f"Image is {w}x{h} ({w * h} pixels); the limit is {max_pixels}")
+
+    longest = max(w, h)
+    if settings.VISION_IMGSZ < longest <= settings.VISION_TILE_THRESHOLD:
+        scale = settings.VISION_IMGSZ / longest
+        # No-op for formats without reduced-resolution decoding
+        image.draft("RGB", (math.ceil(w * scale), math.ceil(h * scale)))
+
+    try:
+        image.load()
+    except OSError as e:
+        raise ValueError(f"Could not decode image: {e}") from e
+
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    if image.size != source_size:
+        image.info[SOURCE_SIZE_KEY] = source_size
+    return image
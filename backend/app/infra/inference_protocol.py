@@ -0,0 +1,62 @@
+"""
+Wire format between RemoteBackend clients and the inference service
+(app/infra/inference_service.py), over a Unix stream socket.
+
+Every message is a fixed header (JSON length, payload length) followed by
+a JSON header and an optional binary payload. Image pixels never travel
+on the socket: the client writes them into a shared memory segment and
+the request only names the segment and the (offset, width, height) of
+each RGB image in it. Every request carries an "id" that its reply
+echoes. Detections come back as one binary payload of concatenated
+boxes (float32), confidences (float32) and class ids (int64).
+"""
+import json
+import socket
+import struct
+from typing import List, Tuple
+import numpy as np
+
+_FRAME = struct.Struct("!II")
+
+def send_message(sock: socket.socket, header: dict, payload: bytes = b""):
+    encoded = json.dumps(header).encode()
+    sock.sendall(_FRAME.pack(len(encoded), len(payload)) + encoded + payload)
+
+def recv_message(sock: socket.socket) -> Tuple[dict, bytes]:
+    header_len, payload_len = _FRAME.unpack(_recv_exact(sock, _FRAME.size))
+    header = json.loads(_recv_exact(sock, header_len))
+    payload = _recv_exact(sock, payload_len) if payload_len else b""
+    return header, payload
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    buffer = bytearray(n)
+    view = memoryview(buffer)
+    received = 0
+    while received < n:
+        chunk = sock.recv_into(view[received:], n - received)
+        if chunk == 0:
+            raise ConnectionError("Inference service connection closed")
+        received += chunk
+    return bytes(buffer)
+
+def pack_detections(results) -> Tuple[List[int], bytes]:
+    counts = [len(confidences) for _, confidences, _ in results]
+    parts = []
+    for boxes, confidences, class_ids in results:
+        parts.append(np.ascontiguousarray(boxes, dtype=np.float32).tobytes())
+        parts.append(np.ascontiguousarray(confidences, dtype=np.float32).tobytes())
+        parts.append(np.ascontiguousarray(class_ids, dtype=np.int64).tobytes())
+    return counts, b"".join(parts)
+
+def unpack_detections(counts: List[int], payload: bytes) -> list:
+    results = []
+    offset = 0
+    for n in counts:
+        boxes = np.frombuffer(payload, dtype=np.float32, count=n * 4, offset=offset).reshape(n, 4)
+        offset += n * 16
+        confidences = np.frombuffer(payload, dtype=np.float32, count=n, offset=offset)
+        offset += n * 4
+        class_ids = np.frombuffer(payload, dtype=np.int64, count=n, offset=offset)
+        offset += n * 8
+        results.append((boxes, confidences, class_ids))
+    return results
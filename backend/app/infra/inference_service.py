@@ -0,0 +1,340 @@
+"""
+Local inference service shared by all API worker processes.
+
+A fixed pool of model-holding worker processes, each pinned to its own
+slice of the CPUs with intra-op threads sized to that slice. API workers
+(INFERENCE_BACKEND=remote) connect over a Unix socket and pass images
+through shared memory (see app/infra/inference_protocol.py). Whichever
+worker is free takes the next request. Memory is one model per inference
+worker, however many API workers there are, and the two pools scale
+independently.
+
+Workers are supervised. Each has its own pipe to the service (a process
+killed while blocked on a shared queue would hold the queue's lock for
+good), so the service knows which job every worker is running. A worker
+that dies, e.g. to the OOM killer or a native crash in the runtime, fails
+that job and is respawned on the same CPUs.
+
+Usage (from backend/), before starting uvicorn:
+    python -m app.infra.inference_service --workers 2
+"""
+import argparse
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import signal
+import socketserver
+import threading
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import wait
+from typing import List, Optional, Sequence
+import numpy as np
+from PIL import Image
+from app.core.config import settings
+from app.infra.inference_protocol import pack_detections, recv_message, send_message
+
+logger = logging.getLogger(__name__)
+
+def partition_cpus(workers: int, cpus: Sequence[int] = None) -> List[List[int]]:
+    """
+    Splits the CPUs this process may run on into `workers` contiguous,
+    near-equal groups (a worker gets at least one CPU; groups are shared
+    only when there are more workers than CPUs).
+    """
+    cpus = sorted(cpus if cpus is not None else _available_cpus())
+    if workers >= len(cpus):
+        return [[cpus[i % len(cpus)]] for i in range(workers)]
+    groups = np.array_split(np.asarray(cpus), workers)
+    return [group.tolist() for group in groups]
+
+def _available_cpus() -> List[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return list(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def _worker_main(cpus: List[int], backend_kind: str, conn):
+    # Runs in a spawned process: pin first, so the backend's thread pools
+    # are created inside the CPU slice
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    from app.engines.inference_backends import create_backend
+    try:
+        backend = create_backend(backend_kind, intra_op_threads=len(cpus))
+    except Exception as e:
+        conn.send(("failed", f"{type(e).__name__}: {e}"))
+        return
+    conn.send(("ready", {str(k): v for k, v in backend.names.items()}))
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        job_id, shm_name, items = job
+        try:
+            segment = shared_memory.SharedMemory(name=shm_name)
+            # The client owns (and unlinks) the segment
+            resource_tracker.unregister(segment._name, "shared_memory")
+            try:
+                images = [
+                    Image.fromarray(np.ndarray((h, w, 3), dtype=np.uint8, buffer=segment.buf, offset=offset))
+                    for offset, w, h in items
+                ]
+                raw = backend.predict(images)
+                del images
+            finally:
+                segment.close()
+            counts, payload = pack_detections(raw)
+            conn.send(("done", job_id, counts, payload))
+        except Exception as e:
+            conn.send(("error", job_id, f"{type(e).__name__}: {e}"))
+
+class InferenceService:
+    def __init__(self, socket_path: str, backend_kind: str, workers: int, request_timeout_s: float = 120.0):
+        self.socket_path = socket_path
+        self.backend_kind = backend_kind
+        self.workers = max(1, workers)
+        self.request_timeout_s = request_timeout_s
+        self.names = None
+
+        self._ctx = mp.get_context("spawn")
+        self._cpus = partition_cpus(self.workers)
+        # Per worker slot: process (None once retired), pipe, running job id
+        self._processes = [None] * self.workers
+        self._conns = [None] * self.workers
+        self._running = [None] * self.workers
+        self._idle = deque()
+        self._backlog = deque()
+        self._pending = {}
+        # Guards the slots, queues and pending futures
+        self._lock = threading.Lock()
+        self._closing = False
+        self._job_ids = itertools.count()
+        self._server: Optional[socketserver.ThreadingUnixStreamServer] = None
+
+    def start_workers(self):
+        for index in range(self.workers):
+            self._spawn(index)
+
+        for index, conn in enumerate(self._conns):
+            try:
+                message = conn.recv()
+            except EOFError:
+                message = ("failed", f"exit code {self._processes[index].exitcode}")
+            if message[0] == "failed":
+                raise RuntimeError(f"Inference worker {index} failed to load the model: {message[1]}")
+            self.names = message[1]
+            self._idle.append(index)
+
+        threading.Thread(target=self._dispatch_results, name="inference-results", daemon=True).start()
+
+    def _spawn(self, index: int):
+        cpus = self._cpus[index]
+        conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_worker_main, args=(cpus, self.backend_kind, child_conn),
+            name=f"inference-worker-{index}", daemon=True
+        )
+        process.start()
+        child_conn.close()
+        self._processes[index] = process
+        self._conns[index] = conn
+        self._running[index] = None
+        logger.info("Inference worker %d pinned to CPUs %s", index, cpus)
+
+    def _dispatch_results(self):
+        # Waits on every worker's pipe and on its process sentinel, which
+        # becomes ready when the process exits for any reason
+        while not self._closing:
+            with self._lock:
+                waitables = {}
+                for index, process in enumerate(self._processes):
+                    if process is not None:
+                        waitables[self._conns[index]] = (index, process)
+                        waitables[process.sentinel] = (index, process)
+            for ready in wait(list(waitables), timeout=1.0):
+                index, process = waitables[ready]
+                if self._processes[index] is not process:
+                    # Already handled through the other waitable
+                    continue
+                conn = self._conns[index]
+                try:
+                    while conn.poll():
+                        self._handle(index, conn.recv())
+                except (EOFError, OSError):
+                    pass
+                if not process.is_alive():
+                    process.join()
+                    self._restart(index, process)
+
+    def _handle(self, index: int, message: tuple):
+        kind = message[0]
+        if kind == "ready":
+            logger.info("Inference worker %d ready", index)
+            self._next_job(index)
+        elif kind == "failed":
+            # A respawned worker that can't load the model is not retried
+            logger.error("Inference worker %d failed to load the model: %s", index, message[1])
+            with self._lock:
+                self._processes[index] = None
+                self._conns[index].close()
+        else:
+            job_id = message[1]
+            if kind == "done":
+                self._resolve(job_id, result=(message[2], message[3]))
+            else:
+                self._resolve(job_id, error=message[2])
+            self._next_job(index)
+
+    def _restart(self, index: int, process):
+        with self._lock:
+            if self._processes[index] is not process:
+                return
+            job_id = self._running[index]
+            if index in self._idle:
+                self._idle.remove(index)
+            self._conns[index].close()
+            logger.error("Inference worker %d (pid %s) died with exit code %s; restarting",
+                         index, process.pid, process.exitcode)
+            if self._closing:
+                self._processes[index] = None
+            else:
+                self._spawn(index)
+        if job_id is not None:
+            self._resolve(job_id, error=f"Inference worker {index} died (exit code {process.exitcode})")
+
+    def _next_job(self, index: int):
+        # Hands the worker the oldest job still waited for, or parks it
+        with self._lock:
+            self._running[index] = None
+            while self._backlog:
+                job = self._backlog.popleft()
+                if job[0] not in self._pending:
+                    continue
+                if not self._send(index, job):
+                    self._backlog.appendleft(job)
+                return
+            self._idle.append(index)
+
+    def _send(self, index: int, job: tuple) -> bool:
+        # Caller holds self._lock
+        try:
+            self._conns[index].send(job)
+        except OSError:
+            # Worker is dying; its sentinel triggers the restart
+            return False
+        self._running[index] = job[0]
+        return True
+
+    def _resolve(self, job_id: int, result=None, error: str = None):
+        with self._lock:
+            future = self._pending.pop(job_id, None)
+        if future is None:
+            # Timed out, or already failed
+            return
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(RuntimeError(error))
+
+    def submit(self, shm_name: str, items: list) -> Future:
+        return self._enqueue(shm_name, items)[1]
+
+    def predict(self, shm_name: str, items: list):
+        """
+        Runs one job and waits for it; a job that times out is forgotten.
+        """
+        job_id, future = self._enqueue(shm_name, items)
+        try:
+            return future.result(timeout=self.request_timeout_s)
+        except FutureTimeoutError:
+            with self._lock:
+                self._pending.pop(job_id, None)
+            raise
+
+    def _enqueue(self, shm_name: str, items: list):
+        job = (next(self._job_ids), shm_name, items)
+        future = Future()
+        with self._lock:
+            self._pending[job[0]] = future
+            if not (self._idle and self._send(self._idle.popleft(), job)):
+                self._backlog.append(job)
+        return job[0], future
+
+    def serve_forever(self):
+        service = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        header, _ = recv_message(self.request)
+                    except ConnectionError:
+                        return
+                    # Replies echo the request id so clients can detect stale replies
+                    request_id = header.get("id")
+                    try:
+                        if header.get("op") == "hello":
+                            send_message(self.request, {
+                                "id": request_id,
+                                "names": service.names,
+                                "backend": service.backend_kind,
+                                "workers": service.workers,
+                            })
+                        elif header.get("op") == "predict":
+                            counts, payload = service.predict(header["shm"], header["images"])
+                            send_message(self.request, {"id": request_id, "counts": counts}, payload)
+                        else:
+                            send_message(self.request, {"id": request_id, "error": f"Unknown op {header.get('op')!r}"})
+                    except Exception as e:
+                        send_message(self.request, {"id": request_id, "error": f"{type(e).__name__}: {e}"})
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        self._server.daemon_threads = True
+        logger.info("Inference service (%s, %d workers) listening on %s", self.backend_kind, self.workers, self.socket_path)
+        try:
+            self._server.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        with self._lock:
+            self._closing = True
+            live = [(process, conn) for process, conn in zip(self._processes, self._conns) if process is not None]
+        for process, conn in live:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+        for process, _ in live:
+            process.join(timeout=5)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socket", default=settings.INFERENCE_SERVICE_SOCKET)
+    parser.add_argument("--backend", default=settings.INFERENCE_SERVICE_BACKEND)
+    parser.add_argument("--workers", type=int, default=settings.INFERENCE_SERVICE_WORKERS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    service = InferenceService(args.socket, args.backend, args.workers, request_timeout_s=settings.INFERENCE_SERVICE_TIMEOUT_S)
+    service.start_workers()
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=service._server.shutdown).start())
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
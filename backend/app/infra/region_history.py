@@ -0,0 +1,126 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+import numpy as np
+from app.core.config import settings
+from app.domain.plastic import PlasticAnalysis
+
+@dataclass
+class RegionSnapshot:
+    """
+    What the last analysis of a region saw: a downsampled grayscale
+    thumbnail of the tile (the change-detection reference) and the
+    detections it produced.
+    """
+    size: Tuple[int, int]
+    thumbnail: np.ndarray  # uint8, (ceil(h / cell), ceil(w / cell))
+    analysis: PlasticAnalysis
+    model_id: str
+    updated: float
+
+class RegionHistory:
+    """
+    Last snapshot per region, for incremental re-analysis on revisits.
+
+    Snapshots live in a bounded in-memory LRU backed by one .npz file per
+    region under `directory`, so they survive restarts and are shared by
+    workers on the host (last writer wins).
+    """
+
+    def __init__(self, directory: str, memory_entries: int = 256):
+        self.directory = Path(directory)
+        self.memory_entries = memory_entries
+        self.logger = logging.getLogger(__name__)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[RegionSnapshot]:
+        with self._lock:
+            snapshot = self._memory.get(key)
+            if snapshot is not None:
+                self._memory.move_to_end(key)
+                return snapshot
+
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            snapshot = self._decode(path.read_bytes())
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning("Discarding unreadable region snapshot %s: %s", path, e)
+            return None
+        self._remember(key, snapshot)
+        return snapshot
+
+    def put(self, key: str, snapshot: RegionSnapshot):
+        self._remember(key, snapshot)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(self._encode(snapshot))
+        os.replace(tmp, path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"memory_entries": len(self._memory)}
+
+    def _remember(self, key: str, snapshot: RegionSnapshot):
+        with self._lock:
+            self._memory[key] = snapshot
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha1(key.encode()).hexdigest()}.npz"
+
+    @staticmethod
+    def _encode(snapshot: RegionSnapshot) -> bytes:
+        analysis = snapshot.analysis
+        header = {
+            "size": list(snapshot.size),
+            "model_id": snapshot.model_id,
+            "updated": snapshot.updated,
+            "object_count": analysis.object_count,
+            "density_score": analysis.density_score,
+            "class_names": {str(c): analysis.label(c) for c in np.unique(analysis.class_ids).tolist()},
+        }
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            header=np.asarray(json.dumps(header)),
+            thumbnail=snapshot.thumbnail,
+            boxes=analysis.boxes,
+            confidences=analysis.confidences,
+            class_ids=analysis.class_ids
+        )
+        return buffer.getvalue()
+
+    @staticmethod
+    def _decode(payload: bytes) -> RegionSnapshot:
+        with np.load(io.BytesIO(payload), allow_pickle=False) as data:
+            header = json.loads(str(data["header"]))
+            return RegionSnapshot(
+                size=tuple(header["size"]),
+                thumbnail=data["thumbnail"],
+                analysis=PlasticAnalysis(
+                    object_count=header["object_count"],
+                    density_score=header["density_score"],
+                    boxes=data["boxes"],
+                    confidences=data["confidences"],
+                    class_ids=data["class_ids"],
+                    class_names={int(k): v for k, v in header["class_names"].items()}
+                ),
+                model_id=header["model_id"],
+                updated=header["updated"]
+            )
+
+# Singleton
+region_history = RegionHistory(settings.REGION_HISTORY_DIR, memory_entries=settings.REGION_HISTORY_MEMORY_ENTRIES)
@@ -0,0 +1,310 @@
+import logging
+import math
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+from app.core.config import settings
+from app.core.metrics import REPORT_STORE_DROPPED, REPORT_STORE_WRITES
+from app.domain.region import BoundingBox, KM_PER_DEG_LAT
+from app.schemas.report import AnalysisReport
+
+# Columns of the compact report row, in insert order
+_COLUMNS = (
+    "cell", "lat", "lng", "created", "object_count", "density_score",
+    "pdi", "sai", "wdi", "risk", "confidence", "intervention_types", "source",
+)
+
+_SELECT = "SELECT r.id, " + ", ".join(f"r.{c}" for c in _COLUMNS) + " FROM reports r"
+
+# The R-tree stores float32 bounds rounded outward, so it narrows the
+# candidates and the exact coordinates decide
+_IN_BOX = (
+    "i.max_lat >= ? AND i.min_lat <= ? AND i.max_lng >= ? AND i.min_lng <= ?"
+    " AND {t}.lat BETWEEN ? AND ? AND {t}.lng BETWEEN ? AND ?"
+)
+
+class ReportStore:
+    """
+    Persistent history of finished analysis reports.
+
+    Each report becomes one compact row (location, indices, risk, intervention
+    types, confidence, timestamp) in a local SQLite database (WAL mode, shared
+    by all workers on the host). An R-tree over report locations serves
+    bounding-box queries, and a per-cell table tracks each cell's latest
+    report, so map and history views never re-run the pipeline.
+
+    Writes are queued by the request and committed in batches by a
+    background writer thread. If the queue is full, the report is dropped
+    rather than delaying the response.
+
+    A cell is the report location rounded to `cell_decimals` (4 ~ 11 m), so
+    repeat analyses of the same point share a time series.
+    """
+
+    def __init__(self, path: str, batch_size: int = 256, flush_interval_ms: float = 500.0,
+                 queue_size: int = 10000, cell_decimals: int = 4):
+        self.path = Path(path)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_s = max(0.0, flush_interval_ms) / 1000.0
+        self.cell_decimals = cell_decimals
+        self.logger = logging.getLogger(__name__)
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._local = threading.local()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self.counters = {"queued": 0, "written": 0, "dropped": 0, "batches": 0, "errors": 0}
+
+    # --- Writes -------------------------------------------------------------
+
+    def submit(self, report: AnalysisReport, source: str = None, created: float = None) -> bool:
+        """
+        Queues a finished report for persistence. Never blocks; returns False
+        if the report was dropped because the writer is backed up.
+        """
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(self.to_row(report, source, created))
+        except queue.Full:
+            self._count("dropped")
+            REPORT_STORE_DROPPED.inc()
+            return False
+        self._count("queued")
+        return True
+
+    def to_row(self, report: AnalysisReport, source: str = None, created: float = None) -> tuple:
+        region, heat = report.region, report.heat_index
+        types = sorted({i.action_type.value for i in report.interventions})
+        return (
+            self.cell_key(region.lat, region.lng),
+            region.lat,
+            region.lng,
+            time.time() if created is None else created,
+            report.plastic.object_count,
+            report.plastic.density_score,
+            heat.plastic_density_index,
+            heat.surface_absorption_index,
+            heat.water_deficit_index,
+            heat.urban_risk_index,
+            report.confidence["score"] if report.confidence else None,
+            ",".join(types),
+            source,
+        )
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """
+        Waits until every queued report has been committed.
+        """
+        if self._worker is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def write_rows(self, rows: List[tuple]):
+        """
+        Inserts rows in one transaction, updating the location index and
+        the latest report per cell.
+        """
+        conn = self._conn()
+        with conn:
+            # Rows are inserted one at a time: each needs its rowid for the index tables
+            for row in rows:
+                report_id = conn.execute(
+                    f"INSERT INTO reports ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})", row
+                ).lastrowid
+                cell, lat, lng, created = row[:4]
+                conn.execute("INSERT INTO report_index VALUES (?, ?, ?, ?, ?)", (report_id, lat, lat, lng, lng))
+                current = conn.execute("SELECT id, latest_created FROM cells WHERE cell = ?", (cell,)).fetchone()
+                if current is None:
+                    cell_id = conn.execute(
+                        "INSERT INTO cells (cell, lat, lng, latest_id, latest_created) VALUES (?, ?, ?, ?, ?)",
+                        (cell, lat, lng, report_id, created)
+                    ).lastrowid
+                    conn.execute("INSERT INTO cell_index VALUES (?, ?, ?, ?, ?)", (cell_id, lat, lat, lng, lng))
+                elif created >= current[1]:
+                    conn.execute("UPDATE cells SET latest_id = ?, latest_created = ? WHERE id = ?",
+                                 (report_id, created, current[0]))
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="report-writer", daemon=True)
+                self._worker.start()
+
+    def _collect_batch(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.flush_interval_s
+        # A flush marker (Event) commits what has been collected so far
+        while len(batch) < self.batch_size and not isinstance(batch[-1], threading.Event):
+            timeout = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            rows = [item for item in batch if isinstance(item, tuple)]
+            if rows:
+                try:
+                    self.write_rows(rows)
+                    self._count("written", len(rows))
+                    self._count("batches")
+                    REPORT_STORE_WRITES.inc(len(rows))
+                except Exception:
+                    # Never let a bad batch end the writer thread
+                    self.logger.exception("Failed to persist %d report(s)", len(rows))
+                    self._count("errors")
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    # --- Queries ------------------------------------------------------------
+
+    def in_bbox(self, bbox: BoundingBox, since: float = None, until: float = None, limit: int = 1000) -> List[dict]:
+        """
+        Every stored report inside the box, newest first.
+        """
+        sql = (_SELECT + " JOIN report_index i ON i.id = r.id WHERE " + _IN_BOX.format(t="r"))
+        params = self._box_params(bbox.min_lat, bbox.max_lat, bbox.min_lng, bbox.max_lng)
+        sql, params = self._time_filter(sql, params, since, until)
+        return self._fetch(sql + " ORDER BY r.created DESC LIMIT ?", params + [limit])
+
+    def latest_in_bbox(self, bbox: BoundingBox, limit: int = 1000) -> List[dict]:
+        """
+        The most recent report of every cell inside the box.
+        """
+        sql = (_SELECT + " JOIN cells c ON c.latest_id = r.id JOIN cell_index i ON i.id = c.id"
+               " WHERE " + _IN_BOX.format(t="c") + " LIMIT ?")
+        return self._fetch(sql, self._box_params(bbox.min_lat, bbox.max_lat, bbox.min_lng, bbox.max_lng) + [limit])
+
+    def series(self, lat: float, lng: float, radius_m: float = 50.0, since: float = None, until: float = None,
+               limit: int = 1000) -> Optional[dict]:
+        """
+        Time series (oldest first) of the stored cell nearest the point within
+        `radius_m`, or None if there is none.
+        """
+        cell = self._nearest_cell(lat, lng, radius_m)
+        if cell is None:
+            return None
+        sql, params = self._time_filter(_SELECT + " WHERE r.cell = ?", [cell], since, until)
+        # Newest `limit` points, returned in time order
+        rows = self._fetch(sql + " ORDER BY r.created DESC LIMIT ?", params + [limit])
+        return {"cell": cell, "reports": rows[::-1]}
+
+    def _nearest_cell(self, lat: float, lng: float, radius_m: float) -> Optional[str]:
+        dlat = radius_m / 1000 / KM_PER_DEG_LAT
+        km_per_deg_lng = KM_PER_DEG_LAT * max(math.cos(math.radians(lat)), 1e-6)
+        dlng = radius_m / 1000 / km_per_deg_lng
+        candidates = self._conn().execute(
+            "SELECT c.cell, c.lat, c.lng FROM cell_index i JOIN cells c ON c.id = i.id WHERE " + _IN_BOX.format(t="c"),
+            self._box_params(lat - dlat, lat + dlat, lng - dlng, lng + dlng)
+        ).fetchall()
+        if not candidates:
+            return None
+        # Equirectangular distance is accurate enough at this scale
+        return min(
+            candidates,
+            key=lambda c: ((c[1] - lat) * KM_PER_DEG_LAT) ** 2 + ((c[2] - lng) * km_per_deg_lng) ** 2
+        )[0]
+
+    @staticmethod
+    def _box_params(min_lat: float, max_lat: float, min_lng: float, max_lng: float) -> list:
+        return [min_lat, max_lat, min_lng, max_lng] * 2
+
+    @staticmethod
+    def _time_filter(sql: str, params: list, since: float, until: float):
+        if since is not None:
+            sql += " AND r.created >= ?"
+            params.append(since)
+        if until is not None:
+            sql += " AND r.created <= ?"
+            params.append(until)
+        return sql, params
+
+    def _fetch(self, sql: str, params: list) -> List[dict]:
+        return [self._to_dict(row) for row in self._conn().execute(sql, params)]
+
+    @staticmethod
+    def _to_dict(row: tuple) -> dict:
+        (report_id, cell, lat, lng, created, count, density, pdi, sai, wdi, risk,
+         confidence, types, source) = row
+        return {
+            "id": report_id,
+            "cell": cell,
+            "location": {"lat": lat, "lng": lng},
+            "created": created,
+            "plastic_analysis": {"count": count, "density_score": density},
+            "indices": {"pdi": pdi, "sai": sai, "wdi": wdi},
+            "heat_score": risk,
+            "intervention_types": types.split(",") if types else [],
+            "confidence": confidence,
+            "source": source,
+        }
+
+    # --- Internals ----------------------------------------------------------
+
+    def cell_key(self, lat: float, lng: float) -> str:
+        d = self.cell_decimals
+        return f"{lat:.{d}f},{lng:.{d}f}"
+
+    def stats(self) -> dict:
+        with self._counter_lock:
+            return {**self.counters, "pending": self._queue.qsize()}
+
+    def _count(self, name: str, n: int = 1):
+        with self._counter_lock:
+            self.counters[name] += n
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared across threads; keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS reports ("
+                    " id INTEGER PRIMARY KEY, cell TEXT NOT NULL, lat REAL NOT NULL, lng REAL NOT NULL,"
+                    " created REAL NOT NULL, object_count INTEGER, density_score REAL,"
+                    " pdi REAL, sai REAL, wdi REAL, risk REAL, confidence REAL,"
+                    " intervention_types TEXT, source TEXT)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS reports_cell_created ON reports (cell, created)")
+                conn.execute("CREATE INDEX IF NOT EXISTS reports_created ON reports (created)")
+                conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS report_index USING rtree(id, min_lat, max_lat, min_lng, max_lng)"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cells ("
+                    " id INTEGER PRIMARY KEY, cell TEXT NOT NULL UNIQUE, lat REAL NOT NULL, lng REAL NOT NULL,"
+                    " latest_id INTEGER NOT NULL, latest_created REAL NOT NULL)"
+                )
+                conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS cell_index USING rtree(id, min_lat, max_lat, min_lng, max_lng)"
+                )
+            self._local.conn = conn
+        return conn
+
+# Singleton
+report_store = ReportStore(
+    settings.REPORT_STORE_PATH,
+    batch_size=settings.REPORT_STORE_BATCH_SIZE,
+    flush_interval_ms=settings.REPORT_STORE_FLUSH_MS,
+    queue_size=settings.REPORT_STORE_QUEUE_SIZE,
+    cell_decimals=settings.REPORT_CELL_DECIMALS
+)
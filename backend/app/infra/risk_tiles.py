@@ -0,0 +1,124 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+import numpy as np
+from PIL import Image
+from app.core.config import settings
+
+# Raster layers of the risk pyramid, in storage order
+LAYERS = ("risk", "pdi", "sai", "wdi")
+TILE_PX = 256
+
+def _colormap() -> np.ndarray:
+    # 0-10 scale in 256 steps: green -> yellow -> red, semi-transparent
+    t = np.linspace(0.0, 1.0, 256)
+    red = np.clip(2.0 * t, 0.0, 1.0)
+    green = np.clip(2.0 * (1.0 - t), 0.0, 1.0)
+    lut = np.stack([red * 255, green * 255, np.full_like(t, 40), np.full_like(t, 180)], axis=1)
+    return lut.astype(np.uint8)
+
+COLORMAP = _colormap()
+
+def render_tile(values: np.ndarray) -> bytes:
+    """
+    PNG of a (256, 256) tile of 0-10 index values; NaN (no data) is transparent.
+    """
+    nodata = np.isnan(values)
+    levels = np.clip(np.nan_to_num(values) * 25.5, 0, 255).astype(np.uint8)
+    rgba = COLORMAP[levels]
+    rgba[nodata] = 0
+    buffer = io.BytesIO()
+    Image.fromarray(rgba, "RGBA").save(buffer, "PNG", optimize=False)
+    return buffer.getvalue()
+
+class RiskTileStore:
+    """
+    XYZ tiles of the precomputed risk pyramid (scripts/build_risk_tiles.py),
+    stored as {root}/{layer}/{z}/{x}/{y}.png.
+
+    Reads go through a byte-bounded in-memory LRU. Entries are revalidated
+    against the file's mtime and size, so a rebuild is picked up without a
+    restart. Each tile's ETag is a hash of its content, which gives every
+    worker the same ETag for the same tile.
+    """
+
+    def __init__(self, root: str, cache_bytes: int = 64 * 1024 * 1024):
+        self.root = Path(root)
+        self.cache_bytes = cache_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, layer: str, z: int, x: int, y: int) -> Path:
+        return self.root / layer / str(z) / str(x) / f"{y}.png"
+
+    def get(self, layer: str, z: int, x: int, y: int) -> Optional[Tuple[bytes, str]]:
+        """
+        (png, etag) of a tile, or None if the pyramid has no data there.
+        """
+        path = self.path(layer, z, x, y)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = (layer, z, x, y)
+        version = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and entry[0] == version:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return entry[1], entry[2]
+            self.misses += 1
+
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        etag = '"' + hashlib.sha1(data).hexdigest() + '"'
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.nbytes -= len(previous[1])
+            self._items[key] = (version, data, etag)
+            self.nbytes += len(data)
+            while self.nbytes > self.cache_bytes and self._items:
+                _, evicted = self._items.popitem(last=False)
+                self.nbytes -= len(evicted[1])
+        return data, etag
+
+    def write(self, layer: str, z: int, x: int, y: int, data: Optional[bytes]):
+        """
+        Atomically replaces a tile; None removes it (no data left).
+        """
+        path = self.path(layer, z, x, y)
+        if data is None:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "bytes": self.nbytes,
+                "max_bytes": self.cache_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+# Singleton
+risk_tile_store = RiskTileStore(settings.RISK_TILES_DIR, cache_bytes=settings.RISK_TILES_CACHE_MB * 1024 * 1024)
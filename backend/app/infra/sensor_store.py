@@ -0,0 +1,270 @@
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from app.core.config import settings
+from app.domain.sensor import SensorReading
+
+# Reading channels, in column order
+CHANNELS = ("temp_c", "humidity_percent", "pm25")
+
+KM_PER_DEG_LAT = 111.32
+
+class SensorStore:
+    """
+    In-process time-series store for ground sensor readings.
+
+    All devices share columnar NumPy arrays:
+      - a ring buffer per device of the last `capacity` raw readings
+      - per-device time buckets (`bucket_seconds` wide, `window_buckets` of
+        them) holding running sum / max / count per channel, so rolling-window
+        aggregates are precomputed at write time and a query only reduces a
+        handful of buckets
+    A uniform lat/lng grid index maps a point to nearby devices without
+    scanning the registry.
+    """
+
+    def __init__(self, capacity: int = 256, bucket_seconds: int = 60, window_buckets: int = 15,
+                 index_cell_km: float = 2.0, initial_devices: int = 1024):
+        self.capacity = capacity
+        self.bucket_seconds = bucket_seconds
+        self.window_buckets = window_buckets
+        self.index_cell_deg = index_cell_km / KM_PER_DEG_LAT
+        self._lock = threading.RLock()
+
+        self._ids: Dict[str, int] = {}
+        self._grid: Dict[tuple, List[int]] = {}
+        self._n = 0
+        self._allocate(initial_devices)
+        self.readings_ingested = 0
+
+    def _allocate(self, devices: int):
+        c, b, k = self.capacity, self.window_buckets, len(CHANNELS)
+        self.lat = np.zeros(devices)
+        self.lng = np.zeros(devices)
+        self.calibrated = np.zeros(devices, dtype=bool)
+        self.ring_ts = np.zeros((devices, c))
+        self.ring_values = np.zeros((devices, c, k), dtype=np.float32)
+        self.ring_head = np.zeros(devices, dtype=np.int64)
+        self.ring_count = np.zeros(devices, dtype=np.int64)
+        self.last_ts = np.zeros(devices)
+        self.bucket_id = np.full((devices, b), -1, dtype=np.int64)
+        self.bucket_sum = np.zeros((devices, b, k))
+        self.bucket_max = np.full((devices, b, k), -np.inf, dtype=np.float32)
+        self.bucket_n = np.zeros((devices, b), dtype=np.int64)
+
+    def _grow(self):
+        old = {name: getattr(self, name) for name in (
+            "lat", "lng", "calibrated", "ring_ts", "ring_values", "ring_head", "ring_count", "last_ts",
+            "bucket_id", "bucket_sum", "bucket_max", "bucket_n"
+        )}
+        self._allocate(len(self.lat) * 2)
+        for name, array in old.items():
+            getattr(self, name)[:len(array)] = array
+
+    # --- Devices --------------------------------------------------------------
+
+    def register_device(self, device_id: str, lat: float, lng: float, calibrated: bool = True):
+        with self._lock:
+            idx = self._ids.get(device_id)
+            if idx is None:
+                if self._n == len(self.lat):
+                    self._grow()
+                idx = self._ids[device_id] = self._n
+                self._n += 1
+            else:
+                self._grid[self._cell(self.lat[idx], self.lng[idx])].remove(idx)
+
+            self.lat[idx], self.lng[idx], self.calibrated[idx] = lat, lng, calibrated
+            self._grid.setdefault(self._cell(lat, lng), []).append(idx)
+
+    @property
+    def device_count(self) -> int:
+        return self._n
+
+    # --- Ingestion ------------------------------------------------------------
+
+    def ingest(self, device_ids: Sequence[str], timestamps, temp_c, humidity_percent, pm25) -> int:
+        """
+        Appends a batch of readings (parallel sequences; timestamps in epoch
+        seconds). Readings from unknown devices or with non-finite
+        timestamps are skipped. Returns the number of readings stored.
+        """
+        with self._lock:
+            lookup = self._ids
+            idx = np.fromiter((lookup.get(d, -1) for d in device_ids), dtype=np.int64, count=len(device_ids))
+            known = (idx >= 0) & np.isfinite(np.asarray(timestamps, dtype=np.float64))
+            if not known.all():
+                idx = idx[known]
+            if len(idx) == 0:
+                return 0
+
+            ts = np.asarray(timestamps, dtype=np.float64)[known]
+            values = np.stack([
+                np.asarray(temp_c, dtype=np.float32)[known],
+                np.asarray(humidity_percent, dtype=np.float32)[known],
+                np.asarray(pm25, dtype=np.float32)[known],
+            ], axis=1)
+
+            self._append_ring(idx, ts, values)
+            self._update_buckets(idx, ts, values)
+            np.maximum.at(self.last_ts, idx, ts)
+            self.readings_ingested += len(idx)
+            return len(idx)
+
+    def _append_ring(self, idx: np.ndarray, ts: np.ndarray, values: np.ndarray):
+        # Position of each reading within its device's run in this batch
+        order = np.argsort(idx, kind="stable")
+        sorted_idx = idx[order]
+        starts = np.flatnonzero(np.r_[True, sorted_idx[1:] != sorted_idx[:-1]])
+        run_lengths = np.diff(np.r_[starts, len(sorted_idx)])
+        rank = np.arange(len(sorted_idx)) - np.repeat(starts, run_lengths)
+
+        slots = (self.ring_head[sorted_idx] + rank) % self.capacity
+        self.ring_ts[sorted_idx, slots] = ts[order]
+        self.ring_values[sorted_idx, slots] = values[order]
+
+        devices = sorted_idx[starts]
+        self.ring_head[devices] = (self.ring_head[devices] + run_lengths) % self.capacity
+        self.ring_count[devices] = np.minimum(self.ring_count[devices] + run_lengths, self.capacity)
+
+    def _update_buckets(self, idx: np.ndarray, ts: np.ndarray, values: np.ndarray):
+        b = self.window_buckets
+        bucket = (ts // self.bucket_seconds).astype(np.int64)
+        flat = idx * b + bucket % b
+
+        ids = self.bucket_id.reshape(-1)
+        sums = self.bucket_sum.reshape(-1, len(CHANNELS))
+        maxes = self.bucket_max.reshape(-1, len(CHANNELS))
+        counts = self.bucket_n.reshape(-1)
+
+        # Advance slots whose bucket rolled over; late readings for an
+        # already-recycled bucket are kept in the ring but not aggregated.
+        latest = ids.copy()
+        np.maximum.at(latest, flat, bucket)
+        rolled = np.unique(flat[latest[flat] != ids[flat]])
+        ids[rolled] = latest[rolled]
+        sums[rolled] = 0.0
+        maxes[rolled] = -np.inf
+        counts[rolled] = 0
+
+        current = bucket == ids[flat]
+        flat, values = flat[current], values[current]
+        np.add.at(sums, flat, values)
+        np.maximum.at(maxes, flat, values)
+        np.add.at(counts, flat, 1)
+
+    # --- Queries --------------------------------------------------------------
+
+    def nearby_devices(self, lat: float, lng: float, radius_km: float, calibrated_only: bool = True) -> np.ndarray:
+        """
+        Indices of devices within `radius_km` of the point.
+        """
+        cell_lat, cell_lng = self._cell(lat, lng)
+        reach_lat = int(math.ceil(radius_km / KM_PER_DEG_LAT / self.index_cell_deg))
+        km_per_deg_lng = KM_PER_DEG_LAT * max(math.cos(math.radians(lat)), 1e-6)
+        reach_lng = int(math.ceil(min(radius_km / km_per_deg_lng, 360.0) / self.index_cell_deg))
+
+        # Cell window, clipped to the valid lat/lng range (near the poles the
+        # longitude reach would otherwise grow without bound)
+        min_lat, min_lng = self._cell(-90.0, -180.0)
+        max_lat, max_lng = self._cell(90.0, 180.0)
+        lat_lo, lat_hi = max(cell_lat - reach_lat, min_lat), min(cell_lat + reach_lat, max_lat)
+        lng_lo, lng_hi = max(cell_lng - reach_lng, min_lng), min(cell_lng + reach_lng, max_lng)
+
+        candidates = []
+        if (lat_hi - lat_lo + 1) * (lng_hi - lng_lo + 1) > len(self._grid):
+            # Wide query: cheaper to walk the occupied cells than the window
+            for (cy, cx), members in self._grid.items():
+                if lat_lo <= cy <= lat_hi and lng_lo <= cx <= lng_hi:
+                    candidates.extend(members)
+        else:
+            for cy in range(lat_lo, lat_hi + 1):
+                for cx in range(lng_lo, lng_hi + 1):
+                    candidates.extend(self._grid.get((cy, cx), ()))
+        if not candidates:
+            return np.zeros(0, dtype=np.int64)
+
+        cand = np.asarray(candidates, dtype=np.int64)
+        # Equirectangular distance is accurate enough at neighborhood scale
+        dy_km = (self.lat[cand] - lat) * KM_PER_DEG_LAT
+        dx_km = (self.lng[cand] - lng) * km_per_deg_lng
+        keep = dy_km * dy_km + dx_km * dx_km <= radius_km * radius_km
+        if calibrated_only:
+            keep &= self.calibrated[cand]
+        return cand[keep]
+
+    def aggregate(self, lat: float, lng: float, radius_km: float, now: float = None) -> Optional[SensorReading]:
+        """
+        Rolling-window aggregate over calibrated devices near the point, or
+        None if none of them reported within the window.
+        """
+        now = time.time() if now is None else now
+        newest_bucket = int(now // self.bucket_seconds)
+        oldest_bucket = newest_bucket - self.window_buckets + 1
+
+        with self._lock:
+            devices = self.nearby_devices(lat, lng, radius_km)
+            if len(devices) == 0:
+                return None
+
+            # Buckets stamped in the future (bad device clocks) are never live
+            bucket_ids = self.bucket_id[devices]
+            live = (bucket_ids >= oldest_bucket) & (bucket_ids <= newest_bucket)  # (d, b)
+            counts = np.where(live, self.bucket_n[devices], 0)        # (d, b)
+            total = counts.sum()
+            if total == 0:
+                return None
+
+            sums = (self.bucket_sum[devices] * live[..., None]).sum(axis=(0, 1))
+            maxes = np.where(live[..., None], self.bucket_max[devices], -np.inf).max(axis=(0, 1))
+            reporting = int((counts.sum(axis=1) > 0).sum())
+            # last_ts can hold a bad timestamp; never report past the newest live bucket
+            newest_live = int(bucket_ids[live].max())
+            latest = min(float(self.last_ts[devices].max()), (newest_live + 1) * self.bucket_seconds)
+
+        means = sums / total
+        return SensorReading(
+            device_count=reporting,
+            ambient_temp_c=round(float(means[0]), 1),
+            humidity_percent=round(float(means[1]), 1),
+            pm25_level=round(float(means[2]), 1),
+            is_calibrated=True,
+            timestamp=datetime.fromtimestamp(latest).isoformat(),
+            max_temp_c=round(float(maxes[0]), 1),
+            max_humidity_percent=round(float(maxes[1]), 1),
+            max_pm25_level=round(float(maxes[2]), 1),
+            window_minutes=self.window_buckets * self.bucket_seconds / 60
+        )
+
+    def recent(self, device_id: str, limit: int = None) -> np.ndarray:
+        """
+        Raw readings for one device, oldest first, as an (n, 4) array of
+        [timestamp, temp_c, humidity_percent, pm25].
+        """
+        with self._lock:
+            idx = self._ids[device_id]
+            n = int(self.ring_count[idx])
+            slots = (self.ring_head[idx] - n + np.arange(n)) % self.capacity
+            rows = np.column_stack([self.ring_ts[idx, slots], self.ring_values[idx, slots]])
+        return rows[-limit:] if limit else rows
+
+    def stats(self) -> dict:
+        return {
+            "devices": self._n,
+            "readings_ingested": self.readings_ingested,
+            "indexed_cells": len(self._grid),
+        }
+
+    def _cell(self, lat: float, lng: float) -> tuple:
+        return int(math.floor(lat / self.index_cell_deg)), int(math.floor(lng / self.index_cell_deg))
+
+# Singleton
+sensor_store = SensorStore(
+    capacity=settings.SENSOR_RING_CAPACITY,
+    bucket_seconds=settings.SENSOR_BUCKET_SECONDS,
+    window_buckets=settings.SENSOR_WINDOW_BUCKETS,
+    index_cell_km=settings.SENSOR_RADIUS_KM
+)
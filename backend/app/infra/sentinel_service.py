@@ -1,49 +1,103 @@
 from pathlib import Path
+import numpy as np
 from PIL import Image
+from app.core.config import settings
 from app.domain.region import Region
+from app.infra.tile_store import TileStore, iter_scene_files
 import logging
 
 class SentinelService:
-    def __init__(self, cache_dir: str = "backend/data/sentinel_cache"):
+    def __init__(self, cache_dir: str = "backend/data/sentinel_cache", tile_store: TileStore = None,
+                 source_dir: str = None):
+        # Only read from (demo tile); nothing is created at import time
         self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.logger = logging.getLogger(__name__)
+        self.tile_store = tile_store or TileStore(
+            settings.TILE_STORE_DIR,
+            index_zoom=settings.TILE_INDEX_ZOOM,
+            cache_bytes=settings.TILE_CACHE_MB * 1024 * 1024
+        )
+        # Local directory standing in for the Copernicus download
+        source_dir = source_dir or settings.SENTINEL_SOURCE_DIR
+        self.source_dir = Path(source_dir) if source_dir else None
 
     def get_satellite_image(self, region: Region) -> Image.Image:
         """
         Retrieves a satellite image for the given region.
-        For Phase 3 (Lite), this looks for a pre-fetched/cached tile 
-        matching the region (roughly) or returns a default demo tile.
+        Resolution order: the local tile store (a window around the point),
+        the local source directory (ingested on demand), the demo tile,
+        and finally a flat placeholder.
         """
-        # MVP Lite logic:
-        # Check if we have a file named 'demo_tile.tif' or 'demo_tile.png' in cache
-        # In a real system, we'd hash lat/lon to finding the tile ID.
-        
-        demo_path = self.cache_dir / "demo_tile.png"
-        
-        if demo_path.exists():
-            self.logger.info(f"Loading cached Sentinel tile from {demo_path}")
-            return Image.open(demo_path).convert("RGB")
-        
+        size = settings.SENTINEL_WINDOW_PX
+        window = self.tile_store.read_around(region.lat, region.lng, size)
+
+        if window is None and self._download(region):
+            window = self.tile_store.read_around(region.lat, region.lng, size)
+
+        if window is not None:
+            return Image.fromarray(window)
+
+        # MVP Lite fallback: the demo tile, decoded once and kept in the window cache
+        demo = self._demo_tile()
+        if demo is not None:
+            return Image.fromarray(demo)
+
         self.logger.warning("No cached tile found. In a real system, this would trigger a download.")
         self.logger.info("Generating/Returning a placeholder for demo.")
-        
+
         # Return a simple placeholder if nothing exists (should be handled by setup script)
         img = Image.new('RGB', (640, 640), color = (73, 109, 137))
         return img
 
+    def _download(self, region: Region) -> bool:
+        """
+        Fetches scenes covering the region into the tile store. Stands in for
+        the Copernicus download by ingesting matching scenes from
+        SENTINEL_SOURCE_DIR. Returns True if anything was ingested.
+        """
+        if self.source_dir is None or not self.source_dir.is_dir():
+            return False
+
+        ingested = False
+        for image_path, meta in iter_scene_files(self.source_dir):
+            west, south, east, north = meta["bounds"]
+            if west <= region.lng <= east and south <= region.lat <= north:
+                self.logger.info(f"Ingesting {image_path} from local source for ({region.lat}, {region.lng})")
+                self.tile_store.ingest_file(image_path, meta)
+                ingested = True
+        return ingested
+
+    def _demo_tile(self):
+        key = ("demo_tile",)
+        demo = self.tile_store.cache.get(key)
+        if demo is None:
+            demo_path = self.cache_dir / "demo_tile.png"
+            if not demo_path.exists():
+                return None
+            self.logger.info(f"Loading cached Sentinel tile from {demo_path}")
+            with Image.open(demo_path) as img:
+                demo = np.asarray(img.convert("RGB"))
+            self.tile_store.cache.put(key, demo)
+        return demo
+
     def get_metadata(self, region: Region) -> dict:
         """
         Returns authentic-looking metadata for the tile.
         In production, this would parse the XML/JSON associated with the Sentinel product.
         """
-        return {
+        metadata = {
             "provider": "Copernicus Sentinel-2",
             "resolution": "10m",
             "cloud_cover": "12%", # Mocked for MVP
             "acquisition_date": "2025-01-14",
             "band_info": "Multispectral (B2/B3/B4/B8)"
         }
+        scenes = self.tile_store.find_scenes(region.lat, region.lng)
+        if scenes:
+            metadata["scene_id"] = scenes[0].scene_id
+            if scenes[0].meta.get("acquired"):
+                metadata["acquisition_date"] = scenes[0].meta["acquired"]
+        return metadata
 
 # Singleton
 sentinel_service = SentinelService()
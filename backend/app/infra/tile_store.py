@@ -0,0 +1,398 @@
+import json
+import logging
+import math
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from PIL import Image
+
+# --- Quadkey grid -------------------------------------------------------------
+
+def latlng_to_tile(lat: float, lng: float, zoom: int) -> Tuple[int, int]:
+    """
+    Web-mercator (XYZ) tile containing the point at the given zoom.
+    """
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    n = 1 << zoom
+    x = int((lng + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+def lng_to_pixel_x(lng, zoom: int, tile_px: int = 256):
+    """
+    Global web-mercator pixel x (float, vectorized) at the given zoom.
+    """
+    return (np.asarray(lng, dtype=np.float64) + 180.0) / 360.0 * (tile_px << zoom)
+
+def lat_to_pixel_y(lat, zoom: int, tile_px: int = 256):
+    """
+    Global web-mercator pixel y (float, vectorized) at the given zoom.
+    """
+    lat = np.radians(np.clip(np.asarray(lat, dtype=np.float64), -85.05112878, 85.05112878))
+    return (1.0 - np.arcsinh(np.tan(lat)) / np.pi) / 2.0 * (tile_px << zoom)
+
+def tile_to_quadkey(x: int, y: int, zoom: int) -> str:
+    digits = []
+    for z in range(zoom, 0, -1):
+        mask = 1 << (z - 1)
+        digits.append(str((1 if x & mask else 0) + (2 if y & mask else 0)))
+    return "".join(digits)
+
+def latlng_to_quadkey(lat: float, lng: float, zoom: int) -> str:
+    return tile_to_quadkey(*latlng_to_tile(lat, lng, zoom), zoom)
+
+def quadkeys_for_bounds(bounds: Tuple[float, float, float, float], zoom: int) -> List[str]:
+    """
+    All quadkeys at `zoom` intersecting (west, south, east, north).
+    """
+    west, south, east, north = bounds
+    x0, y0 = latlng_to_tile(north, west, zoom)
+    x1, y1 = latlng_to_tile(south, east, zoom)
+    return [tile_to_quadkey(x, y, zoom) for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)]
+
+# --- Decoded-array LRU --------------------------------------------------------
+
+class ArrayLRU:
+    """
+    LRU of numpy arrays bounded by total bytes rather than entry count.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[np.ndarray]:
+        with self._lock:
+            array = self._items.get(key)
+            if array is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return array
+
+    def put(self, key, array: np.ndarray):
+        if array.nbytes > self.max_bytes:
+            return
+        # Cached arrays are shared between callers
+        array.setflags(write=False)
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous.nbytes
+            self._items[key] = array
+            self.nbytes += array.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+# --- Chunked scene rasters ----------------------------------------------------
+
+class Scene:
+    """
+    One ingested scene. Each raster layer is stored as a .npy array of shape
+    (chunk_rows, chunk_cols, chunk, chunk, bands) and opened memory-mapped,
+    so reading a window only touches the chunks it overlaps.
+    """
+
+    def __init__(self, root: Path, meta: dict):
+        self.root = root
+        self.meta = meta
+        self.scene_id = meta["scene_id"]
+        self.bounds = tuple(meta["bounds"])  # west, south, east, north
+        self.width = meta["width"]
+        self.height = meta["height"]
+        self.chunk = meta["chunk"]
+        self._layers = {}
+
+    def contains(self, lat: float, lng: float) -> bool:
+        west, south, east, north = self.bounds
+        return west <= lng <= east and south <= lat <= north
+
+    def to_pixel(self, lat: float, lng: float) -> Tuple[float, float]:
+        west, south, east, north = self.bounds
+        col = (lng - west) / (east - west) * self.width
+        row = (north - lat) / (north - south) * self.height
+        return col, row
+
+    def layer(self, name: str) -> np.ndarray:
+        array = self._layers.get(name)
+        if array is None:
+            array = self._layers[name] = np.load(self.root / f"{name}.npy", mmap_mode="r")
+        return array
+
+    def has_layer(self, name: str) -> bool:
+        return (self.root / f"{name}.npy").exists()
+
+    def read_window(self, name: str, x0: int, y0: int, w: int, h: int) -> np.ndarray:
+        """
+        Returns an (h, w, bands) array; the window must lie inside the scene.
+        """
+        c = self.chunk
+        chunks = self.layer(name)
+        cy0, cy1 = y0 // c, (y0 + h - 1) // c
+        cx0, cx1 = x0 // c, (x0 + w - 1) // c
+
+        # Only the overlapped chunks are read from disk
+        block = np.asarray(chunks[cy0:cy1 + 1, cx0:cx1 + 1])
+        ny, nx, _, _, bands = block.shape
+        mosaic = block.transpose(0, 2, 1, 3, 4).reshape(ny * c, nx * c, bands)
+        oy, ox = y0 - cy0 * c, x0 - cx0 * c
+        return np.ascontiguousarray(mosaic[oy:oy + h, ox:ox + w])
+
+    def release_window(self, name: str, x0: int, y0: int, w: int, h: int):
+        """
+        Unmaps the pages of the chunks a window overlaps from this process.
+        They stay in the OS page cache and fault back in on the next read.
+        For streaming over whole scenes: otherwise every page read stays
+        resident and counts toward RSS.
+        """
+        chunks = self.layer(name)
+        mapping = getattr(chunks, "_mmap", None)
+        if mapping is None or not hasattr(mmap, "MADV_DONTNEED"):
+            return
+        c = self.chunk
+        row_bytes, chunk_bytes = chunks.strides[0], chunks.strides[1]
+        # np.memmap maps from an allocation-granularity boundary before the header
+        base = chunks.offset % mmap.ALLOCATIONGRANULARITY
+        for cy in range(y0 // c, (y0 + h - 1) // c + 1):
+            start = base + cy * row_bytes + (x0 // c) * chunk_bytes
+            end = base + cy * row_bytes + ((x0 + w - 1) // c + 1) * chunk_bytes
+            # Rounding out to whole pages only refaults a neighbor's edge
+            start -= start % mmap.PAGESIZE
+            mapping.madvise(mmap.MADV_DONTNEED, start, min(end, len(mapping)) - start)
+
+def write_chunked(path: Path, array: np.ndarray, chunk: int):
+    """
+    Stores an (H, W, bands) array in the chunked layout read by Scene.
+    Edge chunks are zero-padded.
+    """
+    if array.ndim == 2:
+        array = array[:, :, None]
+    h, w, bands = array.shape
+    ny, nx = -(-h // chunk), -(-w // chunk)
+
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=array.dtype, shape=(ny, nx, chunk, chunk, bands))
+    for cy in range(ny):
+        rows = array[cy * chunk:(cy + 1) * chunk]
+        for cx in range(nx):
+            tile = rows[:, cx * chunk:(cx + 1) * chunk]
+            out[cy, cx, :tile.shape[0], :tile.shape[1]] = tile
+    out.flush()
+    del out
+
+# --- Store --------------------------------------------------------------------
+
+class TileStore:
+    """
+    Local store of ingested scenes with a quadkey grid index.
+
+    Every scene is registered under each quadkey (at `index_zoom`) its bounds
+    intersect, so a lat/lng resolves to its candidate scenes with one dict
+    lookup. Decoded windows are kept in a byte-bounded LRU.
+    """
+
+    def __init__(self, root: str, index_zoom: int = 12, chunk: int = 256, cache_bytes: int = 256 * 1024 * 1024):
+        self.root = Path(root)
+        self.index_zoom = index_zoom
+        self.chunk = chunk
+        self.cache = ArrayLRU(cache_bytes)
+        self.logger = logging.getLogger(__name__)
+        self._index = None  # quadkey -> [scene_id]
+        self._scenes: Dict[str, Scene] = {}
+        self._lock = threading.Lock()
+
+    # --- Lookup ---------------------------------------------------------------
+
+    def find_scenes(self, lat: float, lng: float) -> List[Scene]:
+        """
+        Scenes covering the point, most recently acquired first.
+        """
+        scene_ids = self._get_index().get(latlng_to_quadkey(lat, lng, self.index_zoom), [])
+        scenes = [self._scene(sid) for sid in scene_ids]
+        scenes = [s for s in scenes if s.contains(lat, lng)]
+        return sorted(scenes, key=lambda s: s.meta.get("acquired") or "", reverse=True)
+
+    def find_scenes_in_bounds(self, bounds: Tuple[float, float, float, float]) -> List[Scene]:
+        """
+        Scenes intersecting (west, south, east, north), most recently acquired first.
+        """
+        index = self._get_index()
+        scene_ids = {sid for qk in quadkeys_for_bounds(bounds, self.index_zoom) for sid in index.get(qk, ())}
+        west, south, east, north = bounds
+        scenes = []
+        for sid in scene_ids:
+            scene = self._scene(sid)
+            s_west, s_south, s_east, s_north = scene.bounds
+            if s_west <= east and west <= s_east and s_south <= north and south <= s_north:
+                scenes.append(scene)
+        return sorted(scenes, key=lambda s: s.meta.get("acquired") or "", reverse=True)
+
+    def read_around(self, lat: float, lng: float, size: int, layer: str = "rgb") -> Optional[np.ndarray]:
+        """
+        A size x size window centered on the point (shifted to stay inside the
+        scene), or None if no ingested scene covers it.
+        """
+        for scene in self.find_scenes(lat, lng):
+            if not scene.has_layer(layer):
+                continue
+            w, h = min(size, scene.width), min(size, scene.height)
+            col, row = scene.to_pixel(lat, lng)
+            # Snap to the chunk grid's half-chunk so nearby points share cached windows
+            step = max(1, self.chunk // 2)
+            x0 = int(min(max(round((col - w / 2) / step) * step, 0), scene.width - w))
+            y0 = int(min(max(round((row - h / 2) / step) * step, 0), scene.height - h))
+
+            key = (scene.scene_id, layer, x0, y0, w, h)
+            window = self.cache.get(key)
+            if window is None:
+                window = scene.read_window(layer, x0, y0, w, h)
+                self.cache.put(key, window)
+            return window
+        return None
+
+    # --- Ingestion ------------------------------------------------------------
+
+    def ingest_array(self, scene_id: str, array: np.ndarray, bounds: Tuple[float, float, float, float],
+                     layer: str = "rgb", acquired: str = None, save_index: bool = True) -> Scene:
+        scene_dir = self.root / "scenes" / scene_id
+        scene_dir.mkdir(parents=True, exist_ok=True)
+
+        meta_path = scene_dir / "meta.json"
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            if (meta["height"], meta["width"]) != tuple(array.shape[:2]):
+                raise ValueError(f"Layer '{layer}' shape {array.shape[:2]} does not match scene {scene_id}")
+        else:
+            meta = {
+                "scene_id": scene_id,
+                "bounds": list(bounds),
+                "width": int(array.shape[1]),
+                "height": int(array.shape[0]),
+                "chunk": self.chunk,
+                "acquired": acquired,
+                "layers": [],
+            }
+
+        write_chunked(scene_dir / f"{layer}.npy", array, meta["chunk"])
+        if layer not in meta["layers"]:
+            meta["layers"].append(layer)
+        meta_path.write_text(json.dumps(meta))
+
+        with self._lock:
+            index = self._get_index()
+            for qk in quadkeys_for_bounds(tuple(meta["bounds"]), self.index_zoom):
+                ids = index.setdefault(qk, [])
+                if scene_id not in ids:
+                    ids.append(scene_id)
+            # Drop stale handles so the rewritten layer is re-mapped
+            self._scenes.pop(scene_id, None)
+            if save_index:
+                self._save_index()
+        return self._scene(scene_id)
+
+    def ingest_file(self, image_path: str, meta: dict, save_index: bool = True) -> Scene:
+        """
+        Ingests an image with its sidecar metadata ({"bounds": [w, s, e, n]}, optional
+        "scene_id" and "acquired"). An optional "bands" entry names a .npy file
+        next to the image holding the (H, W, 4) uint16 B2/B3/B4/B8 reflectances,
+        stored as the "bands" layer (see app/engines/surface_engine.py).
+        """
+        path = Path(image_path)
+        with Image.open(path) as img:
+            array = np.asarray(img.convert("RGB"))
+        scene_id = meta.get("scene_id") or path.stem
+        scene = self.ingest_array(scene_id, array, tuple(meta["bounds"]), acquired=meta.get("acquired"),
+                                  save_index=save_index)
+        if meta.get("bands"):
+            # Memory-mapped: copied into the chunked layout one chunk row at a time
+            bands = np.load(path.parent / meta["bands"], mmap_mode="r")
+            scene = self.ingest_array(scene_id, bands, tuple(meta["bounds"]), layer="bands",
+                                      acquired=meta.get("acquired"), save_index=save_index)
+        return scene
+
+    def ingest_directory(self, directory: str) -> List[str]:
+        """
+        Bulk-ingests every image in `directory` that has a `<name>.json`
+        sidecar, writing the index once at the end.
+        """
+        ingested = []
+        for image_path, meta in iter_scene_files(directory):
+            scene = self.ingest_file(image_path, meta, save_index=False)
+            ingested.append(scene.scene_id)
+            self.logger.info(f"Ingested scene {scene.scene_id} from {image_path}")
+        with self._lock:
+            self._save_index()
+        return ingested
+
+    def stats(self) -> dict:
+        index = self._get_index()
+        return {
+            "index_zoom": self.index_zoom,
+            "indexed_cells": len(index),
+            "scenes": len({sid for ids in index.values() for sid in ids}),
+            "window_cache": self.cache.stats(),
+        }
+
+    # --- Internals ------------------------------------------------------------
+
+    def _scene(self, scene_id: str) -> Scene:
+        scene = self._scenes.get(scene_id)
+        if scene is None:
+            scene_dir = self.root / "scenes" / scene_id
+            meta = json.loads((scene_dir / "meta.json").read_text())
+            scene = self._scenes[scene_id] = Scene(scene_dir, meta)
+        return scene
+
+    def _get_index(self) -> dict:
+        if self._index is None:
+            path = self.root / "index.json"
+            index = {}
+            if path.exists():
+                data = json.loads(path.read_text())
+                if data.get("zoom") == self.index_zoom:
+                    index = data["cells"]
+                else:
+                    self.logger.warning("Tile index zoom changed; re-ingest scenes to rebuild it")
+            self._index = index
+        return self._index
+
+    def _save_index(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / "index.json.tmp"
+        tmp.write_text(json.dumps({"zoom": self.index_zoom, "cells": self._index}))
+        os.replace(tmp, self.root / "index.json")
+
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".tif", ".tiff")
+
+def iter_scene_files(directory: str):
+    """
+    Yields (image_path, sidecar_meta) for images with a `<name>.json` sidecar.
+    """
+    for path in sorted(Path(directory).iterdir()):
+        if path.suffix.lower() not in IMAGE_SUFFIXES:
+            continue
+        sidecar = path.with_suffix(".json")
+        if sidecar.exists():
+            yield path, json.loads(sidecar.read_text())
@@ -1,8 +1,29 @@
-from fastapi import FastAPI
+from app.core.startup import startup_state, start_warm_up, PROCESS_IMPORT_STARTED
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.api.routes import router
+from app.core.config import settings
+from app.core.metrics import registry, HTTP_LATENCY, HTTP_REQUESTS, DETECTION_CACHE_ENTRIES, DETECTION_CACHE_LOOKUPS
+from app.core.tracing import begin_trace, end_trace
+from app.pipelines.urban_heat_pipeline import pipeline
 
-app = FastAPI(title="AquaThermX API", version="0.1.0")
+startup_state.mark("import", PROCESS_IMPORT_STARTED)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so the server binds immediately; load
+    # balancers should gate traffic on /readyz, not on the port opening.
+    start_warm_up(pipeline, settings)
+    yield
+    if pipeline.report_store is not None:
+        # Commit reports still queued for the background writer
+        await asyncio.to_thread(pipeline.report_store.flush)
+
+app = FastAPI(title="AquaThermX API", version="0.1.0", lifespan=lifespan)
 
 # CORS middleware configuration
 app.add_middleware(
@@ -13,8 +34,87 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Multipart framing and form fields on top of the file itself
+UPLOAD_BODY_OVERHEAD = 64 * 1024
+
+@app.middleware("http")
+async def limit_body_size(request: Request, call_next):
+    # Reject oversized uploads from the header, before the body is spooled;
+    # chunked bodies without Content-Length are checked after spooling
+    # (app/infra/image_io.py)
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > settings.UPLOAD_MAX_BYTES + UPLOAD_BODY_OVERHEAD:
+        return JSONResponse(status_code=413, content={"detail": f"Request body exceeds {settings.UPLOAD_MAX_BYTES} bytes"})
+    return await call_next(request)
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    timed = settings.SERVER_TIMING_ENABLED or request.headers.get("x-server-timing") == "1"
+    token = begin_trace() if timed else None
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception:
+        _observe_request(request, 500, started)
+        raise
+    finally:
+        trace = end_trace(token) if token is not None else None
+
+    _observe_request(request, response.status_code, started)
+    if trace is not None:
+        response.headers["Server-Timing"] = trace.server_timing()
+    return response
+
+def _observe_request(request: Request, status: int, started: float):
+    path = _route_template(request)
+    HTTP_REQUESTS.inc(method=request.method, route=path, status=str(status))
+    HTTP_LATENCY.observe(time.perf_counter() - started, method=request.method, route=path)
+
+def _route_template(request: Request) -> str:
+    # Label by route template, not raw path, to keep cardinality bounded.
+    # scope["route"] is the innermost route, whose path lacks the router
+    # prefixes; take those from the matched request path.
+    template = getattr(request.scope.get("route"), "path", None)
+    if template is None:
+        return "unmatched"
+    prefix = request.scope["path"].rsplit("/", template.count("/"))[0]
+    return prefix + template
+
+def _collect_cache_metrics():
+    cache = pipeline.detection_cache
+    if cache is None:
+        return
+    stats = cache.stats()
+    for result in ("memory_hits", "disk_hits", "misses"):
+        DETECTION_CACHE_LOOKUPS.set(stats[result], result=result)
+    DETECTION_CACHE_ENTRIES.set(stats["memory_entries"])
+
+registry.on_collect(_collect_cache_metrics)
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to AquaThermX API"}
 
+@app.get("/healthz")
+def liveness():
+    """
+    Liveness: the process is up and serving HTTP.
+    """
+    return {"status": "alive"}
+
+@app.get("/readyz")
+def readiness():
+    """
+    Readiness: the model is loaded and warmed up.
+    """
+    state = startup_state.snapshot()
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=state)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus scrape endpoint.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 app.include_router(router, prefix="/api")
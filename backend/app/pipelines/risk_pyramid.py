@@ -0,0 +1,314 @@
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Tuple
+import numpy as np
+from app.domain.region import BoundingBox, KM_PER_DEG_LAT
+from app.engines.heat_engine import HeatEngine
+from app.engines.surface_engine import BAND_LAYER, SurfaceEngine
+from app.infra.report_store import ReportStore
+from app.infra.risk_tiles import LAYERS, TILE_PX, RiskTileStore, render_tile
+from app.infra.tile_store import TileStore, lat_to_pixel_y, lng_to_pixel_x
+
+# Per-cell inputs, in storage order
+INPUTS = ("green_cover", "impervious", "surface_temp_c", "density_score",
+          "report_pdi", "report_sai", "report_wdi", "report_risk")
+
+@dataclass(frozen=True)
+class RiskGrid:
+    """
+    Cell raster of a build: one cell per web-mercator pixel at `zoom`,
+    covering whole tiles from global pixel (x0, y0).
+    """
+    zoom: int
+    x0: int
+    y0: int
+    width: int
+    height: int
+
+    @property
+    def cells(self) -> int:
+        return self.width * self.height
+
+    @classmethod
+    def for_bbox(cls, bbox: BoundingBox, zoom: int) -> "RiskGrid":
+        x0 = int(lng_to_pixel_x(bbox.min_lng, zoom) // TILE_PX) * TILE_PX
+        x1 = int(math.ceil(lng_to_pixel_x(bbox.max_lng, zoom) / TILE_PX)) * TILE_PX
+        y0 = int(lat_to_pixel_y(bbox.max_lat, zoom) // TILE_PX) * TILE_PX
+        y1 = int(math.ceil(lat_to_pixel_y(bbox.min_lat, zoom) / TILE_PX)) * TILE_PX
+        return cls(zoom, x0, y0, max(x1 - x0, TILE_PX), max(y1 - y0, TILE_PX))
+
+class RiskPyramidBuilder:
+    """
+    Batch job behind the risk map layer (scripts/build_risk_tiles.py).
+
+    Cells are the web-mercator pixels of the pyramid's top zoom
+    (`max_zoom`). Per cell it gathers:
+      - surface conditions from the tile store's band layer, binned from
+        10 m pixels into cells block by block (same classification as
+        SurfaceEngine); overlapping scenes are averaged
+      - plastic density and indices of the latest stored reports
+        (app/infra/report_store.py), spread over each report's footprint
+    Cells with band data are scored with HeatEngine.assess_risk_batch
+    (density 0 where no report covers them); cells with only a report keep
+    its stored indices; the rest are no data.
+
+    The top level is downsampled 2x2 (NaN-aware mean) down to `min_zoom`
+    and cut into 256 px PNG tiles per layer (risk, pdi, sai, wdi).
+    The inputs of the last build are kept, so a rebuild only rescores cells
+    whose inputs changed and only re-renders tiles containing them
+    (`full=True` forces everything).
+
+    A tile store holds one pyramid: low-zoom tiles shared with another
+    region's build are overwritten, not merged.
+    """
+
+    def __init__(self, tile_store: TileStore, report_store: ReportStore, surface_engine: SurfaceEngine,
+                 risk_tiles: RiskTileStore, max_zoom: int = 12, min_zoom: int = 8,
+                 population_density: float = 2750.0, report_footprint_km: float = 1.0, max_cells: int = 4_000_000):
+        self.tile_store = tile_store
+        self.report_store = report_store
+        self.surface_engine = surface_engine
+        self.risk_tiles = risk_tiles
+        self.max_zoom = max_zoom
+        self.min_zoom = min(min_zoom, max_zoom)
+        self.population_density = population_density
+        self.report_footprint_km = report_footprint_km
+        self.max_cells = max_cells
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def state_path(self) -> Path:
+        return self.risk_tiles.root / "state.npz"
+
+    def build(self, bbox: BoundingBox, full: bool = False) -> dict:
+        started = time.perf_counter()
+        grid = RiskGrid.for_bbox(bbox, self.max_zoom)
+        if grid.cells > self.max_cells:
+            raise ValueError(f"Grid of {grid.width}x{grid.height} cells exceeds the limit of {self.max_cells}; "
+                             f"lower the max zoom or the area")
+
+        inputs = self.gather_inputs(bbox, grid)
+        previous = None if full else self._load_state(grid)
+        if previous is None:
+            changed = np.ones((grid.height, grid.width), dtype=bool)
+            indices = np.full((len(LAYERS), grid.height, grid.width), np.nan, dtype=np.float32)
+        else:
+            previous_inputs, indices = previous
+            same = (inputs == previous_inputs) | (np.isnan(inputs) & np.isnan(previous_inputs))
+            changed = ~same.all(axis=0)
+
+        self.score(inputs, indices, changed)
+        written, removed = self.render(indices, changed, grid)
+        self._save_state(grid, inputs, indices)
+
+        stats = {
+            "zoom": [self.min_zoom, self.max_zoom],
+            "cells": grid.cells,
+            "changed_cells": int(changed.sum()),
+            "tiles_written": written,
+            "tiles_removed": removed,
+            "seconds": round(time.perf_counter() - started, 2),
+        }
+        self.logger.info("Risk pyramid build: %s", stats)
+        return stats
+
+    # --- Inputs -------------------------------------------------------------
+
+    def gather_inputs(self, bbox: BoundingBox, grid: RiskGrid) -> np.ndarray:
+        """
+        (len(INPUTS), height, width) float32 per-cell inputs; NaN where absent.
+        """
+        inputs = np.full((len(INPUTS), grid.height, grid.width), np.nan, dtype=np.float32)
+
+        valid, vegetation, impervious, temp = self._surface_sums(bbox, grid)
+        covered = valid > 0
+        inputs[0][covered] = vegetation[covered] / valid[covered]
+        inputs[1][covered] = impervious[covered] / valid[covered]
+        inputs[2][covered] = temp[covered] / valid[covered]
+
+        sums, counts = self._report_sums(bbox, grid)
+        reported = counts > 0
+        for i in range(sums.shape[0]):
+            inputs[3 + i][reported] = sums[i][reported] / counts[reported]
+        return inputs
+
+    def _surface_sums(self, bbox: BoundingBox, grid: RiskGrid):
+        n = grid.cells
+        valid, vegetation, impervious, temp = (np.zeros(n) for _ in range(4))
+        bounds = (bbox.min_lng, bbox.min_lat, bbox.max_lng, bbox.max_lat)
+
+        for scene in self.tile_store.find_scenes_in_bounds(bounds):
+            if not scene.has_layer(BAND_LAYER):
+                continue
+            west, south, east, north = scene.bounds
+            # Scene pixel window overlapping the bbox
+            x_a, y_a = scene.to_pixel(bbox.max_lat, bbox.min_lng)
+            x_b, y_b = scene.to_pixel(bbox.min_lat, bbox.max_lng)
+            sx0, sy0 = max(int(x_a), 0), max(int(y_a), 0)
+            sx1, sy1 = min(int(math.ceil(x_b)), scene.width), min(int(math.ceil(y_b)), scene.height)
+            if sx1 <= sx0 or sy1 <= sy0:
+                continue
+
+            for bx, by, bw, bh in self.surface_engine.blocks((sx0, sy0, sx1 - sx0, sy1 - sy0)):
+                bands = scene.read_window(BAND_LAYER, bx, by, bw, bh)
+                scene.release_window(BAND_LAYER, bx, by, bw, bh)
+                ok, veg, imp, _, t = SurfaceEngine.classify(bands)
+
+                # Cell of each pixel center; separable, so per column and per row
+                lng = west + (bx + np.arange(bw) + 0.5) / scene.width * (east - west)
+                lat = north - (by + np.arange(bh) + 0.5) / scene.height * (north - south)
+                col = np.floor(lng_to_pixel_x(lng, grid.zoom)).astype(np.int64) - grid.x0
+                row = np.floor(lat_to_pixel_y(lat, grid.zoom)).astype(np.int64) - grid.y0
+                ok &= ((row >= 0) & (row < grid.height))[:, None] & ((col >= 0) & (col < grid.width))[None, :]
+
+                flat = (row[:, None] * grid.width + col[None, :])[ok]
+                valid += np.bincount(flat, minlength=n)
+                vegetation += np.bincount(flat, weights=veg[ok], minlength=n)
+                impervious += np.bincount(flat, weights=imp[ok], minlength=n)
+                temp += np.bincount(flat, weights=t[ok], minlength=n)
+
+        shape = (grid.height, grid.width)
+        return valid.reshape(shape), vegetation.reshape(shape), impervious.reshape(shape), temp.reshape(shape)
+
+    def _report_sums(self, bbox: BoundingBox, grid: RiskGrid):
+        sums = np.zeros((5, grid.height, grid.width))
+        counts = np.zeros((grid.height, grid.width))
+        reports = self.report_store.latest_in_bbox(bbox, limit=grid.cells)
+
+        half_lat = self.report_footprint_km / 2 / KM_PER_DEG_LAT
+        for report in reports:
+            lat, lng = report["location"]["lat"], report["location"]["lng"]
+            half_lng = half_lat / max(math.cos(math.radians(lat)), 1e-6)
+            c0 = max(int(lng_to_pixel_x(lng - half_lng, grid.zoom)) - grid.x0, 0)
+            c1 = min(int(lng_to_pixel_x(lng + half_lng, grid.zoom)) - grid.x0 + 1, grid.width)
+            r0 = max(int(lat_to_pixel_y(lat + half_lat, grid.zoom)) - grid.y0, 0)
+            r1 = min(int(lat_to_pixel_y(lat - half_lat, grid.zoom)) - grid.y0 + 1, grid.height)
+            if c1 <= c0 or r1 <= r0:
+                continue
+            indices = report["indices"]
+            values = (report["plastic_analysis"]["density_score"], indices["pdi"], indices["sai"],
+                      indices["wdi"], report["heat_score"])
+            sums[:, r0:r1, c0:c1] += np.asarray(values, dtype=np.float64)[:, None, None]
+            counts[r0:r1, c0:c1] += 1
+        return sums, counts
+
+    # --- Scoring ------------------------------------------------------------
+
+    def score(self, inputs: np.ndarray, indices: np.ndarray, changed: np.ndarray):
+        """
+        Rescores the changed cells of `indices` (LAYERS order) in place.
+        """
+        green, impervious, temp, density = inputs[:4]
+        surfaced = changed & ~np.isnan(green)
+        reported_only = changed & np.isnan(green) & ~np.isnan(inputs[4])
+
+        indices[:, changed] = np.nan
+        if surfaced.any():
+            batch = HeatEngine.assess_risk_batch(
+                density_scores=np.nan_to_num(density[surfaced]),
+                surface_temp_c=temp[surfaced],
+                green_cover_index=green[surfaced],
+                impervious_surface_index=impervious[surfaced],
+                population_density=self.population_density
+            )
+            indices[0][surfaced] = batch.urban_risk_index
+            indices[1][surfaced] = batch.plastic_density_index
+            indices[2][surfaced] = batch.surface_absorption_index
+            indices[3][surfaced] = batch.water_deficit_index
+        if reported_only.any():
+            # Stored report indices: risk, pdi, sai, wdi
+            for layer, source in enumerate((7, 4, 5, 6)):
+                indices[layer][reported_only] = inputs[source][reported_only]
+
+    # --- Pyramid ------------------------------------------------------------
+
+    def render(self, indices: np.ndarray, changed: np.ndarray, grid: RiskGrid) -> Tuple[int, int]:
+        """
+        Writes the tiles containing changed cells at every zoom level.
+        Returns (tiles written, tiles removed).
+        """
+        written = removed = 0
+        values, mask, x0, y0 = indices, changed, grid.x0, grid.y0
+        for z in range(self.max_zoom, self.min_zoom - 1, -1):
+            h, w = mask.shape
+            for ty in range(y0 // TILE_PX, -(-(y0 + h) // TILE_PX)):
+                for tx in range(x0 // TILE_PX, -(-(x0 + w) // TILE_PX)):
+                    window = self._tile_slices(tx, ty, x0, y0, w, h)
+                    if not mask[window[0]].any():
+                        continue
+                    for layer, data in zip(LAYERS, self._tile_values(values, window)):
+                        if np.isnan(data).all():
+                            self.risk_tiles.write(layer, z, tx, ty, None)
+                            removed += 1
+                        else:
+                            self.risk_tiles.write(layer, z, tx, ty, render_tile(data))
+                            written += 1
+            if z > self.min_zoom:
+                values, mask, x0, y0 = downsample(values, mask, x0, y0)
+        return written, removed
+
+    @staticmethod
+    def _tile_slices(tx: int, ty: int, x0: int, y0: int, w: int, h: int):
+        # Raster slice of the tile and where it lands inside the 256 px tile
+        left, top = tx * TILE_PX - x0, ty * TILE_PX - y0
+        rows = slice(max(top, 0), min(top + TILE_PX, h))
+        cols = slice(max(left, 0), min(left + TILE_PX, w))
+        offset = (rows.start - top, cols.start - left)
+        return (rows, cols), offset
+
+    @staticmethod
+    def _tile_values(values: np.ndarray, window):
+        (rows, cols), (oy, ox) = window
+        part = values[:, rows, cols]
+        tiles = np.full((values.shape[0], TILE_PX, TILE_PX), np.nan, dtype=np.float32)
+        tiles[:, oy:oy + part.shape[1], ox:ox + part.shape[2]] = part
+        return tiles
+
+    # --- State --------------------------------------------------------------
+
+    def _load_state(self, grid: RiskGrid):
+        try:
+            with np.load(self.state_path, allow_pickle=False) as data:
+                meta = data["grid"].tolist()
+                if meta != [grid.zoom, grid.x0, grid.y0, grid.width, grid.height, self.population_density]:
+                    return None
+                return data["inputs"], data["indices"]
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _save_state(self, grid: RiskGrid, inputs: np.ndarray, indices: np.ndarray):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp.npz")
+        np.savez(
+            tmp,
+            grid=np.asarray([grid.zoom, grid.x0, grid.y0, grid.width, grid.height, self.population_density]),
+            inputs=inputs,
+            indices=indices
+        )
+        os.replace(tmp, self.state_path)
+
+def downsample(values: np.ndarray, mask: np.ndarray, x0: int, y0: int):
+    """
+    One pyramid level down: NaN-aware 2x2 mean of (layers, h, w) values and
+    2x2 OR of the change mask. Odd edges are padded so blocks stay aligned
+    to the global pixel grid. Returns (values, mask, x0, y0) at the new level.
+    """
+    layers, h, w = values.shape
+    pad_top, pad_left = y0 % 2, x0 % 2
+    pad_bottom, pad_right = (y0 + h) % 2, (x0 + w) % 2
+    if pad_top or pad_left or pad_bottom or pad_right:
+        values = np.pad(values, ((0, 0), (pad_top, pad_bottom), (pad_left, pad_right)), constant_values=np.nan)
+        mask = np.pad(mask, ((pad_top, pad_bottom), (pad_left, pad_right)))
+        h, w = mask.shape
+
+    present = ~np.isnan(values)
+    blocks = (layers, h // 2, 2, w // 2, 2)
+    total = np.where(present, values, 0.0).reshape(blocks).sum(axis=(2, 4))
+    count = present.reshape(blocks).sum(axis=(2, 4))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(count > 0, total / count, np.nan).astype(np.float32)
+    return mean, mask.reshape(h // 2, 2, w // 2, 2).any(axis=(1, 3)), (x0 - pad_left) // 2, (y0 - pad_top) // 2
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable
+from app.core.config import settings
+from app.core.metrics import COALESCE_REQUESTS
+
+class SingleFlight:
+    """
+    Request coalescing for identical analyses.
+
+    Concurrent calls with the same key share one in-flight computation and
+    all receive its result (or its exception). Successful results are kept
+    for `ttl_s` seconds, so requests that arrive just after it finished
+    reuse them too. Shared results must be treated as read-only.
+
+    The computation runs as its own task: a caller that goes away (client
+    disconnect) doesn't cancel it for the others.
+    """
+
+    def __init__(self, ttl_s: float = 10.0, max_entries: int = 1024):
+        self.ttl_s = max(0.0, ttl_s)
+        self.max_entries = max_entries
+        self._in_flight = {}
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"leader": 0, "coalesced": 0, "ttl_hit": 0}
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable]):
+        # Single event loop per process; no await between check and insert
+        now = time.monotonic()
+        entry = self._recent.get(key)
+        if entry is not None:
+            expires, result = entry
+            if expires > now:
+                self._count("ttl_hit")
+                return result
+            del self._recent[key]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._count("coalesced")
+        else:
+            self._count("leader")
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._finished(key, t))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Future):
+        self._in_flight.pop(key, None)
+        if self.ttl_s <= 0 or task.cancelled() or task.exception() is not None:
+            return
+        self._recent[key] = (time.monotonic() + self.ttl_s, task.result())
+        self._recent.move_to_end(key)
+        while len(self._recent) > self.max_entries:
+            self._recent.popitem(last=False)
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self.counters[outcome] += 1
+        COALESCE_REQUESTS.inc(result=outcome)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = sum(self.counters.values())
+            shared = self.counters["coalesced"] + self.counters["ttl_hit"]
+            return {
+                **self.counters,
+                "in_flight": len(self._in_flight),
+                "recent_entries": len(self._recent),
+                "shared_ratio": round(shared / total, 3) if total else 0.0,
+            }
+
+def analysis_key(lat: float, lng: float, simulation_mode: str = None, simulation_factor: float = 1.0,
+                 simulation_seed: int = None, image_digest: str = None) -> tuple:
+    """
+    Normalized single-flight key of an analysis request: coordinates are
+    quantized to COALESCE_COORD_DECIMALS, and simulation parameters only
+    count when a simulation runs. Population density is not part of the
+    key (it is mocked per request), so callers sharing a key share the
+    leader's value.
+    """
+    d = settings.COALESCE_COORD_DECIMALS
+    simulation = None
+    if simulation_mode == "cleanup":
+        seed = settings.SIMULATION_SEED if simulation_seed is None else simulation_seed
+        simulation = (simulation_mode, round(simulation_factor, 6), seed)
+    return ("analysis", round(lat, d), round(lng, d), simulation, image_digest)
+
+# Singleton
+single_flight = SingleFlight(ttl_s=settings.COALESCE_TTL_S, max_entries=settings.COALESCE_MAX_ENTRIES)
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.core.metrics import PIPELINE_RUN_LATENCY, STAGE_ERRORS, STAGE_LATENCY
+from app.core.tracing import record_span
+
+# How a stage is executed:
+#   "inline" - cheap pure-Python work, run directly on the event loop
+#   "io"     - blocking I/O, run on the default thread pool
+#   "cpu"    - model / number crunching, run on the pipeline's CPU executor
+# Coroutine functions are always awaited directly, whatever their kind.
+STAGE_KINDS = ("inline", "io", "cpu")
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[dict], Any]  # Receives the shared context dict, returns the stage result
+    deps: Tuple[str, ...] = ()
+    kind: str = "inline"
+
+@dataclass
+class StageRun:
+    results: Dict[str, Any]
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+
+class StageGraph:
+    """
+    A small dependency graph of pipeline stages, executed under asyncio.
+
+    Every stage starts as soon as all of its dependencies have finished, so
+    independent stages overlap and end-to-end latency follows the critical
+    path instead of the sum of all stages. A stage's result is stored in the
+    context under the stage's name, where dependent stages can read it.
+
+    Stage and run latencies feed the `graph`-labelled Prometheus histograms
+    and the current request's trace (Server-Timing).
+    """
+
+    def __init__(self, stages: List[Stage], cpu_executor: Optional[Executor] = None, name: str = "pipeline"):
+        self.stages = self._toposort(stages)
+        self.cpu_executor = cpu_executor
+        self.name = name
+
+    @staticmethod
+    def _toposort(stages: List[Stage]) -> List[Stage]:
+        by_name = {s.name: s for s in stages}
+        if len(by_name) != len(stages):
+            raise ValueError("Duplicate stage names in pipeline graph")
+
+        ordered, visiting, done = [], set(), set()
+
+        def visit(stage: Stage):
+            if stage.name in done:
+                return
+            if stage.name in visiting:
+                raise ValueError(f"Cycle in pipeline graph at stage '{stage.name}'")
+            if stage.kind not in STAGE_KINDS:
+                raise ValueError(f"Unknown kind '{stage.kind}' for stage '{stage.name}'")
+            visiting.add(stage.name)
+            for dep in stage.deps:
+                if dep not in by_name:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+                visit(by_name[dep])
+            visiting.discard(stage.name)
+            done.add(stage.name)
+            ordered.append(stage)
+
+        for stage in stages:
+            visit(stage)
+        return ordered
+
+    async def run(self, context: dict) -> StageRun:
+        started = time.perf_counter()
+        run = StageRun(results=context)
+        tasks = {}
+        for stage in self.stages:
+            tasks[stage.name] = asyncio.ensure_future(self._run_stage(stage, run, tasks))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        PIPELINE_RUN_LATENCY.observe(time.perf_counter() - started, graph=self.name)
+        return run
+
+    async def _run_stage(self, stage: Stage, run: StageRun, tasks: dict):
+        if stage.deps:
+            await asyncio.gather(*(tasks[dep] for dep in stage.deps))
+
+        started = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(stage.fn):
+                result = await stage.fn(run.results)
+            elif stage.kind == "cpu":
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self.cpu_executor, stage.fn, run.results)
+            elif stage.kind == "io":
+                result = await asyncio.to_thread(stage.fn, run.results)
+            else:
+                result = stage.fn(run.results)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            STAGE_ERRORS.inc(graph=self.name, stage=stage.name)
+            raise
+
+        elapsed = time.perf_counter() - started
+        run.timings_ms[stage.name] = elapsed * 1000
+        STAGE_LATENCY.observe(elapsed, graph=self.name, stage=stage.name)
+        record_span(stage.name, elapsed * 1000)
+        run.results[stage.name] = result
+        return result
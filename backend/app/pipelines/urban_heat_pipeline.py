@@ -1,85 +1,365 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
 from PIL import Image
 from app.domain.region import Region
+from app.domain.plastic import PlasticAnalysis
 from app.domain.surface import SurfaceData
 from app.engines.vision_engine import VisionEngine
+from app.engines.batching import BatchingVisionEngine
+from app.engines.tiling import TiledVisionEngine
+from app.engines.incremental import IncrementalVisionEngine
+from app.engines.prescreen import PreScreenEngine, ScreenResult
+from app.engines.hotspot_engine import HotspotEngine
 from app.engines.heat_engine import HeatEngine
+from app.engines.surface_engine import SurfaceEngine
 from app.engines.water_engine import WaterEngine
 from app.engines.confidence_engine import ConfidenceEngine
 from app.engines.sensor_engine import SensorEngine
+from app.engines.simulation_engine import CleanupSimulator
 from app.infra.sentinel_service import sentinel_service
+from app.infra.detection_cache import detection_cache, DetectionCache
+from app.infra.region_history import region_history
+from app.infra.report_store import report_store
+from app.infra.image_io import SOURCE_SIZE_KEY
+from app.pipelines.stages import Stage, StageGraph
 from app.schemas.report import AnalysisReport
-import random 
+from app.core.config import settings
+from app.core.tracing import span
 
 class UrbanHeatPipeline:
     def __init__(self):
-        self.vision_engine = VisionEngine()
+        # Vision engines load YOLO weights, so they are built on first use
+        # (or by the startup warm-up) rather than at import time
+        self._vision_engine = None
+        self._tiled_vision_engine = None
+        self._incremental_vision_engine = None
+        self._engine_lock = threading.Lock()
         self.sentinel_service = sentinel_service
-        
-    def run(self, image: Image.Image = None, region: Region = None, simulation_mode: str = None, simulation_factor: float = 1.0) -> AnalysisReport:
+        self.surface_engine = SurfaceEngine(
+            sentinel_service.tile_store,
+            block_px=settings.SURFACE_BLOCK_PX,
+            workers=settings.SURFACE_WORKERS,
+            pixel_size_m=settings.SURFACE_PIXEL_SIZE_M
+        )
+        self.prescreen_engine = PreScreenEngine(
+            thumb_px=settings.PRESCREEN_THUMB_PX,
+            min_std=settings.PRESCREEN_MIN_STD,
+            cloud_fraction=settings.PRESCREEN_CLOUD_FRACTION,
+            min_water_fraction=settings.PRESCREEN_MIN_WATER_FRACTION,
+            bank_margin_px=settings.PRESCREEN_BANK_MARGIN_PX,
+            crop_max_fraction=settings.PRESCREEN_CROP_MAX_FRACTION,
+            require_water=settings.PRESCREEN_REQUIRE_WATER
+        ) if settings.PRESCREEN_ENABLED else None
+        self.hotspot_engine = HotspotEngine(
+            cell_px=settings.HOTSPOT_CELL_PX,
+            sigma_cells=settings.HOTSPOT_SIGMA_CELLS,
+            threshold=settings.HOTSPOT_THRESHOLD,
+            min_objects=settings.HOTSPOT_MIN_OBJECTS,
+            max_hotspots=settings.HOTSPOT_MAX
+        )
+        self.detection_cache = detection_cache if settings.DETECTION_CACHE_ENABLED else None
+        self.report_store = report_store if settings.REPORT_STORE_ENABLED else None
+        self.cpu_executor = ThreadPoolExecutor(
+            max_workers=settings.PIPELINE_CPU_WORKERS,
+            thread_name_prefix="pipeline-cpu"
+        )
+
+        # Stage dependency graph. The satellite fetch, sensor, surface and
+        # metadata stages don't depend on vision, so they overlap with it.
+        self.graph = StageGraph([
+            Stage("satellite", self._stage_satellite),
+            Stage("prescreen", self._stage_prescreen, deps=("satellite",), kind="cpu"),
+            Stage("vision", self._stage_vision, deps=("satellite", "prescreen")),
+            Stage("simulation", self._stage_simulation, deps=("vision",)),
+            Stage("surface", self._stage_surface, kind="io"),
+            Stage("sensor", self._stage_sensor, kind="io"),
+            Stage("metadata", self._stage_metadata, kind="io"),
+            Stage("heat", self._stage_heat, deps=("simulation", "surface", "sensor")),
+            Stage("hotspots", self._stage_hotspots, deps=("satellite", "simulation"), kind="cpu"),
+            Stage("water", self._stage_water, deps=("heat", "hotspots")),
+            Stage("confidence", self._stage_confidence, deps=("simulation",)),
+        ], cpu_executor=self.cpu_executor, name="analysis")
+
+        # Cleanup sweep: vision runs once, every factor is scored from it
+        self.sweep_graph = StageGraph([
+            Stage("satellite", self._stage_satellite),
+            Stage("prescreen", self._stage_prescreen, deps=("satellite",), kind="cpu"),
+            Stage("vision", self._stage_vision, deps=("satellite", "prescreen")),
+            Stage("surface", self._stage_surface, kind="io"),
+            Stage("sensor", self._stage_sensor, kind="io"),
+            Stage("metadata", self._stage_metadata, kind="io"),
+            Stage("sweep", self._stage_sweep, deps=("vision", "surface", "sensor"), kind="cpu"),
+        ], cpu_executor=self.cpu_executor, name="sweep")
+
+    @property
+    def engines_loaded(self) -> bool:
+        return self._vision_engine is not None
+
+    @property
+    def vision_engine(self) -> BatchingVisionEngine:
+        if self._vision_engine is None:
+            self.load_engines()
+        return self._vision_engine
+
+    @property
+    def tiled_vision_engine(self) -> TiledVisionEngine:
+        if self._vision_engine is None:
+            self.load_engines()
+        return self._tiled_vision_engine
+
+    @property
+    def incremental_vision_engine(self) -> IncrementalVisionEngine:
+        if self._vision_engine is None:
+            self.load_engines()
+        return self._incremental_vision_engine
+
+    def load_engines(self):
+        """
+        Builds the vision engines (loads the model). Idempotent and thread-safe.
+        """
+        with self._engine_lock:
+            if self._vision_engine is not None:
+                return
+            # Identity of the weights about to be loaded; fixed for the
+            # lifetime of the engines even if the file is replaced later
+            model_id = DetectionCache.model_identity()
+            engine = VisionEngine()
+            if self.detection_cache is not None:
+                self.detection_cache.set_model(model_id)
+            # Large scenes are analyzed tile by tile at native resolution
+            self._tiled_vision_engine = TiledVisionEngine(
+                engine,
+                tile_size=settings.VISION_TILE_SIZE,
+                overlap=settings.VISION_TILE_OVERLAP,
+                workers=settings.VISION_TILE_WORKERS
+            )
+            # Revisited regions only re-run inference where the scene changed
+            self._incremental_vision_engine = IncrementalVisionEngine(
+                self._tiled_vision_engine,
+                region_history,
+                model_id=model_id,
+                tile_threshold=settings.VISION_TILE_THRESHOLD,
+                block_px=settings.CHANGE_BLOCK_PX,
+                threshold=settings.CHANGE_THRESHOLD
+            )
+            # Concurrent requests share YOLO calls through the micro-batcher.
+            # Assigned last: it doubles as the "engines loaded" flag.
+            self._vision_engine = BatchingVisionEngine(
+                engine,
+                max_batch_size=settings.VISION_MAX_BATCH_SIZE,
+                max_wait_ms=settings.VISION_MAX_BATCH_WAIT_MS
+            )
+
+    def run(self, image: Image.Image = None, region: Region = None, simulation_mode: str = None, simulation_factor: float = 1.0,
+            simulation_seed: int = None) -> AnalysisReport:
+        """
+        Synchronous entry point for scripts; the API awaits `arun` directly.
+        """
+        return asyncio.run(self.arun(image=image, region=region, simulation_mode=simulation_mode,
+                                     simulation_factor=simulation_factor, simulation_seed=simulation_seed))
+
+    async def arun(self, image: Image.Image = None, region: Region = None, simulation_mode: str = None, simulation_factor: float = 1.0,
+                   simulation_seed: int = None) -> AnalysisReport:
+        if image is None and region is None:
+            raise ValueError("Region context required to fetch satellite data")
+
+        run = await self.graph.run({
+            "image": image,
+            "region": region,
+            "simulation_mode": simulation_mode,
+            "simulation_factor": simulation_factor,
+            "simulation_seed": settings.SIMULATION_SEED if simulation_seed is None else simulation_seed,
+        })
+        ctx = run.results
+
+        report = AnalysisReport(
+            region=region,
+            plastic=ctx["simulation"],
+            heat_index=ctx["heat"],
+            interventions=ctx["water"],
+            hotspots=ctx["hotspots"],
+            confidence=ctx["confidence"],
+            sensor_readings=ctx["sensor"],
+            sentinel_metadata=ctx["metadata"]
+        )
+        # History only records observed conditions, not cleanup what-ifs.
+        # Queued for the background writer; never delays the response.
+        if self.report_store is not None and simulation_mode != "cleanup":
+            self.report_store.submit(report, source="satellite" if image is None else "upload")
+        return report
+
+    async def arun_sweep(self, factors: List[float], image: Image.Image = None, region: Region = None,
+                         simulation_seed: int = None) -> dict:
+        """
+        Runs vision once and evaluates every cleanup factor against the same
+        detections. Returns the baseline analysis and one CleanupScenario per factor.
+        """
+        if region is None:
+            raise ValueError("Region context required for a cleanup sweep")
+
+        run = await self.sweep_graph.run({
+            "image": image,
+            "region": region,
+            "factors": factors,
+            "simulation_seed": settings.SIMULATION_SEED if simulation_seed is None else simulation_seed,
+        })
+        ctx = run.results
+        return {
+            "plastic": ctx["vision"],
+            "scenarios": ctx["sweep"],
+            "sensor_readings": ctx["sensor"],
+            "sentinel_metadata": ctx["metadata"],
+        }
+
+    # --- Stages -------------------------------------------------------------
+    # Each stage receives the shared context (inputs + results of its deps).
+
+    async def _stage_satellite(self, ctx: dict) -> Image.Image:
         # 0. Infrastructure Layer: Fetch Satellite Data if no image provided
-        if image is None:
-            if region is None:
-                raise ValueError("Region context required to fetch satellite data")
-            image = self.sentinel_service.get_satellite_image(region)
+        if ctx["image"] is not None:
+            return ctx["image"]
+        return await asyncio.to_thread(self.sentinel_service.get_satellite_image, ctx["region"])
+
+    def _stage_prescreen(self, ctx: dict) -> ScreenResult:
+        # 0a. Pre-screen: rule out tiles that cannot contain plastic before paying for the model
+        if self.prescreen_engine is None:
+            return None
+        image = ctx["satellite"]
+        # Uploads are not Sentinel true-color: brown, turbid or green rivers
+        # fail the blue-water test, so only satellite tiles need water
+        return self.prescreen_engine.screen(
+            image,
+            tiled=max(image.size) > settings.VISION_TILE_THRESHOLD,
+            require_water=self.prescreen_engine.require_water and ctx["image"] is None
+        )
 
+    async def _stage_vision(self, ctx: dict):
         # 1. Vision Engine: Detect Plastic
-        plastic_analysis = self.vision_engine.analyze(image)
-        
-        # --- SIMULATION INTERVENTION ---
+        image = ctx["satellite"]
+        tiled = max(image.size) > settings.VISION_TILE_THRESHOLD
+        screen = ctx["prescreen"]
+        if screen is not None and screen.skip_reason is not None:
+            return PlasticAnalysis(object_count=0, density_score=0.0, skip_reason=screen.skip_reason)
+        roi = screen.roi if screen is not None else None
+        incremental = settings.INCREMENTAL_ANALYSIS_ENABLED and ctx["image"] is None
+
+        if not self.engines_loaded:
+            # Cold start: load the model without blocking the event loop
+            await asyncio.to_thread(self.load_engines)
+
+        cache_key = None
+        if self.detection_cache is not None:
+            with span("vision_cache"):
+                cache_key, cached = await asyncio.to_thread(self._cache_lookup, image, tiled, roi)
+            if cached is not None:
+                return cached
+
+        start = time.perf_counter()
+        with span("vision_inference"):
+            if incremental:
+                # Satellite tile for a region: re-analyze only what changed since the last visit
+                region_key = f"{ctx['region'].lat:.5f},{ctx['region'].lng:.5f}"
+                loop = asyncio.get_running_loop()
+                analysis = await loop.run_in_executor(
+                    self.cpu_executor, self.incremental_vision_engine.analyze, image, region_key)
+            elif tiled:
+                loop = asyncio.get_running_loop()
+                analysis = await loop.run_in_executor(self.cpu_executor, self.tiled_vision_engine.analyze, image, roi)
+            else:
+                # The batcher runs inference on its own thread; just await the result
+                analysis = await asyncio.wrap_future(self.vision_engine.submit(image))
+            if self.prescreen_engine is not None and not incremental:
+                # Inference cost baseline for the pre-screen's saved-latency estimate
+                x1, y1, x2, y2 = roi or (0, 0, *image.size)
+                self.prescreen_engine.observe(time.perf_counter() - start, (x2 - x1) * (y2 - y1), tiled)
+
+        if cache_key is not None:
+            await asyncio.to_thread(self.detection_cache.put, cache_key, analysis)
+        return analysis
+
+    def _cache_lookup(self, image: Image.Image, tiled: bool, roi: tuple = None):
+        params = {"mode": "single"}
+        if tiled:
+            params = {"mode": "tiled", "tile_size": settings.VISION_TILE_SIZE, "overlap": settings.VISION_TILE_OVERLAP}
+            if roi is not None:
+                params["roi"] = list(roi)
+        if SOURCE_SIZE_KEY in image.info:
+            # Draft-decoded upload: density and boxes depend on the original size
+            params["source_size"] = list(image.info[SOURCE_SIZE_KEY])
+        key = self.detection_cache.key_for(image, params)
+        return key, self.detection_cache.get(key)
+
+    def _stage_simulation(self, ctx: dict):
+        plastic_analysis = ctx["vision"]
+
         # --- SIMULATION INTERVENTION ---
-        if simulation_mode == "cleanup":
-            # Apply reduction factor (e.g., factor 0.7 means we KEEP 70%, remove 30%)
-            # OR factor denotes REMOVAL? Let's stick to factor = Fraction remaining for simplicity in math, 
-            # BUT for UI slider (0-100% removal), we might receive "remova_rate".
-            # Let's assume simulation_factor is "Fraction of Plastic Remaining" (1.0 = all, 0.0 = none)
-            
-            plastic_analysis.object_count = int(plastic_analysis.object_count * simulation_factor)
-            plastic_analysis.density_score = plastic_analysis.density_score * simulation_factor
-            
-            # Filter detections logic (optional, randomly drop detections)
-            if simulation_factor < 1.0:
-                 import random
-                 plastic_analysis.detections = [d for d in plastic_analysis.detections if random.random() < simulation_factor]
-        # -------------------------------
+        if ctx["simulation_mode"] == "cleanup":
+            # simulation_factor is the "Fraction of Plastic Remaining" (1.0 = all, 0.0 = none).
+            # Detections are subsampled with a seeded draw, so the same request
+            # (and the sweep endpoint) always drops the same detections.
+            return CleanupSimulator.apply(plastic_analysis, ctx["simulation_factor"], ctx["simulation_seed"])
         # -------------------------------
-        
-        # 2. Mock Infrastructure Data Fetching (Phase 3 will make this real)
-        # We need SurfaceData for the HeatEngine
-        surface_data = self._fetch_surface_data_stub(region)
-        
+        return plastic_analysis
+
+    def _stage_sweep(self, ctx: dict):
+        return CleanupSimulator.sweep(
+            ctx["vision"],
+            ctx["factors"],
+            ctx["surface"],
+            ctx["region"].population_density,
+            sensor_data=ctx["sensor"],
+            seed=ctx["simulation_seed"],
+            source=self._source(ctx)
+        )
+
+    def _stage_surface(self, ctx: dict) -> SurfaceData:
+        # 2. Surface conditions (green cover, impervious, temperature) from the
+        # multispectral bands; the HeatEngine's SAI and WDI are scored on them
+        surface = self.surface_engine.get_surface(ctx["region"])
+        if surface is None:
+            if not settings.SURFACE_SIMULATE_FALLBACK:
+                raise ValueError("No multispectral band data covers this region")
+            surface = SurfaceEngine.simulate(ctx["region"])
+        return surface
+
+    def _stage_sensor(self, ctx: dict):
         # 2a. Sensor Engine: Get Ground Truth
-        sensor_readings = SensorEngine.get_readings(region)
+        return SensorEngine.get_readings(ctx["region"])
+
+    def _stage_metadata(self, ctx: dict) -> dict:
+        return self.sentinel_service.get_metadata(ctx["region"])
 
+    def _stage_heat(self, ctx: dict):
         # 3. Heat Engine: Calculate Risk/Indices (Fused with Sensor Data)
-        heat_index = HeatEngine.assess_risk(
-            plastic_analysis, 
-            surface_data, 
-            region.population_density,
-            sensor_data=sensor_readings
+        return HeatEngine.assess_risk(
+            ctx["simulation"],
+            ctx["surface"],
+            ctx["region"].population_density,
+            sensor_data=ctx["sensor"]
         )
-        
-        # 4. Water Engine: Generate Interventions
-        interventions = WaterEngine.recommend_interventions(heat_index)
-        
+
+    def _stage_hotspots(self, ctx: dict):
+        # 3a. Hotspot Engine: cluster detections (in original-image pixels) for cleanup planning
+        image = ctx["satellite"]
+        size = image.info.get(SOURCE_SIZE_KEY, image.size)
+        return self.hotspot_engine.find(ctx["simulation"], size, region=ctx["region"])
+
+    def _stage_water(self, ctx: dict):
+        # 4. Water Engine: Generate Interventions (index rules + site-specific hotspot cleanups)
+        interventions = WaterEngine.recommend_interventions(ctx["heat"])
+        return interventions + WaterEngine.recommend_hotspot_cleanups(
+            ctx["hotspots"], limit=settings.HOTSPOT_MAX_INTERVENTIONS)
+
+    def _stage_confidence(self, ctx: dict) -> dict:
         # 5. Confidence Engine
-        confidence = ConfidenceEngine.evaluate(plastic_analysis)
-        
-        return AnalysisReport(
-            region=region,
-            plastic=plastic_analysis,
-            heat_index=heat_index,
-            interventions=interventions,
-            confidence=confidence,
-            sensor_readings=sensor_readings
-        )
-        
-    def _fetch_surface_data_stub(self, region: Region) -> SurfaceData:
-        # Mocking data fetching based on region or random for demo
-        return SurfaceData(
-            surface_temp_c=random.uniform(25.0, 45.0),
-            green_cover_index=random.uniform(0.1, 0.6),
-            impervious_surface_index=random.uniform(0.4, 0.9)
-        )
+        return ConfidenceEngine.evaluate(ctx["simulation"], source=self._source(ctx))
+
+    @staticmethod
+    def _source(ctx: dict) -> str:
+        return "sentinel" if ctx["image"] is None else "upload"
 
 # Singleton instance
 pipeline = UrbanHeatPipeline()
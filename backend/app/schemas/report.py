@@ -1,7 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, field_serializer
 from typing import List, Optional
 from app.domain.region import Region
 from app.domain.plastic import PlasticAnalysis
+from app.domain.hotspot import Hotspot
 from app.domain.heat import HeatIndex
 from app.domain.intervention import Intervention
 from app.domain.sensor import SensorReading
@@ -11,10 +12,21 @@ from app.domain.sensor import SensorReading
 # Let's make a Pydantic wrapper for the API response to be clean.
 
 class AnalysisReport(BaseModel):
+    # PlasticAnalysis carries NumPy detection arrays
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     region: Region
     plastic: PlasticAnalysis
     heat_index: HeatIndex
     interventions: List[Intervention]
+    # Ranked detection clusters; the top ones drive site-specific cleanups
+    hotspots: List[Hotspot] = []
     # confidence_score: float  <-- OLD
     confidence: Optional[dict] = None # New structure
     sensor_readings: Optional[SensorReading] = None # Ground truth data
+    sentinel_metadata: Optional[dict] = None
+
+    @field_serializer("plastic")
+    def serialize_plastic(self, plastic: PlasticAnalysis) -> dict:
+        # Per-detection dicts are only built here, at the JSON boundary
+        return plastic.to_dict()
@@ -0,0 +1,39 @@
+import math
+import time
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
+from app.core.config import settings
+
+class DeviceRegistration(BaseModel):
+    device_id: str
+    lat: float = Field(ge=-90, le=90)
+    lng: float = Field(ge=-180, le=180)
+    calibrated: bool = True
+
+class DeviceReading(BaseModel):
+    device_id: str
+    temp_c: float
+    humidity_percent: float
+    pm25: float
+    timestamp: Optional[float] = None # Epoch seconds; defaults to receipt time
+
+    @field_validator("timestamp")
+    @classmethod
+    def _within_window(cls, value: Optional[float]) -> Optional[float]:
+        # Only readings inside the rolling window are useful, and a
+        # millisecond epoch would otherwise pin a far-future bucket
+        if value is None:
+            return value
+        if not math.isfinite(value):
+            raise ValueError("timestamp must be a finite number of epoch seconds")
+        now = time.time()
+        window_s = settings.SENSOR_BUCKET_SECONDS * settings.SENSOR_WINDOW_BUCKETS
+        if not now - window_s <= value <= now + settings.SENSOR_MAX_CLOCK_SKEW_S:
+            raise ValueError(
+                f"timestamp must be epoch seconds within the last {window_s:.0f} s "
+                f"(at most {settings.SENSOR_MAX_CLOCK_SKEW_S:.0f} s ahead)"
+            )
+        return value
+
+class ReadingBatch(BaseModel):
+    readings: List[DeviceReading]
@@ -1,35 +1,72 @@
+import numpy as np
 from app.domain.plastic import PlasticAnalysis
 from app.domain.surface import SurfaceData
 
+# Each scorer has a NumPy `calculate_batch` over columnar arrays; the scalar
+# `calculate` is a thin wrapper around it so the two paths can't drift apart.
+
+def _column(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+def round_like_python(values, ndigits: int = 2) -> np.ndarray:
+    """
+    Element-wise `round(x, ndigits)` with Python's exact semantics.
+
+    np.round scales by 10**ndigits before rounding, so values whose scaled
+    form lands near a half (e.g. 7.335, stored as 7.33499...) can round the
+    other way. Away from halves the two agree exactly. The few elements
+    near a half are re-rounded with the built-in.
+    """
+    values = _column(values)
+    rounded = np.round(values, ndigits)
+    scaled = values * 10.0 ** ndigits
+    near_half = np.abs(np.abs(scaled - np.floor(scaled)) - 0.5) < 1e-6 * np.maximum(1.0, np.abs(scaled))
+    if near_half.any():
+        index = np.flatnonzero(near_half)
+        rounded.flat[index] = [round(v, ndigits) for v in values.flat[index].tolist()]
+    return rounded
+
 class PlasticIndexScorer:
     @staticmethod
     def calculate(analysis: PlasticAnalysis) -> float:
+        return float(PlasticIndexScorer.calculate_batch([analysis.density_score])[0])
+
+    @staticmethod
+    def calculate_batch(density_scores) -> np.ndarray:
         # PDI: Plastic Density Index
         # Simplified logic: Density score is already 0-10 from vision engine
-        return round(analysis.density_score, 2)
+        return round_like_python(density_scores, 2)
 
 class SurfaceIndexScorer:
     @staticmethod
     def calculate(data: SurfaceData) -> float:
+        return float(SurfaceIndexScorer.calculate_batch([data.impervious_surface_index], [data.green_cover_index])[0])
+
+    @staticmethod
+    def calculate_batch(impervious_surface_index, green_cover_index) -> np.ndarray:
         # SAI: Surface Absorption Index
         # High absorption (concrete/asphalt) = High Score
         # High green cover = Low Score
         
         # Formula: (Impervious * 0.7) + (1 - GreenCover) * 0.3 -> scaled to 10
-        raw_score = (data.impervious_surface_index * 7.0) + ((1.0 - data.green_cover_index) * 3.0)
-        return round(max(0, min(raw_score, 10)), 2)
+        raw_score = (_column(impervious_surface_index) * 7.0) + ((1.0 - _column(green_cover_index)) * 3.0)
+        return round_like_python(np.clip(raw_score, 0, 10), 2)
 
 class WaterDeficitScorer:
     @staticmethod
     def calculate(data: SurfaceData, population_density: float) -> float:
+        return float(WaterDeficitScorer.calculate_batch([data.surface_temp_c], [population_density])[0])
+
+    @staticmethod
+    def calculate_batch(surface_temp_c, population_density) -> np.ndarray:
         # WDI: Water Deficit Index
         # High Temp + High Pop + Low Green = High Deficit Risk
         
         # Normalize Temp (20C - 50C range) -> 0-1
-        temp_factor = max(0, min((data.surface_temp_c - 20) / 30, 1.0))
+        temp_factor = np.clip((_column(surface_temp_c) - 20) / 30, 0, 1.0)
         
         # Normalize Pop (0 - 10000 range) -> 0-1
-        pop_factor = max(0, min(population_density / 10000, 1.0))
+        pop_factor = np.clip(_column(population_density) / 10000, 0, 1.0)
         
         score = (temp_factor * 6.0) + (pop_factor * 4.0)
-        return round(score, 2)
+        return round_like_python(score, 2)
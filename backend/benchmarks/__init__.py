@@ -0,0 +1,4 @@
+"""
+Benchmark suite: synthetic scene corpus, per-stage and API load
+benchmarks, baseline regression gates. Entry point: benchmarks/run.py.
+"""
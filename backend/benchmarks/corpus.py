@@ -0,0 +1,103 @@
+"""
+Seeded synthetic scenes: dark urban base, building blocks, parks, a
+meandering river and plastic litter (white bags, yellow wrappers) piled
+along its banks. Everything is drawn with array masks, so a 4k scene
+takes milliseconds and the same (size, density, seed) always yields the
+same pixels.
+"""
+from dataclasses import dataclass
+from typing import List, Sequence
+import numpy as np
+from PIL import Image
+
+URBAN = (50, 50, 50)
+BUILDING = (100, 100, 100)
+PARK = (34, 139, 34)
+RIVER = (30, 144, 255)
+BAG = (255, 255, 255)
+WRAPPER = (255, 255, 0)
+
+BLOCK_PX = 40  # City block pitch, as in the original demo tile
+
+# Plastic items per megapixel; "high" matches the original demo tile
+DENSITIES = {"none": 0.0, "low": 100.0, "high": 370.0}
+SIZES = (640, 1280, 2560)
+
+@dataclass
+class Scene:
+    name: str
+    image: Image.Image
+    width: int
+    height: int
+    density: str
+    plastic_items: int
+    seed: int
+
+def _disc_offsets(radius: float):
+    r = int(np.ceil(radius))
+    dy, dx = np.mgrid[-r:r + 1, -r:r + 1]
+    inside = dy * dy + dx * dx <= radius * radius
+    return dy[inside], dx[inside]
+
+def _stamp(pixels: np.ndarray, ys: np.ndarray, xs: np.ndarray, radius: float, color):
+    # All discs in one fancy-indexed write: (items, disc pixels)
+    dy, dx = _disc_offsets(radius)
+    h, w = pixels.shape[:2]
+    py = np.clip(ys[:, None] + dy[None, :], 0, h - 1)
+    px = np.clip(xs[:, None] + dx[None, :], 0, w - 1)
+    pixels[py, px] = color
+
+def generate_scene(width: int, height: int, items_per_mp: float, seed: int) -> tuple:
+    """
+    Returns (image, plastic item count).
+    """
+    rng = np.random.default_rng(seed)
+    pixels = np.empty((height, width, 3), dtype=np.uint8)
+    pixels[:] = URBAN
+    y, x = np.ogrid[0:height, 0:width]
+
+    # Buildings: ~30% of blocks hold a 30 px footprint
+    occupied = rng.random((-(-height // BLOCK_PX), -(-width // BLOCK_PX))) > 0.7
+    footprint = ((y % BLOCK_PX >= 5) & (y % BLOCK_PX < 35)) & ((x % BLOCK_PX >= 5) & (x % BLOCK_PX < 35))
+    pixels[occupied[y // BLOCK_PX, x // BLOCK_PX] & footprint] = BUILDING
+
+    # Parks: a few ellipses, proportional to area
+    n_parks = max(2, round(width * height / 640 ** 2 * 2))
+    for cy, cx, ry, rx in zip(rng.uniform(0, height, n_parks), rng.uniform(0, width, n_parks),
+                              rng.uniform(30, 80, n_parks), rng.uniform(30, 80, n_parks)):
+        y0, y1 = max(0, int(cy - ry)), min(height, int(cy + ry) + 1)
+        x0, x1 = max(0, int(cx - rx)), min(width, int(cx + rx) + 1)
+        ey, ex = np.ogrid[y0:y1, x0:x1]
+        pixels[y0:y1, x0:x1][((ey - cy) / ry) ** 2 + ((ex - cx) / rx) ** 2 <= 1] = PARK
+
+    # River: sinusoidal centerline across the scene
+    half_width = max(20.0, 0.08 * height)
+    phase = rng.uniform(0, 2 * np.pi)
+    centerline = height * (0.45 + 0.1 * np.sin(2 * np.pi * np.arange(width) / max(width, 640) * 1.5 + phase))
+    pixels[np.abs(y - centerline[None, :]) < half_width] = RIVER
+
+    # Plastic: items on both banks, scattered a few pixels off the shore
+    n_items = int(round(items_per_mp * width * height / 1e6))
+    n_bags = n_items * 2 // 3
+    xs = rng.integers(0, width, n_items)
+    bank = np.where(rng.random(n_items) < 0.5, -1.0, 1.0)
+    ys = centerline[xs] + bank * (half_width + np.abs(rng.normal(0, 25, n_items)))
+    ys = np.clip(ys, 0, height - 1).astype(np.int64)
+    _stamp(pixels, ys[:n_bags], xs[:n_bags], 2.0, BAG)
+    _stamp(pixels, ys[n_bags:], xs[n_bags:], 1.5, WRAPPER)
+
+    return Image.fromarray(pixels), n_items
+
+def build_corpus(sizes: Sequence[int] = SIZES, densities: Sequence[str] = tuple(DENSITIES),
+                 seed: int = 0) -> List[Scene]:
+    """
+    One square scene per (size, density); per-scene seeds derive from
+    `seed`, so adding a size doesn't change the other scenes.
+    """
+    scenes = []
+    for size in sizes:
+        for density in densities:
+            scene_seed = int(np.random.SeedSequence([seed, size, list(DENSITIES).index(density)]).generate_state(1)[0])
+            image, items = generate_scene(size, size, DENSITIES[density], scene_seed)
+            scenes.append(Scene(f"{size}px-{density}", image, size, size, density, items, scene_seed))
+    return scenes
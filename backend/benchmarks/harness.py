@@ -0,0 +1,86 @@
+"""
+Timing, result files and baseline comparison for the benchmark suite.
+"""
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable
+import numpy as np
+
+def summarize(samples_ms: Iterable[float], units_per_sample: float = 1.0, unit: str = "call") -> dict:
+    samples = np.asarray(list(samples_ms), dtype=np.float64)
+    mean = float(samples.mean())
+    return {
+        "unit": unit,
+        "units_per_sample": units_per_sample,
+        "n": int(len(samples)),
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p95_ms": round(float(np.percentile(samples, 95)), 4),
+        "mean_ms": round(mean, 4),
+        "throughput_per_s": round(units_per_sample * 1000.0 / mean, 2) if mean > 0 else None,
+    }
+
+def measure(fn: Callable[[], object], repeats: int, warmup: int = 1, units_per_sample: float = 1.0,
+            unit: str = "call") -> dict:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples, units_per_sample, unit)
+
+def environment() -> dict:
+    from app.core.config import settings
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "inference_backend": settings.INFERENCE_BACKEND,
+        "model_path": settings.MODEL_PATH,
+    }
+
+def write_results(path: str, results: Dict[str, dict], meta: dict):
+    with open(path, "w") as f:
+        json.dump({"meta": meta, "benchmarks": results}, f, indent=2, sort_keys=True)
+
+def load_results(path: str) -> Dict[str, dict]:
+    with open(path) as f:
+        return json.load(f)["benchmarks"]
+
+def compare(current: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> list:
+    """
+    Regressions: benchmarks whose p50 latency grew by more than
+    `tolerance` (fraction) over the baseline. Returns (name, baseline p50,
+    current p50, ratio) tuples; benchmarks missing on either side are skipped.
+    """
+    regressions = []
+    for name, base in sorted(baseline.items()):
+        cur = current.get(name)
+        if cur is None or not base.get("p50_ms"):
+            continue
+        ratio = cur["p50_ms"] / base["p50_ms"]
+        if ratio > 1.0 + tolerance:
+            regressions.append((name, base["p50_ms"], cur["p50_ms"], ratio))
+    return regressions
+
+def print_table(results: Dict[str, dict], baseline: Dict[str, dict] = None):
+    print(f"{'benchmark':<44} {'p50 ms':>10} {'p95 ms':>10} {'throughput':>16} {'vs base':>8}")
+    for name, r in sorted(results.items()):
+        throughput = f"{r['throughput_per_s']:,.1f} {r['unit']}/s" if r["throughput_per_s"] else "-"
+        delta = ""
+        if baseline and name in baseline and baseline[name].get("p50_ms"):
+            delta = f"{r['p50_ms'] / baseline[name]['p50_ms']:.2f}x"
+        print(f"{name:<44} {r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} {throughput:>16} {delta:>8}")
@@ -0,0 +1,233 @@
+"""
+Runs the benchmark suite and gates on a stored baseline.
+
+Suites:
+  stages    VisionEngine (single, batched, tiled), the PDI/SAI/WDI scorers,
+            HeatEngine and WaterEngine, scalar and batch entry points
+  pipeline  UrbanHeatPipeline.run per corpus scene, plus per-stage latency
+            from the stage graph
+  api       POST /api/analyze/ under concurrent load, in-process through
+            the ASGI app (or against --url); needs httpx
+
+The detection cache is disabled so every run measures inference.
+Results are written as JSON. With --baseline, any benchmark whose p50
+grew by more than --tolerance fails the run (exit status 1).
+
+Usage (from backend/):
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --tolerance 0.2
+    python -m benchmarks.run --quick --suites stages
+"""
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+from collections import defaultdict
+import numpy as np
+from app.core.config import settings
+from app.domain.plastic import PlasticAnalysis
+from app.domain.region import Region
+from app.domain.surface import SurfaceData
+from benchmarks.corpus import build_corpus
+from benchmarks.harness import compare, environment, load_results, measure, print_table, summarize, write_results
+
+SUITES = ("stages", "pipeline", "api")
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+
+def bench_stages(scenes, rows: int, repeats: int, seed: int) -> dict:
+    from app.engines.heat_engine import HeatEngine
+    from app.engines.tiling import TiledVisionEngine
+    from app.engines.vision_engine import VisionEngine
+    from app.engines.water_engine import WaterEngine
+    from app.scoring.indices import PlasticIndexScorer, SurfaceIndexScorer, WaterDeficitScorer
+
+    results = {}
+    engine = VisionEngine()
+    tiled = TiledVisionEngine(engine, tile_size=settings.VISION_TILE_SIZE, overlap=settings.VISION_TILE_OVERLAP,
+                              workers=settings.VISION_TILE_WORKERS)
+    for scene in scenes:
+        if max(scene.image.size) > settings.VISION_TILE_THRESHOLD:
+            results[f"vision.tiled.{scene.name}"] = measure(lambda: tiled.analyze(scene.image), repeats, unit="image")
+        else:
+            results[f"vision.analyze.{scene.name}"] = measure(lambda: engine.analyze(scene.image), repeats, unit="image")
+
+    batch = [s.image for s in scenes if max(s.image.size) <= settings.VISION_IMGSZ] * settings.VISION_MAX_BATCH_SIZE
+    batch = batch[:settings.VISION_MAX_BATCH_SIZE]
+    if batch:
+        results[f"vision.analyze_batch.x{len(batch)}"] = measure(
+            lambda: engine.analyze_batch(batch), repeats, units_per_sample=len(batch), unit="image")
+
+    # Scorers / engines: one batch of `rows` rows vs a single scalar call
+    rng = np.random.default_rng(seed)
+    density = rng.uniform(0, 10, rows)
+    surface_temp = rng.uniform(25, 50, rows)
+    green = rng.uniform(0, 1, rows)
+    impervious = rng.uniform(0, 1, rows)
+    population = rng.uniform(500, 20000, rows)
+    ambient = rng.uniform(25, 45, rows)
+    plastic = PlasticAnalysis(object_count=12, density_score=3.2)
+    surface = SurfaceData(surface_temp_c=38.0, green_cover_index=0.2, impervious_surface_index=0.7)
+
+    results["scoring.pdi.batch"] = measure(lambda: PlasticIndexScorer.calculate_batch(density), repeats, units_per_sample=rows, unit="row")
+    results["scoring.sai.batch"] = measure(lambda: SurfaceIndexScorer.calculate_batch(impervious, green), repeats, units_per_sample=rows, unit="row")
+    results["scoring.wdi.batch"] = measure(lambda: WaterDeficitScorer.calculate_batch(surface_temp, population), repeats, units_per_sample=rows, unit="row")
+    results["scoring.scalar"] = measure(lambda: (
+        PlasticIndexScorer.calculate(plastic),
+        SurfaceIndexScorer.calculate(surface),
+        WaterDeficitScorer.calculate(surface, 5000.0)
+    ), repeats * 100, unit="row")
+
+    results["heat.assess_risk_batch"] = measure(
+        lambda: HeatEngine.assess_risk_batch(density, surface_temp, green, impervious, population, ambient),
+        repeats, units_per_sample=rows, unit="row")
+    results["heat.assess_risk"] = measure(lambda: HeatEngine.assess_risk(plastic, surface, 5000.0), repeats * 100, unit="row")
+
+    heat = HeatEngine.assess_risk_batch(density, surface_temp, green, impervious, population, ambient)
+    results["water.recommend_batch"] = measure(lambda: WaterEngine.recommend_interventions_batch(heat), repeats,
+                                               units_per_sample=rows, unit="row")
+    one = heat.row(0)
+    results["water.recommend"] = measure(lambda: WaterEngine.recommend_interventions(one), repeats * 100, unit="row")
+    return results
+
+def bench_pipeline(scenes, repeats: int) -> dict:
+    from app.pipelines.urban_heat_pipeline import pipeline
+
+    pipeline.detection_cache = None
+    pipeline.load_engines()
+    region = Region(lat=19.076, lng=72.877, name="benchmark", population_density=5000.0)
+
+    results = {}
+    stage_samples = defaultdict(list)
+    for scene in scenes:
+        results[f"pipeline.run.{scene.name}"] = measure(
+            lambda: pipeline.run(image=scene.image, region=region), repeats, unit="image")
+
+        for _ in range(repeats):
+            run = asyncio.run(pipeline.graph.run({
+                "image": scene.image,
+                "region": region,
+                "simulation_mode": None,
+                "simulation_factor": 1.0,
+                "simulation_seed": settings.SIMULATION_SEED,
+            }))
+            for stage, ms in run.timings_ms.items():
+                stage_samples[f"pipeline.stage.{stage}.{scene.width}px"].append(ms)
+
+    for name, samples in stage_samples.items():
+        results[name] = summarize(samples, unit="image")
+    return results
+
+async def _api_load(client, payloads, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        name, body = payloads[i % len(payloads)]
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/api/analyze/", files={"file": (f"{name}.png", body, "image/png")},
+                                         data={"lat": "19.076", "lng": "72.877"})
+            latencies.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies, time.perf_counter() - started
+
+def bench_api(scenes, requests: int, concurrency_levels, url: str = None) -> dict:
+    try:
+        import httpx
+    except ImportError:
+        print("api suite skipped: requires httpx", file=sys.stderr)
+        return {}
+
+    payloads = []
+    for scene in scenes:
+        if max(scene.image.size) <= settings.VISION_TILE_THRESHOLD:
+            buffer = io.BytesIO()
+            scene.image.save(buffer, "PNG")
+            payloads.append((scene.name, buffer.getvalue()))
+
+    if url:
+        def client():
+            return httpx.AsyncClient(base_url=url, timeout=300)
+    else:
+        from app.main import app
+        from app.pipelines.urban_heat_pipeline import pipeline
+        pipeline.detection_cache = None
+        pipeline.load_engines()
+
+        def client():
+            return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=300)
+
+    async def run_level(concurrency: int):
+        async with client() as c:
+            await _api_load(c, payloads, min(requests, concurrency), concurrency)  # Warm-up
+            return await _api_load(c, payloads, requests, concurrency)
+
+    results = {}
+    for concurrency in concurrency_levels:
+        latencies, wall = asyncio.run(run_level(concurrency))
+        stats = summarize(latencies, unit="request")
+        # Under concurrency, throughput is requests over wall time, not 1 / latency
+        stats["throughput_per_s"] = round(requests / wall, 2)
+        results[f"api.analyze.c{concurrency}"] = stats
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suites", nargs="+", default=list(SUITES), choices=SUITES)
+    parser.add_argument("--quick", action="store_true", help="Smaller corpus and fewer repeats")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, help="Timed repeats per benchmark")
+    parser.add_argument("--rows", type=int, help="Rows per batch for scorer/engine benchmarks")
+    parser.add_argument("--requests", type=int, help="Requests per API concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--url", help="Load-test a running server instead of the in-process app")
+    parser.add_argument("--output", default="benchmarks/results.json")
+    parser.add_argument("--baseline", help=f"Compare against this results file (default: {DEFAULT_BASELINE} if present)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p50 slowdown vs baseline (fraction)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Also write the results as the new baseline")
+    args = parser.parse_args()
+
+    repeats = args.repeats or (3 if args.quick else 10)
+    rows = args.rows or (10_000 if args.quick else 100_000)
+    requests = args.requests or (16 if args.quick else 64)
+    sizes = (640, 1280) if args.quick else (640, 1280, 2560)
+
+    started = time.perf_counter()
+    scenes = build_corpus(sizes=sizes, seed=args.seed)
+    print(f"Generated {len(scenes)} scenes in {time.perf_counter() - started:.2f} s")
+
+    results = {}
+    if "stages" in args.suites:
+        results.update(bench_stages(scenes, rows, repeats, args.seed))
+    if "pipeline" in args.suites:
+        results.update(bench_pipeline(scenes, repeats))
+    if "api" in args.suites:
+        results.update(bench_api(scenes, requests, args.concurrency, args.url))
+
+    meta = environment()
+    meta.update({"seed": args.seed, "repeats": repeats, "rows": rows, "sizes": list(sizes), "suites": args.suites})
+    write_results(args.output, results, meta)
+    if args.save_baseline:
+        write_results(args.save_baseline, results, meta)
+
+    baseline_path = args.baseline or (DEFAULT_BASELINE if os.path.exists(DEFAULT_BASELINE) and not args.save_baseline else None)
+    baseline = load_results(baseline_path) if baseline_path else None
+    print_table(results, baseline)
+    print(f"Results written to {args.output}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nREGRESSIONS vs {baseline_path} (tolerance {args.tolerance:.0%}):")
+            for name, base, cur, ratio in regressions:
+                print(f"  {name}: p50 {base:.3f} ms -> {cur:.3f} ms ({ratio:.2f}x)")
+            sys.exit(1)
+        print(f"No regressions vs {baseline_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmarks sustained write throughput and nearby-aggregate query latency
+of the in-process sensor store.
+
+Usage (from backend/):
+    python -m scripts.bench_sensor_store --devices 20000 --batch 5000 --seconds 10
+"""
+import argparse
+import time
+import numpy as np
+from app.infra.sensor_store import SensorStore
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=5000, help="Readings per ingest call")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration of the write phase")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    store = SensorStore()
+
+    # Devices scattered over a ~50 km box around Mumbai
+    lats = 19.0 + rng.uniform(-0.25, 0.25, args.devices)
+    lngs = 72.85 + rng.uniform(-0.25, 0.25, args.devices)
+    ids = [f"dev-{i}" for i in range(args.devices)]
+    started = time.perf_counter()
+    for device_id, lat, lng in zip(ids, lats, lngs):
+        store.register_device(device_id, float(lat), float(lng))
+    print(f"Registered {args.devices} devices in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    # Write phase: simulated clock advances one second per batch so buckets roll over
+    clock = time.time()
+    written = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < args.seconds:
+        pick = rng.integers(0, args.devices, args.batch)
+        store.ingest(
+            [ids[i] for i in pick],
+            np.full(args.batch, clock),
+            rng.normal(32, 3, args.batch),
+            rng.uniform(55, 90, args.batch),
+            rng.uniform(30, 160, args.batch)
+        )
+        written += args.batch
+        clock += 1.0
+    elapsed = time.perf_counter() - started
+    print(f"Ingested {written} readings in {elapsed:.2f} s -> {written / elapsed:,.0f} readings/s")
+
+    # Query phase
+    latencies = []
+    for lat, lng in zip(19.0 + rng.uniform(-0.2, 0.2, args.queries), 72.85 + rng.uniform(-0.2, 0.2, args.queries)):
+        t0 = time.perf_counter()
+        store.aggregate(float(lat), float(lng), 2.0, now=clock)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies = np.asarray(latencies)
+    print(f"Aggregate query: p50 {np.percentile(latencies, 50):.3f} ms, "
+          f"p99 {np.percentile(latencies, 99):.3f} ms over {args.queries} queries")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Measures the multispectral surface stage on a synthetic full-size
+Sentinel-2 scene: time to reduce the whole band layer and the growth of
+peak RSS (VmHWM) over the post-import baseline, per worker count.
+
+The scene (10980 x 10980 x 4 uint16 by default, ~1 GB) is generated strip
+by strip into a temporary tile store, so generation is bounded too. Each
+measurement runs in a fresh interpreter.
+
+Usage (from backend/):
+    python -m scripts.bench_surface --size 10980 --workers 1 2 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+def peak_rss_kb() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    return 0
+
+def make_scene(store_dir: str, size: int, strip: int = 512, seed: int = 0):
+    from app.engines.surface_engine import BAND_LAYER
+    from app.infra.tile_store import TileStore
+
+    rng = np.random.default_rng(seed)
+    path = os.path.join(store_dir, "bands_source.npy")
+    bands = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint16, shape=(size, size, 4))
+    # Land cover from a coarse random grid: vegetation, built-up, water
+    cells = rng.integers(0, 3, size=(size // 128 + 1, size // 128 + 1))
+    # B2, B3, B4, B8 reflectance x10000 per class
+    spectra = np.array([[400, 700, 500, 3500], [1200, 1300, 1400, 1800], [600, 900, 500, 200]], dtype=np.uint16)
+    for y0 in range(0, size, strip):
+        rows = np.arange(y0, min(y0 + strip, size)) // 128
+        classes = cells[rows][:, np.arange(size) // 128]
+        noise = rng.integers(0, 200, size=(len(rows), size, 1), dtype=np.uint16)
+        bands[y0:y0 + len(rows)] = spectra[classes] + noise
+    bands.flush()
+    del bands
+
+    store = TileStore(store_dir)
+    store.ingest_array("bench", np.load(path, mmap_mode="r"), (72.0, 18.0, 73.0, 19.0), layer=BAND_LAYER)
+    os.remove(path)
+
+def child(store_dir: str, workers: int):
+    from app.engines.surface_engine import SurfaceEngine
+    from app.infra.tile_store import TileStore
+
+    store = TileStore(store_dir)
+    scene = store.find_scenes(18.5, 72.5)[0]
+    engine = SurfaceEngine(store, workers=workers)
+    baseline = peak_rss_kb()
+    started = time.perf_counter()
+    surface = engine.compute(scene)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        "workers": workers,
+        "seconds": round(elapsed, 2),
+        "peak_rss_growth_mb": round((peak_rss_kb() - baseline) / 1024, 1),
+        "surface": surface.__dict__,
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=10980)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], int(args.child[1]))
+        return
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        started = time.perf_counter()
+        make_scene(store_dir, args.size)
+        print(f"Generated {args.size}x{args.size} band scene in {time.perf_counter() - started:.1f}s")
+        for workers in args.workers:
+            out = subprocess.run(
+                [sys.executable, "-m", "scripts.bench_surface", "--child", store_dir, str(workers)],
+                check=True, capture_output=True, text=True
+            )
+            print(out.stdout.strip())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Measures peak RSS of one upload decode: the previous path (read the whole
+upload into bytes, BytesIO, full decode + convert) against
+app.infra.image_io.decode_upload (decode straight from the spooled file,
+draft-mode JPEG decode, no redundant convert).
+
+Each measurement runs in a fresh interpreter so peaks don't carry over;
+the figure reported is the growth of peak RSS (VmHWM) over the
+post-import baseline.
+
+Usage (from backend/):
+    python -m scripts.bench_upload_rss --sizes 1280x960 4000x3000 8000x6000
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import numpy as np
+from PIL import Image
+
+# Starlette spools multipart files to disk above 1 MiB
+SPOOL_MAX_SIZE = 1024 * 1024
+
+def peak_rss_kb() -> int:
+    # VmHWM is per address space; ru_maxrss would carry over the parent's
+    # peak across fork/exec
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def make_image(path: str, width: int, height: int, fmt: str):
+    # Smooth gradients plus noise: compresses like a real photo, not like noise
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([x * 255 // width, y * 255 // height, (x + y) * 255 // (width + height)], axis=-1)
+    pixels = np.clip(base + rng.integers(-8, 8, base.shape), 0, 255).astype(np.uint8)
+    Image.fromarray(pixels).save(path, fmt, quality=90)
+
+def child(mode: str, path: str):
+    from app.infra.image_io import decode_upload
+
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    with open(path, "rb") as f:
+        while chunk := f.read(SPOOL_MAX_SIZE):
+            spooled.write(chunk)
+    spooled.seek(0)
+
+    baseline = peak_rss_kb()
+    if mode == "before":
+        contents = spooled.read()
+        image = Image.open(io.BytesIO(contents)).convert("RGB")
+    else:
+        image = decode_upload(spooled, max_bytes=sys.maxsize, max_pixels=sys.maxsize)
+    print(json.dumps({"peak_delta_kb": peak_rss_kb() - baseline, "decoded_size": list(image.size)}))
+
+def measure(mode: str, path: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "scripts.bench_upload_rss", "--child", mode, path],
+        check=True, capture_output=True, text=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["1280x960", "4000x3000", "8000x6000"])
+    parser.add_argument("--formats", nargs="+", default=["JPEG", "PNG"])
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    print(f"{'image':<16} {'format':<6} {'upload MB':>9} {'before MB':>10} {'after MB':>9} {'decoded':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            width, height = (int(v) for v in size.lower().split("x"))
+            for fmt in args.formats:
+                path = os.path.join(tmp, f"{size}.{fmt.lower()}")
+                make_image(path, width, height, fmt)
+                before = measure("before", path)
+                after = measure("after", path)
+                decoded = "x".join(str(v) for v in after["decoded_size"])
+                print(f"{size:<16} {fmt:<6} {os.path.getsize(path) / 2**20:>9.1f} "
+                      f"{before['peak_delta_kb'] / 1024:>10.1f} {after['peak_delta_kb'] / 1024:>9.1f} {decoded:>11}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Builds (or incrementally updates) the risk map tile pyramid for a region
+from the tile store's band layers and the stored analysis reports. Served
+by GET /api/tiles/{z}/{x}/{y}?layer=risk|pdi|sai|wdi.
+
+Re-running over the same region only rescores cells whose inputs changed
+(new scenes, new reports) and only rewrites the tiles containing them.
+
+Usage (from backend/):
+    python -m scripts.build_risk_tiles --bbox 18.85 72.75 19.30 73.05
+"""
+import argparse
+import json
+import logging
+from app.core.config import settings
+from app.domain.region import BoundingBox
+from app.engines.surface_engine import SurfaceEngine
+from app.infra.report_store import report_store
+from app.infra.risk_tiles import risk_tile_store
+from app.infra.sentinel_service import sentinel_service
+from app.pipelines.risk_pyramid import RiskPyramidBuilder
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bbox", type=float, nargs=4, required=True, metavar=("MIN_LAT", "MIN_LNG", "MAX_LAT", "MAX_LNG"))
+    parser.add_argument("--max-zoom", type=int, default=settings.RISK_TILES_MAX_ZOOM)
+    parser.add_argument("--min-zoom", type=int, default=settings.RISK_TILES_MIN_ZOOM)
+    parser.add_argument("--full", action="store_true", help="Rescore every cell and rewrite every tile")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    tile_store = sentinel_service.tile_store
+    builder = RiskPyramidBuilder(
+        tile_store,
+        report_store,
+        SurfaceEngine(tile_store, block_px=settings.SURFACE_BLOCK_PX, pixel_size_m=settings.SURFACE_PIXEL_SIZE_M),
+        risk_tile_store,
+        max_zoom=args.max_zoom,
+        min_zoom=args.min_zoom,
+        population_density=settings.RISK_TILES_POPULATION_DENSITY,
+        max_cells=settings.RISK_TILES_MAX_CELLS
+    )
+    stats = builder.build(BoundingBox(*args.bbox), full=args.full)
+    print(json.dumps(stats))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Accuracy/latency comparison of inference backends against the PyTorch
+reference on a fixed tile set.
+
+Accuracy: each backend's detections are matched greedily to the torch
+detections (same class, IoU >= --iou), giving precision/recall/F1 relative
+to torch, plus the mean absolute object-count difference per tile.
+Latency: per-tile wall time after one warm-up call (p50/p95/mean).
+
+The tile set is every image in --tiles, or the demo tile under its eight
+flips/rotations when omitted.
+
+Usage (from backend/):
+    python -m scripts.compare_backends --backends torch onnx onnx-int8 --repeats 5
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+import numpy as np
+from PIL import Image
+from app.engines.box_ops import pairwise_overlap
+from app.engines.inference_backends import BACKENDS, create_backend
+from app.infra.tile_store import IMAGE_SUFFIXES
+
+DEMO_TILE = Path("backend/data/sentinel_cache/demo_tile.png")
+
+def load_tiles(directory: str):
+    if directory:
+        paths = sorted(p for p in Path(directory).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+        return [Image.open(p).convert("RGB") for p in paths]
+
+    # The eight symmetries of the square: identity, rotations and mirrors
+    base = Image.open(DEMO_TILE).convert("RGB")
+    mirrored = base.transpose(Image.FLIP_LEFT_RIGHT)
+    return [img.rotate(angle, expand=True) for img in (base, mirrored) for angle in (0, 90, 180, 270)]
+
+def match(reference, candidate, iou: float):
+    """
+    Greedy one-to-one matching by confidence. Returns matched pair count.
+    """
+    ref_boxes, _, ref_cls = reference
+    boxes, confs, cls = candidate
+    used = np.zeros(len(ref_boxes), dtype=bool)
+    matched = 0
+    for i in np.argsort(-confs):
+        if not len(ref_boxes):
+            break
+        overlap = pairwise_overlap(boxes[i].astype(np.float64), ref_boxes.astype(np.float64))
+        overlap[(ref_cls != cls[i]) | used] = 0
+        j = int(overlap.argmax())
+        if overlap[j] >= iou:
+            used[j] = True
+            matched += 1
+    return matched
+
+def run_backend(name: str, tiles, repeats: int):
+    backend = create_backend(name)
+    backend.predict(tiles[:1])  # Warm-up
+
+    latencies, outputs = [], []
+    for tile in tiles:
+        for r in range(repeats):
+            started = time.perf_counter()
+            result = backend.predict([tile])[0]
+            latencies.append((time.perf_counter() - started) * 1000)
+        outputs.append(result)
+    return outputs, np.asarray(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--tiles", help="Directory with the fixed tile set")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--iou", type=float, default=0.5)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    tiles = load_tiles(args.tiles)
+    reference = None
+    results = {}
+
+    names = ["torch"] + [b for b in args.backends if b != "torch"]
+    for name in names:
+        outputs, latencies = run_backend(name, tiles, args.repeats)
+        if name == "torch":
+            reference = outputs
+
+        ref_total = sum(len(r[0]) for r in reference)
+        cand_total = sum(len(o[0]) for o in outputs)
+        matched = sum(match(r, o, args.iou) for r, o in zip(reference, outputs))
+        precision = matched / cand_total if cand_total else 1.0
+        recall = matched / ref_total if ref_total else 1.0
+        results[name] = {
+            "latency_ms": {
+                "p50": round(float(np.percentile(latencies, 50)), 2),
+                "p95": round(float(np.percentile(latencies, 95)), 2),
+                "mean": round(float(latencies.mean()), 2),
+            },
+            "detections": cand_total,
+            "precision_vs_torch": round(precision, 4),
+            "recall_vs_torch": round(recall, 4),
+            "f1_vs_torch": round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0,
+            "mean_abs_count_diff": round(float(np.mean([abs(len(o[0]) - len(r[0])) for r, o in zip(reference, outputs)])), 2),
+        }
+
+    torch_p50 = results["torch"]["latency_ms"]["p50"]
+    print(f"{len(tiles)} tiles, {args.repeats} repeats each")
+    print(f"{'backend':<10} {'p50 ms':>8} {'p95 ms':>8} {'speedup':>8} {'dets':>6} {'prec':>6} {'recall':>6} {'F1':>6} {'|dN|':>6}")
+    for name, r in results.items():
+        speedup = torch_p50 / r["latency_ms"]["p50"] if r["latency_ms"]["p50"] else 0.0
+        print(f"{name:<10} {r['latency_ms']['p50']:>8} {r['latency_ms']['p95']:>8} {speedup:>7.2f}x {r['detections']:>6} "
+              f"{r['precision_vs_torch']:>6} {r['recall_vs_torch']:>6} {r['f1_vs_torch']:>6} {r['mean_abs_count_diff']:>6}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"tiles": len(tiles), "repeats": args.repeats, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Exports settings.MODEL_PATH to ONNX for the "onnx" backend and builds the
+int8-quantized variant for the "onnx-int8" backend.
+
+Quantization is static (QDQ, per-channel weights), calibrated on a fixed tile
+set: every image in --calibration-dir, or the demo tile if none is given.
+Use --dynamic for weight-only dynamic quantization (no calibration data).
+
+Usage (from backend/):
+    python -m scripts.export_onnx --calibration-dir data/calibration_tiles
+Requires: ultralytics (export), onnx, onnxruntime.
+"""
+import argparse
+import shutil
+from pathlib import Path
+import numpy as np
+from PIL import Image
+from app.core.config import settings
+from app.infra.tile_store import IMAGE_SUFFIXES
+
+DEMO_TILE = Path("backend/data/sentinel_cache/demo_tile.png")
+
+def export_fp32(imgsz: int) -> Path:
+    from ultralytics import YOLO
+    exported = Path(YOLO(settings.MODEL_PATH).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True))
+    target = Path(settings.ONNX_MODEL_PATH)
+    if exported.resolve() != target.resolve():
+        shutil.move(str(exported), target)
+    return target
+
+def load_tiles(directory: str):
+    if directory:
+        paths = sorted(p for p in Path(directory).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    else:
+        paths = [DEMO_TILE]
+    if not paths:
+        raise SystemExit(f"No calibration images found in {directory}")
+    return [Image.open(p).convert("RGB") for p in paths]
+
+def quantize_int8(fp32_path: Path, tiles, dynamic: bool, imgsz: int) -> Path:
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_dynamic, quantize_static
+    from app.engines.inference_backends import OnnxBackend
+
+    target = Path(settings.ONNX_INT8_MODEL_PATH)
+    if dynamic:
+        quantize_dynamic(str(fp32_path), str(target), weight_type=QuantType.QUInt8)
+        return target
+
+    # Reuse the backend's letterboxing so calibration sees real model inputs
+    backend = OnnxBackend(str(fp32_path), imgsz=imgsz)
+
+    class TileReader(CalibrationDataReader):
+        def __init__(self):
+            self._batches = iter([
+                {backend.input.name: backend._letterbox(tile)[0][None]} for tile in tiles
+            ])
+
+        def get_next(self):
+            return next(self._batches, None)
+
+    quantize_static(
+        str(fp32_path), str(target), TileReader(),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True
+    )
+    return target
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calibration-dir", help="Directory of representative tiles for static quantization")
+    parser.add_argument("--dynamic", action="store_true", help="Dynamic (weight-only) quantization")
+    parser.add_argument("--imgsz", type=int, default=settings.VISION_IMGSZ)
+    parser.add_argument("--skip-export", action="store_true", help="Only quantize an existing ONNX_MODEL_PATH")
+    args = parser.parse_args()
+
+    fp32 = Path(settings.ONNX_MODEL_PATH) if args.skip_export else export_fp32(args.imgsz)
+    print(f"fp32 model: {fp32}")
+
+    tiles = [] if args.dynamic else load_tiles(args.calibration_dir)
+    int8 = quantize_int8(fp32, tiles, args.dynamic, args.imgsz)
+    print(f"int8 model: {int8} ({int8.stat().st_size / fp32.stat().st_size:.0%} of fp32 size)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Bulk-ingests a directory of scenes into the local tile store and builds
+the quadkey index offline.
+
+Each image needs a sidecar `<name>.json`:
+    {"bounds": [west, south, east, north], "acquired": "2025-01-14"}
+
+and may name a multispectral band file next to it, an (H, W, 4) uint16
+.npy of B2/B3/B4/B8 reflectances (x10000), for the surface stage:
+    {"bounds": [...], "bands": "scene_bands.npy"}
+
+Usage (from backend/):
+    python -m scripts.ingest_tiles /path/to/scenes
+"""
+import argparse
+import logging
+import time
+from app.core.config import settings
+from app.infra.tile_store import TileStore
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="Directory of scene images with .json sidecars")
+    parser.add_argument("--store", default=settings.TILE_STORE_DIR, help="Tile store root")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    store = TileStore(args.store, index_zoom=settings.TILE_INDEX_ZOOM)
+
+    started = time.perf_counter()
+    ingested = store.ingest_directory(args.directory)
+    elapsed = time.perf_counter() - started
+
+    stats = store.stats()
+    print(f"Ingested {len(ingested)} scene(s) in {elapsed:.1f}s; "
+          f"index has {stats['indexed_cells']} cells across {stats['scenes']} scene(s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Coalesced /analyze callers share one report but get their own location.
+"""
+import asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api import analyze
+from app.domain.heat import HeatIndex
+from app.domain.plastic import PlasticAnalysis
+from app.pipelines.single_flight import SingleFlight
+from app.schemas.report import AnalysisReport
+
+def test_shared_report_echoes_each_callers_location(monkeypatch):
+    runs = []
+
+    async def arun(image=None, region=None, **kwargs):
+        runs.append(region)
+        await asyncio.sleep(0)
+        return AnalysisReport(
+            region=region,
+            plastic=PlasticAnalysis(object_count=2, density_score=0.4),
+            heat_index=HeatIndex(1.0, 2.0, 3.0, 2.1),
+            interventions=[]
+        )
+
+    monkeypatch.setattr(analyze.pipeline, "arun", arun)
+    monkeypatch.setattr(analyze, "single_flight", SingleFlight(ttl_s=60))
+    app = FastAPI()
+    app.include_router(analyze.router, prefix="/api/analyze")
+    client = TestClient(app)
+
+    first = client.post("/api/analyze/", data={"lat": 19.07601, "lng": 72.87765, "use_satellite": "true"}).json()
+    second = client.post("/api/analyze/", data={"lat": 19.07598, "lng": 72.87772, "use_satellite": "true"}).json()
+
+    assert len(runs) == 1
+    assert first["location"] == {"lat": 19.07601, "lng": 72.87765}
+    assert second["location"] == {"lat": 19.07598, "lng": 72.87772}
+    # Population is the shared report's, consistent with its indices
+    assert second["environmental_data"] == first["environmental_data"]
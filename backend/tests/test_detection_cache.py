@@ -0,0 +1,32 @@
+"""
+Detection cache entries stay tied to the model that was actually loaded.
+"""
+from PIL import Image
+from app.core.config import settings
+from app.domain.plastic import PlasticAnalysis
+from app.infra.detection_cache import DetectionCache
+
+def test_replaced_weights_do_not_retag_loaded_model(tmp_path, monkeypatch):
+    weights = tmp_path / "model.pt"
+    weights.write_bytes(b"old")
+    monkeypatch.setattr(settings, "INFERENCE_BACKEND", "torch")
+    monkeypatch.setattr(settings, "MODEL_PATH", str(weights))
+
+    cache = DetectionCache(str(tmp_path / "cache.sqlite"))
+    loaded = DetectionCache.model_identity()
+    cache.set_model(loaded)
+    image = Image.new("RGB", (64, 64), (10, 20, 30))
+    key = cache.key_for(image, {})
+    cache.put(key, PlasticAnalysis(object_count=1, density_score=0.5))
+
+    # Weights swapped on disk while the old model is still serving
+    weights.write_bytes(b"new weights")
+    assert DetectionCache.model_identity() != loaded
+    assert cache.key_for(image, {}) == key
+    assert cache.get(key).object_count == 1
+    assert cache.stats()["model_id"] == loaded
+
+    # The new model is declared when it is loaded
+    cache.set_model(DetectionCache.model_identity())
+    assert cache.key_for(image, {}) != key
+    assert cache.get(key) is None
@@ -0,0 +1,66 @@
+"""
+Parity of the vectorized heat scoring with the original scalar formulas,
+which rounded with Python's built-in round().
+"""
+import numpy as np
+import pytest
+from app.domain.plastic import PlasticAnalysis
+from app.domain.sensor import SensorReading
+from app.domain.surface import SurfaceData
+from app.engines.heat_engine import HeatEngine
+from app.scoring.indices import round_like_python
+
+def reference_risk(density, temp, green, impervious, pop, ambient=None):
+    # Scalar formulas as they were before vectorization
+    pdi = round(density, 2)
+    sai = round(max(0, min((impervious * 7.0) + ((1.0 - green) * 3.0), 10)), 2)
+    temp_factor = max(0, min((temp - 20) / 30, 1.0))
+    pop_factor = max(0, min(pop / 10000, 1.0))
+    wdi = round((temp_factor * 6.0) + (pop_factor * 4.0), 2)
+    risk = (pdi * 0.4) + (sai * 0.3) + (wdi * 0.3)
+    if ambient is not None:
+        temp_score = min(10, max(0, (ambient - 25) * 0.8))
+        risk = (risk * 0.7) + (temp_score * 0.3)
+    return pdi, sai, wdi, round(risk, 2)
+
+def random_inputs(n, seed):
+    # Python floats: np.float64.__round__ would itself use np.round
+    rng = np.random.default_rng(seed)
+    return tuple(column.tolist() for column in (
+        rng.uniform(0, 10, n),
+        rng.uniform(15, 55, n),
+        rng.uniform(0, 1, n),
+        rng.uniform(0, 1, n),
+        rng.uniform(0, 12000, n),
+        rng.uniform(15, 45, n),
+    ))
+
+@pytest.mark.parametrize("with_sensor", [False, True])
+def test_batch_matches_reference(with_sensor):
+    density, temp, green, impervious, pop, ambient = random_inputs(20000, seed=7)
+    batch = HeatEngine.assess_risk_batch(density, temp, green, impervious, pop,
+                                         ambient_temp_c=ambient if with_sensor else None)
+    for i in range(len(density)):
+        expected = reference_risk(density[i], temp[i], green[i], impervious[i], pop[i],
+                                  ambient[i] if with_sensor else None)
+        got = (float(batch.plastic_density_index[i]), float(batch.surface_absorption_index[i]),
+               float(batch.water_deficit_index[i]), float(batch.urban_risk_index[i]))
+        assert got == expected, (i, got, expected)
+
+def test_scalar_matches_batch():
+    density, temp, green, impervious, pop, ambient = random_inputs(2000, seed=11)
+    batch = HeatEngine.assess_risk_batch(density, temp, green, impervious, pop, ambient_temp_c=ambient)
+    for i in range(len(density)):
+        heat = HeatEngine.assess_risk(
+            PlasticAnalysis(object_count=0, density_score=density[i]),
+            SurfaceData(surface_temp_c=temp[i], green_cover_index=green[i], impervious_surface_index=impervious[i]),
+            pop[i],
+            sensor_data=SensorReading(device_count=1, ambient_temp_c=ambient[i], humidity_percent=50.0,
+                                      pm25_level=10.0, is_calibrated=True, timestamp="2026-01-01T00:00:00Z"),
+        )
+        assert heat == batch.row(i)
+
+def test_round_like_python_near_halves():
+    values = [7.335, 2.675, 0.125, 0.375, 1.005, -7.335, 10.0, 0.0, 3.14159]
+    assert round_like_python(values, 2).tolist() == [round(v, 2) for v in values]
+    assert np.isnan(round_like_python([np.nan])[0])
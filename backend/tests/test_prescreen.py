@@ -0,0 +1,29 @@
+"""
+Pre-screen decisions for satellite tiles versus user uploads.
+"""
+import numpy as np
+from PIL import Image
+from app.domain.plastic import PlasticAnalysis
+from app.engines.confidence_engine import ConfidenceEngine
+from app.engines.prescreen import PreScreenEngine, SKIP_NO_WATER
+
+def brown_river() -> Image.Image:
+    # Turbid river between green banks: no blue-dominant pixels
+    rng = np.random.default_rng(0)
+    rgb = np.empty((128, 128, 3), dtype=np.uint8)
+    rgb[:] = (60, 110, 50)
+    rgb[48:80] = (120, 95, 60)
+    rgb = np.clip(rgb + rng.integers(-8, 9, rgb.shape), 0, 255).astype(np.uint8)
+    return Image.fromarray(rgb)
+
+def test_no_water_rule_can_be_waived_per_image():
+    engine = PreScreenEngine()
+    assert engine.screen(brown_river()).skip_reason == SKIP_NO_WATER
+    assert engine.screen(brown_river(), require_water=False).skip_reason is None
+    assert engine.stats()["passed"] == 1
+
+def test_upload_confidence_does_not_claim_sentinel():
+    skipped = PlasticAnalysis(object_count=0, density_score=0.0, skip_reason="cloud")
+    upload = ConfidenceEngine.evaluate(skipped, source="upload")
+    assert not any("Sentinel" in reason for reason in upload["reasons"])
+    assert "Sentinel" in ConfidenceEngine.evaluate(skipped)["reasons"][0]
@@ -0,0 +1,43 @@
+"""
+Report store writer resilience and the disabled-store API.
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api import reports
+from app.infra.report_store import ReportStore
+from app.pipelines.urban_heat_pipeline import pipeline
+
+def row(store: ReportStore, lat: float, lng: float) -> tuple:
+    return (store.cell_key(lat, lng), lat, lng, 1.0e9, 3, 0.5, 0.5, 4.0, 3.0, 2.5, 0.9, "cleanup", "satellite")
+
+def test_writer_survives_unexpected_errors(tmp_path, monkeypatch):
+    store = ReportStore(str(tmp_path / "reports.sqlite"), flush_interval_ms=0)
+    write_rows = store.write_rows
+    calls = []
+
+    def flaky(rows):
+        calls.append(len(rows))
+        if len(calls) == 1:
+            raise TypeError("unexpected")
+        write_rows(rows)
+
+    monkeypatch.setattr(store, "write_rows", flaky)
+    store._ensure_worker()
+    store._queue.put(row(store, 1.0, 1.0))
+    assert store.flush()
+    store._queue.put(row(store, 2.0, 2.0))
+    assert store.flush()
+
+    assert store._worker.is_alive()
+    assert store.stats()["errors"] == 1
+    assert store.stats()["written"] == 1
+    assert store.series(2.0, 2.0)["reports"][0]["location"] == {"lat": 2.0, "lng": 2.0}
+
+def test_disabled_store_is_never_opened(monkeypatch):
+    monkeypatch.setattr(pipeline, "report_store", None)
+    app = FastAPI()
+    app.include_router(reports.router, prefix="/api/reports")
+    client = TestClient(app)
+    response = client.get("/api/reports/latest", params={"min_lat": 0, "min_lng": 0, "max_lat": 1, "max_lng": 1})
+    assert response.status_code == 503
+    assert client.get("/api/reports/series", params={"lat": 0, "lng": 0}).status_code == 503
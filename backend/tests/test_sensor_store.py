@@ -0,0 +1,65 @@
+"""
+Sensor ingestion must not let a badly stamped reading break aggregation.
+"""
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api import sensors
+from app.infra.sensor_store import SensorStore
+
+def make_client(store: SensorStore, monkeypatch) -> TestClient:
+    app = FastAPI()
+    app.include_router(sensors.router, prefix="/api/sensors")
+    monkeypatch.setattr(sensors, "sensor_store", store)
+    return TestClient(app)
+
+def test_millisecond_timestamp_is_rejected(monkeypatch):
+    store = SensorStore()
+    client = make_client(store, monkeypatch)
+    client.post("/api/sensors/devices", json=[{"device_id": "d1", "lat": 19.0, "lng": 72.8}])
+
+    now = time.time()
+    bad = client.post("/api/sensors/readings", json={"readings": [
+        {"device_id": "d1", "temp_c": 30, "humidity_percent": 60, "pm25": 12, "timestamp": now * 1000}
+    ]})
+    assert bad.status_code == 422
+
+    good = client.post("/api/sensors/readings", json={"readings": [
+        {"device_id": "d1", "temp_c": 30, "humidity_percent": 60, "pm25": 12, "timestamp": now}
+    ]})
+    assert good.json()["stored"] == 1
+    nearby = client.get("/api/sensors/nearby", params={"lat": 19.0, "lng": 72.8})
+    assert nearby.status_code == 200
+    assert nearby.json()["ambient_temp_c"] == 30.0
+
+def test_aggregate_survives_a_stored_bad_timestamp():
+    store = SensorStore()
+    store.register_device("d1", 19.0, 72.8)
+    now = time.time()
+    # Bypasses API validation, as a direct caller could
+    store.ingest(["d1", "d1"], [now * 1000, now], [99.0, 30.0], [60.0, 60.0], [10.0, 10.0])
+
+    reading = store.aggregate(19.0, 72.8, 2.0, now=now)
+    assert reading is not None
+    # The future-stamped reading is not live, so it doesn't skew the window
+    assert reading.ambient_temp_c == 30.0
+    assert reading.max_temp_c == 30.0
+
+def test_non_finite_timestamps_are_skipped():
+    store = SensorStore()
+    store.register_device("d1", 19.0, 72.8)
+    assert store.ingest(["d1"], [float("nan")], [30.0], [60.0], [10.0]) == 0
+
+def test_polar_query_is_bounded():
+    store = SensorStore()
+    store.register_device("pole", 89.99, 10.0)
+    store.register_device("far", 10.0, 10.0)
+    start = time.perf_counter()
+    found = store.nearby_devices(90.0, 0.0, 5.0)
+    assert time.perf_counter() - start < 0.5
+    assert found.tolist() == [0]
+
+def test_nearby_rejects_out_of_range_queries(monkeypatch):
+    client = make_client(SensorStore(), monkeypatch)
+    assert client.get("/api/sensors/nearby", params={"lat": 19.0, "lng": 72.8, "radius_km": 1e5}).status_code == 422
+    assert client.get("/api/sensors/nearby", params={"lat": 91.0, "lng": 72.8}).status_code == 422